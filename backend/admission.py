@@ -0,0 +1,148 @@
+"""
+Bulkheads and admission control
+
+Requests are classified (critical, interactive, dashboard, bulk) and each
+class gets its own concurrency limit, bounded queue and queueing deadline, so
+a few heavy exports cannot take every slot and starve payment posting or
+login. A request that would queue beyond `max_queue`, or that waits longer
+than `queue_timeout`, is shed with 503 + Retry-After instead of piling up.
+
+On the data layer, each class also has its own cap on concurrent upstream
+calls (`upstream_limit`), enforced in the Supabase wrapper until the request
+deadline. Only worker threads wait for an upstream slot: a call made on the
+event loop thread takes a free slot or is shed at once, since waiting there
+would stall every other request. Bulk routes therefore do their upstream work
+with run_in_threadpool (the request's context, hence its bulkhead, follows),
+and background jobs run under the bulk bulkhead of the job runner.
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+import orjson
+
+SHED_DETAIL = "Serveur surchargé, réessayez dans quelques instants"
+
+
+class Overloaded(Exception):
+    """A bulkhead refused or timed out a request"""
+    def __init__(self, bulkhead: str, retry_after: int):
+        super().__init__(f"{bulkhead} bulkhead overloaded")
+        self.bulkhead = bulkhead
+        self.retry_after = retry_after
+
+
+class Bulkhead:
+    def __init__(self, name: str, limit: int, max_queue: int, queue_timeout: float, deadline: float,
+                 upstream_limit: int, retry_after: int = 2):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        # Time a request of this class may spend in total before its upstream calls are refused
+        self.deadline = deadline
+        self.retry_after = retry_after
+        self.upstream = threading.BoundedSemaphore(upstream_limit)
+        self.upstream_limit = upstream_limit
+        self.semaphore = None
+        self.active = 0
+        self.waiting = 0
+        self.shed = 0
+
+    async def acquire(self):
+        """Take one of the class's slots, queueing if needed (raises Overloaded)"""
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.limit)
+        if self.semaphore.locked():
+            if self.waiting >= self.max_queue:
+                self.shed += 1
+                raise Overloaded(self.name, self.retry_after)
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self.semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.shed += 1
+                raise Overloaded(self.name, self.retry_after)
+            finally:
+                self.waiting -= 1
+        else:
+            await self.semaphore.acquire()
+        self.active += 1
+
+    def release(self):
+        self.active -= 1
+        self.semaphore.release()
+
+    def snapshot(self) -> dict:
+        return {"active": self.active, "waiting": self.waiting, "shed": self.shed,
+                "limit": self.limit, "max_queue": self.max_queue}
+
+
+# Bulkhead of the request being served and the monotonic time it must be done by
+current_bulkhead: ContextVar[Optional[Bulkhead]] = ContextVar("current_bulkhead", default=None)
+current_deadline: ContextVar[Optional[float]] = ContextVar("current_deadline", default=None)
+
+
+def on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+@contextmanager
+def upstream_slot():
+    """Hold one of the current class's upstream call slots (no limit outside requests and jobs)"""
+    bulkhead = current_bulkhead.get()
+    if bulkhead is None:
+        yield
+        return
+    deadline = current_deadline.get()
+    # Jobs have no request deadline: each call may wait as long as a bulk request could
+    timeout = bulkhead.deadline if deadline is None else max(deadline - time.monotonic(), 0)
+    acquired = bulkhead.upstream.acquire(blocking=False) if on_event_loop() else bulkhead.upstream.acquire(timeout=timeout)
+    if not acquired:
+        bulkhead.shed += 1
+        raise Overloaded(bulkhead.name, bulkhead.retry_after)
+    try:
+        yield
+    finally:
+        bulkhead.upstream.release()
+
+
+class AdmissionMiddleware:
+    """Run each request inside its class's bulkhead; `classify(method, path)` returning None bypasses"""
+    def __init__(self, app, classify: Callable, bulkheads: dict):
+        self.app = app
+        self.classify = classify
+        self.bulkheads = bulkheads
+
+    async def __call__(self, scope, receive, send):
+        name = self.classify(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+        bulkhead = self.bulkheads[name]
+        try:
+            await bulkhead.acquire()
+        except Overloaded as e:
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [(b"content-type", b"application/json"), (b"retry-after", str(e.retry_after).encode())],
+            })
+            await send({"type": "http.response.body", "body": orjson.dumps({"detail": SHED_DETAIL})})
+            return
+        bulkhead_token = current_bulkhead.set(bulkhead)
+        deadline_token = current_deadline.set(time.monotonic() + bulkhead.deadline)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_bulkhead.reset(bulkhead_token)
+            current_deadline.reset(deadline_token)
+            bulkhead.release()
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Génération d'un jeu de données synthétique cohérent
+
+Remplit toutes les tables de supabase_schema.sql (campus, années, formations,
+filières et leurs liens, niveaux, classes, matières, utilisateurs, étudiants
+avec photos, notes, transactions, absences, professeurs, heures, personnel,
+archives) à travers le wrapper Supabase : la cible est Supabase ou le backend
+SQLite (SUPABASE_URL=sqlite:///tmp/supinter.db). Une même graine, les mêmes
+tailles et la même année (--year, fixe par défaut) produisent les mêmes
+identifiants et les mêmes valeurs, quelle que soit la date du jour.
+
+    cd backend && SUPABASE_URL=sqlite:///tmp/supinter.db python -m benchmarks.dataset --preset full --reset
+
+Le preset `full` correspond à 5 campus, 20 000 étudiants, 1 M de notes et
+200 000 transactions.
+"""
+
+import argparse
+import base64
+import os
+import random
+import time
+import uuid
+from dataclasses import dataclass, fields, replace
+from datetime import date, timedelta
+from typing import Optional
+
+os.environ.setdefault("SUPABASE_URL", "sqlite://")
+os.environ.setdefault("SUPABASE_ANON_KEY", "dataset")
+
+from supinter.models import FORMATION_TYPES, LEVELS, UserRole, StudentStatus  # noqa: E402
+
+
+@dataclass
+class DatasetSize:
+    campuses: int = 2
+    academic_years: int = 2
+    filieres: int = 6
+    subjects_per_class: int = 8
+    students: int = 500
+    grades_per_student: int = 20
+    transactions: int = 2000
+    absences_per_student: float = 2.0
+    professors_per_campus: int = 10
+    hours_per_professor: int = 10
+    staff_per_campus: int = 5
+    archives_per_student: float = 0.2
+    # Distinct photos (reused between students) and share of students with one
+    photos: int = 50
+    photo_ratio: float = 0.8
+
+
+PRESETS = {
+    "tiny": DatasetSize(campuses=1, academic_years=1, filieres=2, subjects_per_class=3, students=40, grades_per_student=4,
+                        transactions=80, professors_per_campus=2, hours_per_professor=2, staff_per_campus=1, photos=3),
+    "small": DatasetSize(),
+    "full": DatasetSize(campuses=5, filieres=12, students=20000, grades_per_student=50, transactions=200000,
+                        absences_per_student=3.0, professors_per_campus=40, hours_per_professor=20,
+                        staff_per_campus=20, photos=500),
+}
+
+CAMPUS_NAMES = ["Abidjan Plateau", "Cocody", "Yopougon", "Bouaké", "Yamoussoukro", "San-Pédro", "Daloa", "Korhogo", "Man", "Gagnoa"]
+FILIERE_NAMES = [
+    ("Informatique de Gestion", "IG"), ("Réseaux et Télécoms", "RT"), ("Comptabilité", "CPT"),
+    ("Finance", "FIN"), ("Marketing", "MKT"), ("Ressources Humaines", "RH"), ("Logistique", "LOG"),
+    ("Génie Civil", "GC"), ("Électrotechnique", "ELT"), ("Communication", "COM"),
+    ("Assurance", "ASS"), ("Droit des Affaires", "DA"), ("Génie Logiciel", "GL"), ("Banque", "BQ"),
+]
+# Levels taught in each formation
+FORMATION_LEVELS = {
+    "BTS": ["1ère Année", "2ème Année"],
+    "DUT": ["1ère Année", "2ème Année"],
+    "LICENCE": ["1ère Année", "2ème Année", "3ème Année"],
+    "MASTER": ["Master 1", "Master 2"],
+    "QUALIF": ["6 Mois"],
+}
+TUITION = {"BTS": 450000, "DUT": 500000, "LICENCE": 600000, "MASTER": 900000, "QUALIF": 250000}
+SUBJECT_NAMES = ["Mathématiques", "Anglais", "Algorithmique", "Bases de données", "Droit", "Économie", "Comptabilité générale",
+                 "Statistiques", "Techniques d'expression", "Gestion de projet", "Marketing", "Fiscalité", "Réseaux", "Management"]
+FIRST_NAMES = ["Awa", "Aminata", "Fatou", "Mariam", "Aïcha", "Adjoua", "Affoué", "Koffi", "Kouamé", "Yao", "Konan",
+               "Ibrahim", "Moussa", "Seydou", "Jean-Marc", "Serge", "Arnaud", "Christelle", "Grâce", "Prisca"]
+LAST_NAMES = ["Koné", "Traoré", "Ouattara", "Coulibaly", "Diabaté", "Yao", "Kouassi", "N'Guessan", "Konan", "Bamba",
+              "Touré", "Cissé", "Kouadio", "Assi", "Gbagbo", "Zadi", "Bakayoko", "Soro", "Fofana", "Doumbia"]
+BIRTH_PLACES = ["Abidjan", "Bouaké", "Daloa", "Korhogo", "San-Pédro", "Yamoussoukro", "Man", "Gagnoa", "Divo", "Abengourou"]
+EXPENSE_CATEGORIES = ["Salaires", "Loyer", "Électricité", "Fournitures", "Maintenance"]
+OTHER_INCOME_CATEGORIES = ["Inscription", "Frais d'examen"]
+# Calendar year the school is set in (the active academic year ends in it). Fixed
+# rather than today's, so a seed gives the same data, and baselines recorded on
+# it stay comparable, from one year to the next
+DATASET_YEAR = 2026
+DOCUMENT_TYPES = ["certificat_scolarite", "attestation", "bulletin", "releve_notes"]
+STAFF_FUNCTIONS = ["Secrétaire", "Comptable", "Agent d'entretien", "Surveillant", "Bibliothécaire"]
+
+
+@dataclass
+class Dataset:
+    """What a run created, for benchmarks and load tests"""
+    seed: int
+    size: DatasetSize
+    password: str
+    users: list
+    counts: dict
+    campus_ids: list
+    active_year_id: str
+    class_ids: list
+    student_ids: list
+
+
+class Writer:
+    """Buffered bulk inserts through the wrapper"""
+    def __init__(self, client, batch_size: int, counts: dict):
+        self.client = client
+        self.batch_size = batch_size
+        self.counts = counts
+        self.buffers = {}
+
+    def add(self, table: str, row: dict):
+        buffer = self.buffers.setdefault(table, [])
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self.flush(table)
+
+    def flush(self, table: Optional[str] = None):
+        for name in [table] if table else list(self.buffers):
+            rows = self.buffers.get(name)
+            if rows:
+                self.client.table(name).insert(rows).execute()
+                self.counts[name] = self.counts.get(name, 0) + len(rows)
+                self.buffers[name] = []
+
+
+def make_photo(rng: random.Random, width: int = 150, height: int = 200) -> bytes:
+    """A JPEG of noise over a flat background, about the weight of an ID photo"""
+    from io import BytesIO
+    from PIL import Image
+
+    image = Image.new("RGB", (width, height), tuple(rng.randrange(256) for _ in range(3)))
+    noise = Image.frombytes("RGB", (width, height // 2), rng.randbytes(width * (height // 2) * 3))
+    image.paste(noise, (0, height // 4))
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def generate(client, size: DatasetSize, seed: int = 42, password: str = "password", photos: str = "store",
+             batch_size: int = 1000, log=print, year: int = DATASET_YEAR) -> Dataset:
+    """Create a dataset of `size` through `client` (photos: store, inline or none)"""
+    rng = random.Random(seed)
+    new_id = lambda: str(uuid.UUID(int=rng.getrandbits(128), version=4))
+    counts = {}
+    writer = Writer(client, batch_size, counts)
+    this_year = year
+
+    def step(label):
+        writer.flush()
+        log(f"  ✅ {label()}")
+
+    # ----------------------------------------------------------- reference data
+    campuses = [{"id": new_id(), "name": f"SUP'INTER {CAMPUS_NAMES[i % len(CAMPUS_NAMES)]}" + (f" {i // len(CAMPUS_NAMES) + 1}" if i >= len(CAMPUS_NAMES) else ""),
+                 "address": f"{rng.randrange(1, 300)} boulevard Latrille", "phone": f"27 22 {rng.randrange(10, 99)} {rng.randrange(10, 99)} {rng.randrange(10, 99)}"}
+                for i in range(size.campuses)]
+    for c in campuses:
+        writer.add("campuses", c)
+
+    years = []
+    for i in range(size.academic_years):
+        start = this_year - size.academic_years + i
+        years.append({"id": new_id(), "name": f"{start}-{start + 1}", "start_date": f"{start}-10-01",
+                      "end_date": f"{start + 1}-07-31", "is_active": i == size.academic_years - 1})
+    for y in years:
+        writer.add("academic_years", y)
+    active_year = years[-1]
+
+    formations = [{"id": new_id(), "name": code, "code": code} for code in FORMATION_TYPES]
+    levels = [{"id": new_id(), "name": name, "order": i + 1} for i, name in enumerate(LEVELS)]
+    level_by_name = {l["name"]: l for l in levels}
+    filieres = [{"id": new_id(), "name": name, "code": code}
+                for name, code in (FILIERE_NAMES[i % len(FILIERE_NAMES)] for i in range(size.filieres))]
+    for i, f in enumerate(filieres):
+        if i >= len(FILIERE_NAMES):
+            f["code"] = f"{f['code']}{i // len(FILIERE_NAMES) + 1}"
+            f["name"] = f"{f['name']} {i // len(FILIERE_NAMES) + 1}"
+    for table, rows in (("formations", formations), ("levels", levels), ("filieres", filieres)):
+        for row in rows:
+            writer.add(table, row)
+    writer.flush()
+    # Every filière is taught in one to three formations
+    tracks = []
+    for f in filieres:
+        for formation in rng.sample(formations, rng.randint(1, 3)):
+            writer.add("filiere_formations", {"filiere_id": f["id"], "formation_id": formation["id"]})
+            tracks.extend((formation, f, level_by_name[name]) for name in FORMATION_LEVELS[formation["code"]])
+    step(lambda: f"Référentiel : {len(campuses)} campus, {len(years)} années, {len(filieres)} filières, {len(tracks)} parcours")
+
+    subjects_by_track = {}
+    for formation, filiere, level in tracks:
+        names = rng.sample(SUBJECT_NAMES, min(size.subjects_per_class, len(SUBJECT_NAMES)))
+        subjects = [{"id": new_id(), "name": name, "code": f"{filiere['code']}-{level['order']}{k:02d}",
+                     "credits": rng.choice([2, 3, 4, 6]), "coefficient": rng.choice([1.0, 1.5, 2.0, 3.0]),
+                     "formation_id": formation["id"], "filiere_id": filiere["id"], "level_id": level["id"]}
+                    for k, name in enumerate(names)]
+        subjects_by_track[(formation["id"], filiere["id"], level["id"])] = subjects
+        for s in subjects:
+            writer.add("subjects", s)
+
+    classes = []
+    for campus in campuses:
+        for year in years:
+            for formation, filiere, level in tracks:
+                classes.append({"id": new_id(), "name": f"{formation['code']} {filiere['code']} {level['order']}",
+                                "code": f"{formation['code']}-{filiere['code']}-{level['order']}",
+                                "formation_id": formation["id"], "filiere_id": filiere["id"], "level_id": level["id"],
+                                "campus_id": campus["id"], "academic_year_id": year["id"]})
+    for c in classes:
+        writer.add("classes", c)
+    step(lambda: f"{counts.get('subjects', 0)} matières, {len(classes)} classes")
+
+    # -------------------------------------------------------------------- users
+    from supinter.auth import get_pwd_context
+    # One hash for everyone: bcrypt is the slow part of a login, not of a benchmark setup
+    hashed = get_pwd_context().hash(password)
+    users = [{"id": new_id(), "email": "fondateur@supinter.ci", "name": "Fondateur", "role": UserRole.FOUNDER, "campus_id": campuses[0]["id"]}]
+    for i, campus in enumerate(campuses):
+        for role, label in ((UserRole.DIRECTOR, "directeur"), (UserRole.ACCOUNTANT, "comptable"), (UserRole.SECRETARY, "secretaire"), (UserRole.IT, "informatique")):
+            users.append({"id": new_id(), "email": f"{label}{i + 1}@supinter.ci", "name": f"{label.capitalize()} {campus['name']}",
+                          "role": role, "campus_id": campus["id"]})
+    for u in users:
+        writer.add("users", {**u, "password": hashed})
+    step(lambda: f"{len(users)} utilisateurs (mot de passe : {password})")
+
+    # ---------------------------------------------------------------- students
+    photo_values = []
+    if photos != "none" and size.photos:
+        blobs = [make_photo(rng) for _ in range(size.photos)]
+        if photos == "store":
+            from photo_store import photo_store
+            photo_values = [photo_store.put(blob) for blob in blobs]
+        else:
+            photo_values = [f"data:image/jpeg;base64,{base64.b64encode(blob).decode()}" for blob in blobs]
+
+    active_classes = [c for c in classes if c["academic_year_id"] == active_year["id"]]
+    formation_code = {f["id"]: f["code"] for f in formations}
+    students = []
+    for i in range(size.students):
+        cls = rng.choice(active_classes)
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        exonerated = rng.random() < 0.05
+        students.append({
+            "id": new_id(), "matricule": f"ESI{this_year}{str(i + 1).zfill(4)}", "permanent_id": f"CI{rng.randrange(10**9):09d}",
+            "photo": rng.choice(photo_values) if photo_values and rng.random() < size.photo_ratio else None,
+            "matricule_bac": f"BAC{rng.randrange(10**7):07d}", "numero_table_bac": f"{rng.randrange(10**6):06d}",
+            "campus_id": cls["campus_id"], "academic_year_id": cls["academic_year_id"], "formation_id": cls["formation_id"],
+            "filiere_id": cls["filiere_id"], "level_id": cls["level_id"], "class_id": cls["id"],
+            "status": StudentStatus.AFFECTE if rng.random() < 0.6 else StudentStatus.NON_AFFECTE,
+            "first_name": first, "last_name": last,
+            "birth_date": (date(this_year - 19, 1, 1) - timedelta(days=rng.randrange(365 * 8))).isoformat(),
+            "birth_place": rng.choice(BIRTH_PLACES), "gender": rng.choice(["M", "F"]),
+            "phone": f"07 {rng.randrange(10, 99)} {rng.randrange(10, 99)} {rng.randrange(10, 99)} {rng.randrange(10, 99)}",
+            "email": f"{first.lower()}.{last.lower()}{i}@etudiant.supinter.ci".replace("'", ""),
+            "emergency_contact_name": f"{rng.choice(FIRST_NAMES)} {last}",
+            "emergency_contact_phone": f"05 {rng.randrange(10, 99)} {rng.randrange(10, 99)} {rng.randrange(10, 99)} {rng.randrange(10, 99)}",
+            "tuition_amount": 0 if exonerated else TUITION[formation_code[cls["formation_id"]]],
+            "tuition_paid": 0, "is_exonerated": exonerated,
+        })
+
+    # Tuition payments are drawn first so tuition_paid matches them exactly
+    payers = [s for s in students if not s["is_exonerated"]]
+    transactions = []
+    for _ in range(size.transactions):
+        day = date.fromisoformat(active_year["start_date"]) + timedelta(days=rng.randrange(300))
+        kind = rng.random()
+        row = {"id": new_id(), "date": day.isoformat(), "academic_year_id": active_year["id"],
+               "created_at": f"{day.isoformat()}T{rng.randrange(8, 18):02d}:{rng.randrange(60):02d}:00"}
+        if kind < 0.7 and payers:
+            student = rng.choice(payers)
+            amount = float(rng.choice([25000, 50000, 75000, 100000, 150000]))
+            student["tuition_paid"] += amount
+            row.update(type="INCOME", category="Scolarité", amount=amount, student_id=student["id"], campus_id=student["campus_id"],
+                       description=f"Versement scolarité {student['first_name']} {student['last_name']}")
+        elif kind < 0.8 and students:
+            student = rng.choice(students)
+            row.update(type="INCOME", category=rng.choice(OTHER_INCOME_CATEGORIES), amount=float(rng.choice([10000, 25000])),
+                       student_id=student["id"], campus_id=student["campus_id"], description="Frais annexes")
+        else:
+            row.update(type="EXPENSE", category=rng.choice(EXPENSE_CATEGORIES), amount=float(rng.randrange(50, 2000) * 1000),
+                       student_id=None, campus_id=rng.choice(campuses)["id"], description="Dépense de fonctionnement")
+        transactions.append(row)
+
+    for s in students:
+        writer.add("students", s)
+    step(lambda: f"{len(students)} étudiants ({sum(1 for s in students if s['photo'])} avec photo, mode {photos})")
+    for t in transactions:
+        writer.add("transactions", t)
+    step(lambda: f"{len(transactions)} transactions")
+
+    # ------------------------------------------------------- grades, absences
+    for s in students:
+        subjects = subjects_by_track[(s["formation_id"], s["filiere_id"], s["level_id"])]
+        for k in range(size.grades_per_student):
+            writer.add("grades", {"id": new_id(), "student_id": s["id"], "subject_id": subjects[k % len(subjects)]["id"],
+                                  "semester": 1 + (k // len(subjects)) % 2, "academic_year_id": s["academic_year_id"],
+                                  "value": round(min(max(rng.gauss(11.5, 3.5), 0), 20), 2)})
+    step(lambda: f"{counts.get('grades', 0)} notes")
+
+    start = date.fromisoformat(active_year["start_date"])
+    for s in students:
+        for _ in range(int(size.absences_per_student) + (rng.random() < size.absences_per_student % 1)):
+            writer.add("student_absences", {"id": new_id(), "student_id": s["id"], "academic_year_id": s["academic_year_id"],
+                                            "date": (start + timedelta(days=rng.randrange(250))).isoformat(),
+                                            "hours": float(rng.choice([1, 2, 2, 4, 8])), "reason": rng.choice([None, "Maladie", "Retard", "Familial"])})
+        if rng.random() < size.archives_per_student:
+            writer.add("archives", {"id": new_id(), "document_type": rng.choice(DOCUMENT_TYPES), "student_id": s["id"],
+                                    "academic_year_id": s["academic_year_id"], "campus_id": s["campus_id"],
+                                    "downloaded_by": "secretaire@supinter.ci"})
+    step(lambda: f"{counts.get('student_absences', 0)} absences, {counts.get('archives', 0)} archives")
+
+    # ---------------------------------------------------- professors and staff
+    professors = []
+    for campus in campuses:
+        for _ in range(size.professors_per_campus):
+            professors.append({"id": new_id(), "first_name": rng.choice(FIRST_NAMES), "last_name": rng.choice(LAST_NAMES),
+                               "phone": f"01 {rng.randrange(10, 99)} {rng.randrange(10, 99)} {rng.randrange(10, 99)} {rng.randrange(10, 99)}",
+                               "email": None, "specialty": rng.choice(SUBJECT_NAMES), "campus_id": campus["id"]})
+        for _ in range(size.staff_per_campus):
+            writer.add("staff", {"id": new_id(), "first_name": rng.choice(FIRST_NAMES), "last_name": rng.choice(LAST_NAMES),
+                                 "birth_date": (date(this_year - 30, 1, 1) - timedelta(days=rng.randrange(365 * 25))).isoformat(),
+                                 "birth_place": rng.choice(BIRTH_PLACES), "function": rng.choice(STAFF_FUNCTIONS),
+                                 "phone": None, "campus_id": campus["id"], "academic_year_id": active_year["id"], "photo": None})
+    # Professors are written before the hours that reference them
+    for professor in professors:
+        writer.add("professors", professor)
+    writer.flush("professors")
+    for professor in professors:
+        campus_classes = [c for c in active_classes if c["campus_id"] == professor["campus_id"]]
+        for _ in range(size.hours_per_professor if campus_classes else 0):
+            cls = rng.choice(campus_classes)
+            planned, done = float(rng.choice([30, 45, 60])), float(rng.choice([2, 3, 4]))
+            hour = rng.randrange(8, 16)
+            writer.add("professor_hours", {
+                "id": new_id(), "professor_id": professor["id"], "academic_year_id": cls["academic_year_id"],
+                "formation_id": cls["formation_id"], "filiere_id": cls["filiere_id"], "level_id": cls["level_id"],
+                "class_id": cls["id"], "total_hours_planned": planned, "total_hours_done": done, "hours_remaining": planned - done,
+                "date": (start + timedelta(days=rng.randrange(250))).isoformat(),
+                "start_time": f"{hour:02d}:00", "end_time": f"{hour + int(done):02d}:00", "hours_done": done,
+            })
+    step(lambda: f"{counts.get('professors', 0)} professeurs, {counts.get('professor_hours', 0)} heures, {counts.get('staff', 0)} membres du personnel")
+
+    return Dataset(seed=seed, size=size, password=password,
+                   users=[{k: u[k] for k in ("email", "role", "campus_id")} for u in users], counts=counts,
+                   campus_ids=[c["id"] for c in campuses], active_year_id=active_year["id"],
+                   class_ids=[c["id"] for c in active_classes], student_ids=[s["id"] for s in students])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génération d'un jeu de données synthétique")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small", help="Tailles de départ")
+    for field in fields(DatasetSize):
+        parser.add_argument(f"--{field.name.replace('_', '-')}", type=field.type,
+                            default=None, help=f"Remplace la valeur du preset pour {field.name}")
+    parser.add_argument("--seed", type=int, default=42, help="Graine (mêmes données à chaque exécution)")
+    parser.add_argument("--year", type=int, default=DATASET_YEAR, help="Année civile de l'école générée (fin de l'année académique active)")
+    parser.add_argument("--password", default="password", help="Mot de passe de tous les utilisateurs")
+    parser.add_argument("--photo-mode", choices=["store", "inline", "none"], default="store",
+                        help="Photos dans le photo store (hash), en base64 dans la ligne, ou aucune")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Lignes par insertion")
+    parser.add_argument("--reset", action="store_true", help="Vider la base avant (backend SQLite uniquement)")
+    args = parser.parse_args()
+
+    from supinter.db import supabase
+    from supinter.storage import SQLiteBackend
+
+    size = replace(PRESETS[args.preset], **{f.name: getattr(args, f.name) for f in fields(DatasetSize) if getattr(args, f.name) is not None})
+    print(f"\n🏗️  Génération du jeu de données ({args.preset}, graine {args.seed}) vers {os.environ['SUPABASE_URL']}\n")
+    if args.reset:
+        if not isinstance(supabase.backend, SQLiteBackend):
+            print("❌ --reset n'est possible qu'avec le backend SQLite (SUPABASE_URL=sqlite://...)")
+            return 1
+        supabase.backend.reset()
+        print("  🗑️  Base vidée")
+
+    started = time.perf_counter()
+    dataset = generate(supabase, size, seed=args.seed, password=args.password, photos=args.photo_mode, batch_size=args.batch_size,
+                       year=args.year)
+    elapsed = time.perf_counter() - started
+    total = sum(dataset.counts.values())
+    print(f"\n🎉 {total} lignes en {elapsed:.1f}s ({total / elapsed:.0f} lignes/s)")
+    for table, count in sorted(dataset.counts.items()):
+        print(f"   {table:<20} {count:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Benchmark: hot routes against a local stand-in backend, with upstream budgets
+
+Generates a dataset (benchmarks.dataset) in an in-memory SQLite backend,
+adds a fixed latency to every upstream call, then replays each hot route and
+reports p50/p95/p99, requests per second, upstream calls per request and the
+peak memory allocated while serving it. Caches are off by default so every
+request pays its real upstream cost: an N+1 shows up as calls × latency.
+
+The run fails (exit code 1) when a route makes more upstream calls than in
+the stored baseline, or gets slower / heavier than baseline × (1 + tolerance).
+
+    cd backend && python -m benchmarks.endpoints --latency-ms 5
+    cd backend && python -m benchmarks.endpoints --update-baseline
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+# The stand-in backend is wired below whatever SUPABASE_URL says: never
+# benchmark (and write grades) against a real project by accident
+os.environ["SUPABASE_URL"] = "sqlite://"
+os.environ.setdefault("SUPABASE_ANON_KEY", "benchmark")
+os.environ.setdefault("PHOTO_STORE_DIR", tempfile.mkdtemp(prefix="supinter-bench-photos-"))
+COLD_CACHES = {"READ_CACHE_ENABLED": "false", "SHARED_CACHE": "false", "USER_CACHE_TTL": "0", "DASHBOARD_SNAPSHOT_TTL": "0"}
+
+BASELINE_PATH = Path(__file__).parent / "endpoints_baseline.json"
+
+
+@dataclass
+class Case:
+    name: str
+    # (http client, context, iteration) -> responses of the requests making one operation
+    run: Callable
+
+
+def login(http, ctx, i):
+    return [http.post("/api/auth/login", json={"email": ctx["email"], "password": ctx["password"]})]
+
+
+def save_grade(http, ctx, i):
+    """What a teacher does per grade: enter it, then correct it"""
+    grade = {"student_id": ctx["student_id"], "subject_id": ctx["subject_id"], "semester": 1,
+             "academic_year_id": ctx["academic_year_id"], "value": 12.0}
+    created = http.post("/api/grades", headers=ctx["headers"], json=grade)
+    updated = http.put(f"/api/grades/{created.json()['id']}", headers=ctx["headers"], json={**grade, "value": 13.5})
+    return [created, updated]
+
+
+def get(path: str):
+    return lambda http, ctx, i: [http.get(path.format(**ctx), headers=ctx["headers"])]
+
+
+CASES = [
+    Case("POST /auth/login", login),
+    Case("GET /students?class_id", get("/api/students?class_id={class_id}")),
+    Case("GET /students?search", get("/api/students?campus_id={campus_id}&search=Ko")),
+    Case("GET /students/{id}", get("/api/students/{student_id}")),
+    Case("GET /classes", get("/api/classes?academic_year_id={academic_year_id}&campus_id={campus_id}")),
+    Case("GET /grades", get("/api/grades?student_id={student_id}")),
+    Case("GET /transactions", get("/api/transactions?campus_id={campus_id}&academic_year_id={academic_year_id}&month={month}")),
+    Case("GET /dashboard/stats", get("/api/dashboard/stats?academic_year_id={academic_year_id}")),
+    Case("GET /finance/arrears", get("/api/finance/arrears?academic_year_id={academic_year_id}&campus_id={campus_id}")),
+    Case("grade save (POST+PUT /grades)", save_grade),
+]
+
+
+def percentile(timings: list, p: int) -> float:
+    return statistics.quantiles(timings, n=100, method="inclusive")[p - 1] if len(timings) > 1 else timings[0]
+
+
+def measure(case: Case, http, ctx: dict, requests: int, warmup: int, memory_samples: int) -> dict:
+    for i in range(warmup):
+        case.run(http, ctx, i)
+    timings, calls = [], []
+    for i in range(requests):
+        started = time.perf_counter()
+        responses = case.run(http, ctx, i)
+        timings.append(time.perf_counter() - started)
+        for r in responses:
+            assert r.status_code < 400, f"{case.name}: {r.status_code} {r.text[:200]}"
+        calls.append(sum(int(r.headers["x-upstream-calls"]) for r in responses))
+    # Separate pass: tracemalloc slows allocations down
+    tracemalloc.start()
+    peak = 0
+    for i in range(memory_samples):
+        tracemalloc.reset_peak()
+        case.run(http, ctx, i)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+    return {
+        "p50_ms": round(percentile(timings, 50) * 1000, 2),
+        "p95_ms": round(percentile(timings, 95) * 1000, 2),
+        "p99_ms": round(percentile(timings, 99) * 1000, 2),
+        "rps": round(len(timings) / sum(timings), 1),
+        "upstream_calls": max(calls),
+        "peak_kb": round(peak / 1024),
+    }
+
+
+def setup(preset: str, seed: int, latency: float):
+    """Stand-in backend with a generated dataset, an app client and the request context"""
+    from fastapi.testclient import TestClient
+    from benchmarks.dataset import PRESETS, generate
+    from supinter import db
+    from supinter.app import create_app
+    from supinter.storage import LatencyBackend, SQLiteBackend
+
+    sqlite = SQLiteBackend()
+    db.supabase.backend = sqlite
+    dataset = generate(db.supabase, PRESETS[preset], seed=seed, log=lambda _: None)
+    director = next(u for u in dataset.users if u["role"] == "director")
+    ctx = {"email": director["email"], "password": dataset.password, "campus_id": director["campus_id"],
+           "academic_year_id": dataset.active_year_id}
+    student = db.supabase.table('students').select('*').eq('campus_id', ctx["campus_id"]).limit(1).execute().data[0]
+    subject = db.supabase.table('subjects').select('id').eq('formation_id', student["formation_id"]) \
+        .eq('filiere_id', student["filiere_id"]).eq('level_id', student["level_id"]).limit(1).execute().data[0]
+    payment = db.supabase.table('transactions').select('date').eq('campus_id', ctx["campus_id"]).limit(1).execute().data[0]
+    ctx.update(student_id=student["id"], class_id=student["class_id"], subject_id=subject["id"],
+               month=int(payment["date"][5:7]))
+
+    # Latency applies to the routes only, not to the dataset generation
+    backend = LatencyBackend(sqlite, latency)
+    db.supabase.backend = backend
+    http = TestClient(create_app())
+    # One log line per request would drown the report
+    logging.disable(logging.INFO)
+    token = login(http, ctx, 0)[0].json()["access_token"]
+    ctx["headers"] = {"Authorization": f"Bearer {token}"}
+    return http, ctx
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Regressions against the baseline (upstream calls must not grow at all)"""
+    failures = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if result["upstream_calls"] > reference["upstream_calls"]:
+            failures.append(f"{name}: {result['upstream_calls']} appels upstream (référence {reference['upstream_calls']})")
+        for key, unit in (("p95_ms", "ms"), ("peak_kb", "KB")):
+            # A small absolute slack keeps sub-millisecond noise from failing a run
+            limit = reference[key] * (1 + tolerance) + (2 if key == "p95_ms" else 64)
+            if result[key] > limit:
+                failures.append(f"{name}: {key} {result[key]}{unit} > {limit:.0f}{unit} (référence {reference[key]}{unit})")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des routes principales")
+    parser.add_argument("--preset", default="small", help="Taille du jeu de données (voir benchmarks.dataset)")
+    parser.add_argument("--seed", type=int, default=42, help="Graine du jeu de données")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Latence ajoutée à chaque appel upstream")
+    parser.add_argument("--requests", type=int, default=10, help="Requêtes mesurées par route")
+    parser.add_argument("--warmup", type=int, default=1, help="Requêtes de chauffe par route")
+    parser.add_argument("--memory-samples", type=int, default=1, help="Requêtes mesurées sous tracemalloc")
+    parser.add_argument("--routes", default="", help="Filtre sur le nom des routes (ex: students,grades)")
+    parser.add_argument("--warm-caches", action="store_true", help="Garder les caches (mesure en régime établi)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Fichier de référence")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Dégradation tolérée de p95 et mémoire (0.5 = +50%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="Enregistrer les résultats comme référence")
+    args = parser.parse_args()
+
+    if not args.warm_caches:
+        os.environ.update(COLD_CACHES)
+    settings = {"preset": args.preset, "seed": args.seed, "latency_ms": args.latency_ms, "warm_caches": args.warm_caches}
+    print(f"\n⏱️  Jeu {args.preset} (graine {args.seed}), {args.latency_ms} ms par appel upstream, "
+          f"caches {'actifs' if args.warm_caches else 'désactivés'}\n")
+    http, ctx = setup(args.preset, args.seed, args.latency_ms / 1000)
+
+    filters = [f for f in args.routes.split(",") if f]
+    cases = [c for c in CASES if not filters or any(f in c.name for f in filters)]
+    print(f"{'route':<32} {'p50':>8} {'p95':>8} {'p99':>8} {'req/s':>8} {'upstream':>9} {'mémoire':>9}")
+    results = {}
+    for case in cases:
+        r = results[case.name] = measure(case, http, ctx, args.requests, args.warmup, args.memory_samples)
+        print(f"{case.name:<32} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['rps']:>8.1f} "
+              f"{r['upstream_calls']:>9} {r['peak_kb']:>7}KB")
+
+    if args.update_baseline:
+        stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        routes = {**stored.get("routes", {}), **results} if stored.get("settings") == settings else results
+        args.baseline.write_text(json.dumps({"settings": settings, "routes": routes}, indent=2, ensure_ascii=False) + "\n")
+        print(f"\n💾 Référence enregistrée dans {args.baseline}\n")
+        return 0
+    if not args.baseline.exists():
+        print(f"\n⚠️  Pas de référence ({args.baseline}) : lancer avec --update-baseline\n")
+        return 0
+    baseline = json.loads(args.baseline.read_text())
+    if baseline["settings"] != settings:
+        print(f"\n⚠️  Référence mesurée avec d'autres paramètres ({baseline['settings']}) : comparaison ignorée\n")
+        return 0
+    failures = compare(results, baseline["routes"], args.tolerance)
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        print(f"\n❌ {len(failures)} régression(s) par rapport à la référence\n")
+        return 1
+    print("\n✅ Aucune régression par rapport à la référence\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
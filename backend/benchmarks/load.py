@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Load test: registration week and grading day, at configurable concurrency
+
+Generates a dataset (benchmarks.dataset) in a SQLite file, serves it with
+Gunicorn (gunicorn.conf.py, several workers, STORAGE_LATENCY_MS per
+upstream call) and replays a mixed workload with concurrent virtual users:
+
+- inscriptions: secretaries register students, cashiers record tuition
+  payments (a few students pay at several windows at once), class lists
+- notes: grades entered and corrected, directors opening bulletins
+- mixte: both at the same time
+
+Reports throughput and p50/p95/p99 per operation, then checks the data:
+no duplicate matricule, and every student's tuition_paid still equals the
+sum of their tuition payments (no lost update). Exit code 1 if a check fails.
+
+    cd backend && python -m benchmarks.load --scenario inscriptions --concurrency 32 --workers 4 --duration 30
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import date
+from pathlib import Path
+
+os.environ.setdefault("SUPABASE_URL", "sqlite://")
+os.environ.setdefault("SUPABASE_ANON_KEY", "load-test")
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+
+# ------------------------------------------------------------------ operations
+async def register(http, state, rng):
+    campus = rng.choice(state["campuses"])
+    cls = rng.choice(campus["classes"])
+    n = rng.randrange(10**6)
+    response = await http.post("/api/students", headers=campus["secretary"], json={
+        "permanent_id": f"LT{n:06d}", "first_name": "Charge", "last_name": f"Test{n}", "birth_date": "2006-01-15",
+        "birth_place": "Abidjan", "gender": rng.choice(["M", "F"]), "phone": "0700000000", "tuition_amount": 450000,
+        "campus_id": campus["id"], "academic_year_id": cls["academic_year_id"], "formation_id": cls["formation_id"],
+        "filiere_id": cls["filiere_id"], "level_id": cls["level_id"], "class_id": cls["id"],
+    })
+    if response.status_code == 200:
+        campus["students"].append(response.json())
+    return response.status_code
+
+
+async def pay(http, state, rng):
+    campus = rng.choice(state["campuses"])
+    # Most payments go to the few students queuing at every window
+    student = rng.choice(campus["hot"] if rng.random() < state["hot_share"] else campus["students"])
+    response = await http.post("/api/transactions", headers=campus["accountant"], json={
+        "date": date.today().isoformat(), "type": "INCOME", "category": "Scolarité", "amount": 25000,
+        "description": "Versement (test de charge)", "student_id": student["id"], "campus_id": campus["id"],
+        "academic_year_id": state["academic_year_id"],
+    })
+    return response.status_code
+
+
+async def browse(http, state, rng):
+    campus = rng.choice(state["campuses"])
+    response = await http.get("/api/students", headers=campus["secretary"], params={"class_id": rng.choice(campus["classes"])["id"]})
+    return response.status_code
+
+
+async def grade(http, state, rng):
+    campus = rng.choice(state["campuses"])
+    student = rng.choice(campus["students"])
+    subjects = state["subjects"].get((student["formation_id"], student["filiere_id"], student["level_id"]))
+    if not subjects:
+        return await bulletin(http, state, rng)
+    response = await http.post("/api/grades", headers=campus["director"], json={
+        "student_id": student["id"], "subject_id": rng.choice(subjects), "semester": 2,
+        "academic_year_id": student["academic_year_id"], "value": round(rng.uniform(0, 20), 2),
+    })
+    if response.status_code == 200:
+        campus["grades"].append(response.json())
+    return response.status_code
+
+
+async def correct(http, state, rng):
+    campus = rng.choice(state["campuses"])
+    if not campus["grades"]:
+        return await grade(http, state, rng)
+    g = rng.choice(campus["grades"])
+    response = await http.put(f"/api/grades/{g['id']}", headers=campus["director"], json={
+        "student_id": g["student_id"], "subject_id": g["subject_id"], "semester": g["semester"],
+        "academic_year_id": g["academic_year_id"], "value": round(rng.uniform(0, 20), 2),
+    })
+    return response.status_code
+
+
+async def bulletin(http, state, rng):
+    campus = rng.choice(state["campuses"])
+    student = rng.choice(campus["students"])
+    statuses = [(await http.get(path, headers=campus["director"], params=params)).status_code for path, params in (
+        (f"/api/students/{student['id']}", None), ("/api/grades", {"student_id": student["id"]}))]
+    return max(statuses)
+
+
+SCENARIOS = {
+    "inscriptions": [("inscription", register, 35), ("paiement", pay, 45), ("liste de classe", browse, 20)],
+    "notes": [("saisie de note", grade, 60), ("correction", correct, 15), ("bulletin", bulletin, 25)],
+}
+SCENARIOS["mixte"] = SCENARIOS["inscriptions"] + SCENARIOS["notes"]
+
+
+# ---------------------------------------------------------------------- runner
+class Stats:
+    """Latencies and statuses per operation"""
+    def __init__(self):
+        self.timings = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    def add(self, name: str, seconds: float, status: int):
+        self.timings[name].append(seconds)
+        self.statuses[name][status] += 1
+
+
+async def virtual_user(vu: int, http, state: dict, operations: list, deadline: float, stats: Stats, seed: int):
+    rng = random.Random(seed * 10007 + vu)
+    names, functions, weights = zip(*operations)
+    while time.monotonic() < deadline:
+        i = rng.choices(range(len(names)), weights)[0]
+        started = time.perf_counter()
+        try:
+            status = await functions[i](http, state, rng)
+        except Exception:
+            # Timeouts and dropped connections (uvicorn closes a keep-alive
+            # connection after an unhandled 500)
+            status = 0
+        stats.add(names[i], time.perf_counter() - started, status)
+
+
+async def run_load(base_url: str, state: dict, operations: list, concurrency: int, duration: float, seed: int) -> tuple:
+    import httpx
+
+    stats = Stats()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as http:
+        for campus in state["campuses"]:
+            for role, email in campus.pop("emails").items():
+                response = await http.post("/api/auth/login", json={"email": email, "password": state["password"]})
+                campus[role] = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        started = time.monotonic()
+        await asyncio.gather(*[virtual_user(vu, http, state, operations, started + duration, stats, seed)
+                               for vu in range(concurrency)])
+        return stats, time.monotonic() - started
+
+
+def load_state(client, dataset, hot_students: int, hot_share: float) -> dict:
+    """What the virtual users pick from: campuses, their accounts, classes and students"""
+    students = client.table('students').select('*').no_cache().execute().data
+    classes = client.table('classes').select('*').eq('academic_year_id', dataset.active_year_id).no_cache().execute().data
+    subjects = defaultdict(list)
+    for s in client.table('subjects').select('id, formation_id, filiere_id, level_id').no_cache().execute().data:
+        subjects[(s["formation_id"], s["filiere_id"], s["level_id"])].append(s["id"])
+    campuses = []
+    for campus_id in dataset.campus_ids:
+        accounts = {u["role"]: u["email"] for u in dataset.users if u["campus_id"] == campus_id}
+        campus_students = [s for s in students if s["campus_id"] == campus_id and not s["is_exonerated"]]
+        campuses.append({
+            "id": campus_id, "classes": [c for c in classes if c["campus_id"] == campus_id],
+            "students": campus_students, "hot": campus_students[:hot_students], "grades": [],
+            "emails": {"secretary": accounts["secretary"], "accountant": accounts["accountant"], "director": accounts["director"]},
+        })
+    return {"campuses": campuses, "subjects": subjects, "academic_year_id": dataset.active_year_id,
+            "password": dataset.password, "hot_share": hot_share}
+
+
+def check_consistency(client) -> list:
+    """Data invariants the workload must not break"""
+    problems = []
+    students = client.table('students').select('id, matricule, tuition_paid').no_cache().execute().data
+    duplicates = {m: n for m, n in Counter(s["matricule"] for s in students).items() if n > 1}
+    if duplicates:
+        problems.append(f"{len(duplicates)} matricule(s) en double (ex: {next(iter(duplicates))})")
+    paid = defaultdict(float)
+    payments = client.table('transactions').select('student_id, amount').eq('type', 'INCOME') \
+        .eq('category', 'Scolarité').no_cache().execute().data
+    for p in payments:
+        if p["student_id"]:
+            paid[p["student_id"]] += p["amount"]
+    lost = [(s, paid[s["id"]] - (s["tuition_paid"] or 0)) for s in students if abs(paid[s["id"]] - (s["tuition_paid"] or 0)) > 0.005]
+    if lost:
+        problems.append(f"tuition_paid faux pour {len(lost)} étudiant(s) : {sum(d for _, d in lost):,.0f} FCFA de versements perdus")
+    return problems
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(database: Path, workers: int, latency_ms: float, workdir: Path) -> tuple:
+    port = free_port()
+    env = {**os.environ, "SUPABASE_URL": f"sqlite:///{database}", "STORAGE_LATENCY_MS": str(latency_ms),
+           "WEB_CONCURRENCY": str(workers), "BIND": f"127.0.0.1:{port}",
+           "SHARED_CACHE_PATH": str(workdir / "shared-cache.sqlite"), "PHOTO_STORE_DIR": str(workdir / "photos"),
+           "JOB_DIR": str(workdir / "jobs")}
+    log = open(workdir / "server.log", "w")
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "server:app"],
+                              cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=log)
+    import httpx
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            break
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/api/health", timeout=1).status_code == 200:
+                return server, f"http://127.0.0.1:{port}"
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"Le serveur n'a pas démarré, voir {workdir / 'server.log'}")
+
+
+def percentile(timings: list, p: int) -> float:
+    return statistics.quantiles(timings, n=100, method="inclusive")[p - 1] if len(timings) > 1 else timings[0]
+
+
+def report(stats: Stats, elapsed: float):
+    print(f"{'opération':<18} {'nombre':>8} {'erreurs':>8} {'op/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    total = errors = 0
+    for name, timings in stats.timings.items():
+        failed = sum(n for status, n in stats.statuses[name].items() if status == 0 or status >= 400)
+        total, errors = total + len(timings), errors + failed
+        print(f"{name:<18} {len(timings):>8} {failed:>8} {len(timings) / elapsed:>8.1f} "
+              f"{percentile(timings, 50) * 1000:>8.0f} {percentile(timings, 95) * 1000:>8.0f} {percentile(timings, 99) * 1000:>8.0f}")
+    print(f"{'total':<18} {total:>8} {errors:>8} {total / elapsed:>8.1f}   (latences en ms)")
+    for name, statuses in stats.statuses.items():
+        failures = {s: n for s, n in statuses.items() if s == 0 or s >= 400}
+        if failures:
+            print(f"   ⚠️  {name} : " + ", ".join(f"{n} x {s or 'connexion perdue'}" for s, n in sorted(failures.items())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge : inscriptions et saisie des notes")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixte", help="Charge rejouée")
+    parser.add_argument("--concurrency", type=int, default=16, help="Utilisateurs simultanés")
+    parser.add_argument("--duration", type=float, default=20, help="Durée de la charge (secondes)")
+    parser.add_argument("--workers", type=int, default=4, help="Workers Gunicorn")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Latence ajoutée à chaque appel upstream")
+    parser.add_argument("--preset", default="small", help="Taille du jeu de données (voir benchmarks.dataset)")
+    parser.add_argument("--seed", type=int, default=42, help="Graine du jeu de données et des utilisateurs")
+    parser.add_argument("--hot-students", type=int, default=5, help="Étudiants payant à plusieurs guichets à la fois, par campus")
+    parser.add_argument("--hot-share", type=float, default=0.5, help="Part des paiements pour ces étudiants")
+    parser.add_argument("--keep", action="store_true", help="Garder la base et le journal du serveur")
+    args = parser.parse_args()
+
+    from benchmarks.dataset import PRESETS, generate
+    from supinter.db import SupabaseClient
+    from supinter.storage import SQLiteBackend
+
+    workdir = Path(tempfile.mkdtemp(prefix="supinter-load-"))
+    database = workdir / "supinter.db"
+    print(f"\n🏗️  Jeu {args.preset} (graine {args.seed}) dans {database}")
+    os.environ["PHOTO_STORE_DIR"] = str(workdir / "photos")
+    client = SupabaseClient(f"sqlite:///{database}", "load-test", SQLiteBackend(str(database)))
+    dataset = generate(client, PRESETS[args.preset], seed=args.seed, photos="none", log=lambda _: None)
+    state = load_state(client, dataset, args.hot_students, args.hot_share)
+
+    print(f"🚀 Gunicorn : {args.workers} workers, {args.latency_ms} ms par appel upstream")
+    server, base_url = start_server(database, args.workers, args.latency_ms, workdir)
+    try:
+        print(f"🔥 Scénario {args.scenario} : {args.concurrency} utilisateurs pendant {args.duration:.0f}s\n")
+        stats, elapsed = asyncio.run(run_load(base_url, state, SCENARIOS[args.scenario], args.concurrency, args.duration, args.seed))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    report(stats, elapsed)
+
+    print("\n🔍 Vérifications")
+    problems = check_consistency(client)
+    for problem in problems:
+        print(f"  ❌ {problem}")
+    if not problems:
+        print("  ✅ Matricules uniques, tuition_paid égal à la somme des versements pour chaque étudiant")
+    if args.keep:
+        print(f"\n📁 Base et journal du serveur : {workdir}")
+    else:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print()
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
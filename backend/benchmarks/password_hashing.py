@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark: login throughput of the bcrypt pool by number of workers
+
+Runs a burst of concurrent password verifications (what `/auth/login` does
+per request) through PasswordHasher with 1, 2, 4 … up to the number of
+cores, and reports logins per second and the event-loop responsiveness
+while the burst runs.
+
+    cd backend && python -m benchmarks.password_hashing --logins 64
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_ANON_KEY", "benchmark")
+
+from supinter import auth  # noqa: E402
+
+
+async def loop_lag(stop: asyncio.Event) -> float:
+    """Worst delay of a 10 ms timer while the burst runs"""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        worst = max(worst, time.perf_counter() - start - 0.01)
+    return worst
+
+
+async def burst(workers: int, logins: int, hashed: str) -> tuple:
+    hasher = auth.PasswordHasher(workers)
+    stop = asyncio.Event()
+    lag = asyncio.create_task(loop_lag(stop))
+    start = time.perf_counter()
+    results = await asyncio.gather(*[hasher.verify_and_update("password", hashed) for _ in range(logins)])
+    elapsed = time.perf_counter() - start
+    stop.set()
+    hasher.executor.shutdown()
+    assert all(valid for valid, _ in results)
+    return logins / elapsed, await lag
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du hachage des mots de passe")
+    parser.add_argument("--logins", type=int, default=32, help="Connexions simultanées par mesure")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1, help="Nombre maximal de threads")
+    args = parser.parse_args()
+
+    hashed = auth.get_pwd_context().hash("password")
+    print(f"\nbcrypt rounds={auth.BCRYPT_ROUNDS}, {args.logins} connexions simultanées, {os.cpu_count()} cœurs\n")
+    print(f"{'threads':>8} {'connexions/s':>14} {'lag boucle (ms)':>16}")
+    workers = 1
+    while workers <= args.max_workers:
+        rate, lag = asyncio.run(burst(workers, args.logins, hashed))
+        print(f"{workers:>8} {rate:>14.1f} {lag * 1000:>16.1f}")
+        workers *= 2
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark: validated vs fast serialization of large list responses
+
+Compares, for `get_students` and `get_transactions`, the current path
+(one Pydantic model per row, FastAPI response_model validation, default JSON
+encoder) with the fast path (projection of trusted rows + orjson), plus the
+size of the body once compressed.
+
+    cd backend && python -m benchmarks.serialization --rows 5000
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import statistics
+import time
+import uuid
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_ANON_KEY", "benchmark")
+
+from fastapi import Response  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+
+import server  # noqa: E402
+from supinter.models import StudentResponse, TransactionResponse  # noqa: E402
+from supinter.responses import fast_response  # noqa: E402
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def student_rows(n: int) -> list:
+    ids = [str(uuid.uuid4()) for _ in range(6)]
+    return [{
+        "id": str(uuid.uuid4()), "matricule": f"ESI2026{i:05d}", "permanent_id": f"P{i:06d}",
+        "photo": "a" * 64, "matricule_bac": None, "numero_table_bac": None,
+        "campus_id": ids[0], "academic_year_id": ids[1], "formation_id": ids[2],
+        "filiere_id": ids[3], "level_id": ids[4], "class_id": ids[5],
+        "status": "affecté", "first_name": f"Prénom{i}", "last_name": f"Nom{i}",
+        "birth_date": "2004-05-17", "birth_place": "Abidjan", "gender": "M", "phone": "0700000000",
+        "email": f"etudiant{i}@example.com", "nationality": "Ivoirienne",
+        "emergency_contact_name": "Parent", "emergency_contact_phone": "0500000000",
+        "tuition_amount": 650000.0, "tuition_paid": 250000.0, "is_exonerated": False,
+        "created_at": "2026-09-01T08:00:00", "updated_at": "2026-09-01T08:00:00",
+        "formation_name": "BTS", "filiere_name": "Informatique", "level_name": "1ère Année",
+        "class_name": "BTS-INFO-1A", "campus_name": "Cocody", "academic_year_name": "2026-2027",
+    } for i in range(n)]
+
+
+def transaction_rows(n: int) -> list:
+    ids = [str(uuid.uuid4()) for _ in range(3)]
+    return [{
+        "id": str(uuid.uuid4()), "date": "2026-09-01", "type": "INCOME", "category": "Scolarité",
+        "amount": 50000.0, "description": f"Versement {i}", "student_id": ids[0],
+        "student_name": f"Prénom{i} Nom{i}", "campus_id": ids[1], "academic_year_id": ids[2],
+        "created_at": "2026-09-01T08:00:00", "updated_at": "2026-09-01T08:00:00",
+    } for i in range(n)]
+
+
+def route_field(path: str):
+    route = next(r for r in server.app.routes if getattr(r, "path", None) == path and "GET" in r.methods)
+    return route.secure_cloned_response_field
+
+
+def validated_path(model, field, rows: list) -> bytes:
+    result = [model(**r) for r in rows]
+    content = asyncio.run(serialize_response(field=field, response_content=result, is_coroutine=True))
+    return JSONResponse(content).body
+
+
+def fast_path(model, rows: list) -> bytes:
+    return fast_response(model, [dict(r) for r in rows], Response()).body
+
+
+def measure(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de sérialisation des listes")
+    parser.add_argument("--rows", type=int, default=5000, help="Nombre de lignes par réponse")
+    parser.add_argument("--repeat", type=int, default=7, help="Nombre de mesures (médiane)")
+    args = parser.parse_args()
+
+    cases = [
+        ("get_students", StudentResponse, "/api/students", student_rows(args.rows)),
+        ("get_transactions", TransactionResponse, "/api/transactions", transaction_rows(args.rows)),
+    ]
+    print(f"\n{args.rows} lignes, médiane de {args.repeat} mesures\n")
+    print(f"{'route':<18} {'validé (ms)':>12} {'rapide (ms)':>12} {'gain':>7} {'JSON':>9} {'gzip':>9} {'br':>9}")
+    for name, model, path, rows in cases:
+        field = route_field(path)
+        body = fast_path(model, rows)
+        # Both paths must produce the same document
+        assert json.loads(body) == json.loads(validated_path(model, field, rows)), name
+        slow = measure(lambda: validated_path(model, field, rows), args.repeat)
+        fast = measure(lambda: fast_path(model, rows), args.repeat)
+        gz = len(gzip.compress(body, 6))
+        br = len(brotli.compress(body, quality=4)) if brotli else 0
+        print(f"{name:<18} {slow:>12.1f} {fast:>12.1f} {slow / fast:>6.1f}x {len(body) // 1024:>7}KB {gz // 1024:>7}KB {br // 1024:>7}KB")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Negotiated response compression
+
+Large bodies (student lists, ledgers, exports) are compressed with the
+encoding the client prefers in Accept-Encoding (q-values honoured): brotli
+when it is accepted and the `brotli` package is installed, gzip otherwise.
+Streaming responses are compressed chunk by chunk, each chunk flushed so it
+can be decoded as it arrives. Bodies the app already encoded, and bodies
+smaller than `minimum_size`, are sent as they are.
+"""
+
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+def accepted_encodings(accept_encoding: str) -> dict:
+    """{coding: q} from an Accept-Encoding header (RFC 9110 12.5.3)"""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """The encoding to use ("br" or "gzip"), or None to send the body as is"""
+    accepted = accepted_encodings(accept_encoding)
+    available = ["br", "gzip"] if brotli is not None else ["gzip"]
+    # Codings not listed take the q of "*", if any; on a tie brotli wins
+    weights = {coding: accepted.get(coding, accepted.get("*", 0.0)) for coding in available}
+    best = max(available, key=lambda coding: weights[coding])
+    return best if weights[best] > 0 else None
+
+
+class GzipEncoder:
+    def __init__(self, level: int):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def process(self, data: bytes) -> bytes:
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush()
+
+
+class BrotliEncoder:
+    def __init__(self, quality: int):
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def process(self, data: bytes) -> bytes:
+        return self.compressor.process(data) + self.compressor.flush()
+
+    def finish(self) -> bytes:
+        return self.compressor.finish()
+
+
+class CompressionResponder:
+    """Send one response compressed with `encoder`, labelled `encoding`"""
+    def __init__(self, app: ASGIApp, encoding: str, encoder, minimum_size: int) -> None:
+        self.app = app
+        self.encoding = encoding
+        self.encoder = encoder
+        self.minimum_size = minimum_size
+        self.send: Send = None
+        self.initial_message: Message = {}
+        self.started = False
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk tells whether to compress
+            self.initial_message = message
+            self.passthrough = "content-encoding" in Headers(raw=message["headers"])
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not self.started:
+            self.started = True
+            if len(body) < self.minimum_size and not more_body:
+                self.passthrough = True
+            if not self.passthrough:
+                headers = MutableHeaders(raw=self.initial_message["headers"])
+                headers["Content-Encoding"] = self.encoding
+                headers.add_vary_header("Accept-Encoding")
+                body = self.encoder.process(body) + (b"" if more_body else self.encoder.finish())
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(body))
+            await self.send(self.initial_message)
+        elif not self.passthrough:
+            body = self.encoder.process(body) + (b"" if more_body else self.encoder.finish())
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+
+class CompressionMiddleware:
+    """Compress responses larger than `minimum_size` with brotli or gzip"""
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = negotiate(Headers(scope=scope).get("Accept-Encoding", "")) if scope["type"] == "http" else None
+        if encoding == "br":
+            await CompressionResponder(self.app, "br", BrotliEncoder(self.brotli_quality), self.minimum_size)(scope, receive, send)
+        elif encoding == "gzip":
+            await CompressionResponder(self.app, "gzip", GzipEncoder(self.gzip_level), self.minimum_size)(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
@@ -0,0 +1,44 @@
+"""
+Gunicorn configuration: several Uvicorn workers behind one master process
+
+    gunicorn -c gunicorn.conf.py server:app
+
+The workers share table versions and cached reads through shared_cache.py.
+`kill -HUP <master pid>` restarts the workers gracefully (in-flight requests
+finish first); with preload_app, deploying new code needs `kill -USR2`.
+"""
+
+import multiprocessing
+import os
+
+# Photos are files under PHOTO_STORE_DIR (rows only keep their hash). The
+# default, backend/photos, lives in the container and is lost on every
+# redeploy, so a production server refuses to start without a persistent one
+if not os.environ.get("PHOTO_STORE_DIR"):
+    raise SystemExit("PHOTO_STORE_DIR doit pointer vers un volume persistant (voir DEPLOYMENT_GUIDE.md)")
+
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+# Read by shared_cache.from_environment() in each worker
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = os.environ.get("BIND", f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+# A stopping worker first waits up to JOB_DRAIN_TIMEOUT for its background jobs
+# (exports, promotions, documents), so it must not be killed before that
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", int(float(os.environ.get("JOB_DRAIN_TIMEOUT", "120"))) + 30))
+keepalive = 5
+
+# Recycle workers periodically, staggered so they do not all restart together.
+# A recycled worker drains its background jobs before exiting (graceful_timeout)
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "5000"))
+max_requests_jitter = max_requests // 10
+
+# The master imports the app once and forks the workers, so a worker restart
+# costs a fork instead of a full import. Nothing started at import time
+# survives the fork badly: thread pools start their threads on first use,
+# the shared cache reconnects per process and the upstream probe starts with
+# each worker. Code changes then need a full restart (or USR2), not HUP.
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() == "true"
+accesslog = "-"
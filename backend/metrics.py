@@ -0,0 +1,163 @@
+"""
+Prometheus-format metrics
+
+Request latency per route, in-flight requests and upstream latency per table
+are kept in plain dicts by a small ASGI middleware (no client library, one
+lock and a bisect per observation). Other values (cache counters, bcrypt pool
+queue) are read from the objects that already keep them, at scrape time.
+
+With several workers, each worker periodically publishes its snapshot to the
+shared cache and /metrics renders all of them with a `worker` label.
+"""
+
+import bisect
+import threading
+import time
+from typing import Callable, Optional
+
+from upstream_trace import UpstreamCall, route_template
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Metrics:
+    """In-process metric store for one worker"""
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        # labels -> per-bucket counts (last one is +Inf) followed by the sum
+        self.requests = {}
+        self.upstream = {}
+        self.upstream_errors = {}
+        self.in_flight = 0
+        # Callables returning [(name, type, help, [(labels, value)])], run at scrape time
+        self.collectors = []
+
+    def _observe(self, histogram: dict, labels: tuple, seconds: float):
+        with self.lock:
+            series = histogram.get(labels)
+            if series is None:
+                series = histogram[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect.bisect_left(self.buckets, seconds)] += 1
+            series[-1] += seconds
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float):
+        self._observe(self.requests, (method, route, str(status)), seconds)
+
+    def observe_upstream(self, call: UpstreamCall):
+        """Listener for upstream_trace: latency per table, errors when no 2xx came back"""
+        self._observe(self.upstream, (call.table, call.method), call.duration_ms / 1000)
+        if not 200 <= call.status < 300:
+            with self.lock:
+                self.upstream_errors[(call.table,)] = self.upstream_errors.get((call.table,), 0) + 1
+
+    def add_collector(self, collector: Callable):
+        self.collectors.append(collector)
+
+    def snapshot(self) -> dict:
+        """JSON-serialisable state, as published to the shared cache"""
+        with self.lock:
+            histograms = {
+                "requests": [[list(k), list(v)] for k, v in self.requests.items()],
+                "upstream": [[list(k), list(v)] for k, v in self.upstream.items()],
+            }
+            upstream_errors = [[list(k), v] for k, v in self.upstream_errors.items()]
+        collected = []
+        for collector in self.collectors:
+            collected.extend([name, kind, help, [[labels, value] for labels, value in samples]]
+                             for name, kind, help, samples in collector())
+        return {
+            "buckets": list(self.buckets),
+            **histograms,
+            "upstream_errors": upstream_errors,
+            "in_flight": self.in_flight,
+            "collected": collected,
+        }
+
+
+def _labels(names: tuple, values, extra: dict) -> str:
+    pairs = list(extra.items()) + list(zip(names, values))
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def render(snapshots: list) -> str:
+    """Text exposition format for [(extra labels, snapshot)] pairs"""
+    families = {}
+
+    def family(name: str, kind: str, help: str) -> list:
+        if name not in families:
+            families[name] = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+        return families[name]
+
+    histograms = [
+        ("requests", "supinter_http_request_duration_seconds", "API request latency by route", ("method", "route", "status")),
+        ("upstream", "supinter_upstream_request_duration_seconds", "Supabase call latency by table", ("table", "method")),
+    ]
+    for extra, snapshot in snapshots:
+        bounds = [str(b) for b in snapshot["buckets"]] + ["+Inf"]
+        for key, name, help, label_names in histograms:
+            lines = family(name, "histogram", help)
+            for labels, series in snapshot[key]:
+                cumulative = 0
+                for bound, count in zip(bounds, series):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(label_names + ('le',), labels + [bound], extra)} {cumulative}")
+                lines.append(f"{name}_sum{_labels(label_names, labels, extra)} {series[-1]}")
+                lines.append(f"{name}_count{_labels(label_names, labels, extra)} {cumulative}")
+
+        lines = family("supinter_upstream_errors_total", "counter", "Supabase calls without a 2xx response")
+        for labels, value in snapshot["upstream_errors"]:
+            lines.append(f"supinter_upstream_errors_total{_labels(('table',), labels, extra)} {value}")
+
+        lines = family("supinter_http_requests_in_flight", "gauge", "Requests being served")
+        lines.append(f"supinter_http_requests_in_flight{_labels((), [], extra)} {snapshot['in_flight']}")
+
+        for name, kind, help, samples in snapshot["collected"]:
+            lines = family(name, kind, help)
+            for labels, value in samples:
+                lines.append(f"{name}{_labels(tuple(labels), labels.values(), extra)} {value}")
+
+    return "\n".join(line for lines in families.values() for line in lines) + "\n"
+
+
+class MetricsMiddleware:
+    """Time every HTTP request and count the ones in flight.
+
+    `publish`, if given, is called with the snapshot at most every
+    `publish_interval` seconds (multi-worker mode).
+    """
+    def __init__(self, app, metrics: Metrics, publish: Optional[Callable] = None, publish_interval: float = 5.0):
+        self.app = app
+        self.metrics = metrics
+        self.publish = publish
+        self.publish_interval = publish_interval
+        self.published_at = 0.0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.metrics.in_flight -= 1
+            now = time.perf_counter()
+            self.metrics.observe_request(scope["method"], route_template(scope), status, now - started)
+            if self.publish is not None and now - self.published_at > self.publish_interval:
+                self.published_at = now
+                self.publish(self.metrics.snapshot())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Migration des photos base64 vers le photo store
+
+Les photos des tables `students` et `staff` étaient stockées en base64 dans la
+ligne. Ce script les déplace dans le photo store (adressé par contenu) et ne
+laisse que le hash dans la colonne `photo`.
+"""
+
+from collections import defaultdict
+
+from supinter.db import supabase
+from photo_store import photo_store, decode_photo
+
+TABLES = ["students", "staff"]
+
+
+def migrate_table(table: str, batch_size: int, dry_run: bool):
+    """Migrer les photos d'une table, par lots"""
+    migrated = 0
+    skipped = 0
+    while True:
+        # Migrated rows no longer match the filter, so only skipped rows need an offset
+        rows = (supabase.table(table).select('id', 'photo').like('photo', 'data:*')
+                .order('id').range(skipped, skipped + batch_size - 1).execute().data)
+        if not rows:
+            break
+
+        ids_by_hash = defaultdict(list)
+        for row in rows:
+            if decode_photo(row["photo"]) is None:
+                print(f"  ⚠️  {table} {row['id']}: photo illisible, ignorée")
+                skipped += 1
+            elif dry_run:
+                migrated += 1
+                skipped += 1
+            else:
+                ids_by_hash[photo_store.ingest(row["photo"])].append(row["id"])
+
+        # Identical photos share one hash, so they can be updated together
+        for photo_hash, ids in ids_by_hash.items():
+            supabase.table(table).update({"photo": photo_hash}).in_('id', ids).execute()
+            migrated += len(ids)
+        print(f"  … {table}: {migrated} photos migrées")
+
+    return migrated, skipped
+
+
+def main():
+    """Fonction principale"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Migration des photos vers le photo store")
+    parser.add_argument("--table", choices=TABLES, help="Ne migrer qu'une table")
+    parser.add_argument("--batch-size", type=int, default=200, help="Nombre de lignes par lot")
+    parser.add_argument("--dry-run", action="store_true", help="Compter sans modifier la base")
+
+    args = parser.parse_args()
+
+    print("\n📸 Migration des photos vers le photo store...\n")
+    for table in ([args.table] if args.table else TABLES):
+        migrated, skipped = migrate_table(table, args.batch_size, args.dry_run)
+        label = "à migrer" if args.dry_run else "migrées"
+        print(f"  ✅ {table}: {migrated} photos {label}")
+
+    # Wait for the thumbnail / card variants still being rendered
+    photo_store.executor.shutdown(wait=True)
+    print("\n✅ Migration terminée\n")
+
+
+if __name__ == "__main__":
+    main()
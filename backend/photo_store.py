@@ -0,0 +1,162 @@
+"""
+Content-addressed photo store
+
+Photos are stored once per content (SHA-256 of the original bytes) instead of
+inline as base64 in the `students` / `staff` rows. Rows only keep the hash.
+Thumbnail and card-size variants are generated once, in a background worker,
+right after the upload.
+"""
+
+import base64
+import binascii
+import hashlib
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Variant name -> bounding box in pixels
+PHOTO_VARIANTS = {
+    "thumb": (96, 96),
+    "card": (300, 400),
+}
+
+HASH_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+DATA_URL_PATTERN = re.compile(r"^data:(?P<mime>[\w/+.-]+)?;base64,(?P<data>.*)$", re.DOTALL)
+
+
+def is_photo_hash(value: Optional[str]) -> bool:
+    """True if the value is a photo store key (and not a data URL / external URL)"""
+    return bool(value) and bool(HASH_PATTERN.match(value))
+
+
+def decode_photo(value: str) -> Optional[bytes]:
+    """Decode a base64 data URL into bytes, None if the value is not one"""
+    match = DATA_URL_PATTERN.match(value)
+    if not match:
+        return None
+    try:
+        return base64.b64decode(match.group("data"), validate=True)
+    except (binascii.Error, ValueError):
+        return None
+
+
+def guess_mime(data: bytes) -> str:
+    """Content type of a stored blob, from its magic bytes"""
+    if data.startswith(b"\x89PNG"):
+        return "image/png"
+    if data.startswith(b"GIF8"):
+        return "image/gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "image/jpeg"
+
+
+class FilesystemBlobBackend:
+    """Blob backend storing files under a local directory (works offline)"""
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str) -> Path:
+        # Fan out on the first two bytes of the hash to keep directories small
+        return self.root / key[:2] / key[2:4] / key
+
+    def exists(self, key: str) -> bool:
+        return self.path(key).exists()
+
+    def put(self, key: str, data: bytes):
+        target = self.path(key)
+        if target.exists():
+            return
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, target)
+
+    def get(self, key: str) -> Optional[bytes]:
+        target = self.path(key)
+        return target.read_bytes() if target.exists() else None
+
+
+class PhotoStore:
+    """Deduplicating photo store with precomputed variants"""
+    def __init__(self, backend, workers: int = 2):
+        self.backend = backend
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="photo-variants")
+
+    @staticmethod
+    def variant_key(photo_hash: str, variant: str) -> str:
+        return f"{photo_hash}.{variant}"
+
+    def put(self, data: bytes, wait: bool = False) -> str:
+        """Store original bytes, schedule variants and return the content hash"""
+        photo_hash = hashlib.sha256(data).hexdigest()
+        if self.backend.exists(photo_hash) and all(
+            self.backend.exists(self.variant_key(photo_hash, v)) for v in PHOTO_VARIANTS
+        ):
+            return photo_hash
+        self.backend.put(photo_hash, data)
+        future = self.executor.submit(self.generate_variants, photo_hash)
+        if wait:
+            future.result()
+        return photo_hash
+
+    def ingest(self, value: Optional[str], wait: bool = False) -> Optional[str]:
+        """Turn an incoming `photo` field into what the row should hold.
+
+        Base64 data URLs are moved into the store and replaced by their hash;
+        hashes, external URLs and empty values are returned unchanged.
+        """
+        if not value or is_photo_hash(value):
+            return value
+        data = decode_photo(value)
+        if data is None:
+            return value
+        return self.put(data, wait=wait)
+
+    def generate_variants(self, photo_hash: str):
+        """Render every variant of a stored photo (runs in the worker pool)"""
+        from PIL import Image, ImageOps
+
+        original = self.backend.get(photo_hash)
+        if original is None:
+            return
+        try:
+            image = ImageOps.exif_transpose(Image.open(BytesIO(original)))
+        except Exception as e:
+            logger.warning(f"Photo {photo_hash} could not be decoded: {e}")
+            return
+        image = image.convert("RGB")
+        for variant, size in PHOTO_VARIANTS.items():
+            key = self.variant_key(photo_hash, variant)
+            if self.backend.exists(key):
+                continue
+            rendered = image.copy()
+            rendered.thumbnail(size)
+            buffer = BytesIO()
+            rendered.save(buffer, format="JPEG", quality=85, optimize=True)
+            self.backend.put(key, buffer.getvalue())
+
+    def has(self, photo_hash: str, variant: Optional[str] = None) -> bool:
+        """True if the original (or the given variant) is stored"""
+        return self.backend.exists(self.variant_key(photo_hash, variant) if variant else photo_hash)
+
+    def get(self, photo_hash: str, variant: Optional[str] = None) -> Optional[bytes]:
+        """Return a variant if it is ready, the original otherwise"""
+        if variant and variant in PHOTO_VARIANTS:
+            data = self.backend.get(self.variant_key(photo_hash, variant))
+            if data is not None:
+                return data
+        return self.backend.get(photo_hash)
+
+
+photo_store = PhotoStore(
+    FilesystemBlobBackend(os.environ.get("PHOTO_STORE_DIR", Path(__file__).parent / "photos")),
+    workers=int(os.environ.get("PHOTO_STORE_WORKERS", "2")),
+)
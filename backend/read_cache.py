@@ -0,0 +1,158 @@
+"""
+Stale-while-revalidate read cache for upstream GET queries
+
+Entries younger than the soft TTL are served as is. Between the soft and the
+hard TTL they are served stale while a background refresh runs. Past the
+hard TTL the query is re-run inline; if upstream fails, the last known good
+result is served (up to `max_stale` seconds old) and the request is flagged
+as stale so the response can carry a Warning header.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Callable, Hashable, Optional
+
+# Per-request record of stale data served, read by StalenessMiddleware
+request_staleness: ContextVar[Optional[dict]] = ContextVar("request_staleness", default=None)
+
+
+class UpstreamError(Exception):
+    """Upstream (Supabase) failed and no cached result could stand in"""
+
+
+class CacheEntry:
+    __slots__ = ("value", "version", "fetched_at")
+
+    def __init__(self, value, version: int, fetched_at: float):
+        self.value = value
+        self.version = version
+        self.fetched_at = fetched_at
+
+
+class ReadCache:
+    def __init__(self, soft_ttl: float, hard_ttl: float, max_stale: float, max_entries: int, refresh_workers: int = 4):
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = hard_ttl
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.refreshing = set()
+        self.executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="cache-refresh")
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "errors": 0, "served_on_error": 0}
+        # Set to a health check: while it returns True, expired entries are
+        # served (up to max_stale) without first waiting on upstream to fail
+        self.upstream_down: Callable[[], bool] = lambda: False
+
+    def _store(self, key: Hashable, value, version: int):
+        with self.lock:
+            self.entries[key] = CacheEntry(value, version, time.monotonic())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def _refresh(self, key: Hashable, version: int, fetch: Callable):
+        try:
+            self._store(key, fetch(), version)
+            self.stats["refreshes"] += 1
+        except UpstreamError:
+            self.stats["errors"] += 1
+        finally:
+            with self.lock:
+                self.refreshing.discard(key)
+
+    @staticmethod
+    def _flag_stale(age: float, revalidation_failed: bool):
+        staleness = request_staleness.get()
+        if staleness is not None:
+            staleness["max_age"] = max(staleness.get("max_age", 0), age)
+            staleness["revalidation_failed"] = staleness.get("revalidation_failed", False) or revalidation_failed
+
+    def get(self, key: Hashable, version: int, fetch: Callable):
+        """Return the result for `key`, calling `fetch()` (which raises UpstreamError) as needed"""
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+        # A write through this process since the fetch makes the entry unusable, except as last resort
+        current = entry is not None and entry.version == version
+        age = now - entry.fetched_at if entry is not None else None
+
+        if current and age < self.soft_ttl:
+            self.stats["hits"] += 1
+            return entry.value
+        if current and age < self.hard_ttl:
+            self.stats["stale_hits"] += 1
+            with self.lock:
+                schedule = key not in self.refreshing
+                self.refreshing.add(key)
+            if schedule:
+                self.executor.submit(self._refresh, key, version, fetch)
+            self._flag_stale(age, revalidation_failed=False)
+            return entry.value
+
+        if entry is not None and age < self.max_stale and self.upstream_down():
+            self.stats["served_on_error"] += 1
+            self._flag_stale(age, revalidation_failed=True)
+            return entry.value
+
+        self.stats["misses"] += 1
+        try:
+            value = fetch()
+        except UpstreamError:
+            self.stats["errors"] += 1
+            if entry is not None and age < self.max_stale:
+                self.stats["served_on_error"] += 1
+                self._flag_stale(age, revalidation_failed=True)
+                return entry.value
+            raise
+        self._store(key, value, version)
+        return value
+
+    def snapshot(self) -> dict:
+        """Counters, hit ratio and staleness of the cached entries"""
+        now = time.monotonic()
+        with self.lock:
+            ages = [now - e.fetched_at for e in self.entries.values()]
+        lookups = self.stats["hits"] + self.stats["stale_hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(ages),
+            "hit_ratio": round((self.stats["hits"] + self.stats["stale_hits"]) / lookups, 4) if lookups else None,
+            "stale_entries": sum(1 for a in ages if a >= self.soft_ttl),
+            "oldest_entry_age": round(max(ages), 3) if ages else None,
+            "soft_ttl": self.soft_ttl,
+            "hard_ttl": self.hard_ttl,
+            "max_stale": self.max_stale,
+        }
+
+
+class StalenessMiddleware:
+    """Tag responses built from stale cache entries (RFC 7234 Warning codes)"""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        staleness = {}
+        token = request_staleness.set(staleness)
+
+        async def send_with_staleness(message):
+            if message["type"] == "http.response.start" and staleness:
+                code = b'111 - "Revalidation Failed"' if staleness["revalidation_failed"] else b'110 - "Response is Stale"'
+                message["headers"] = list(message["headers"]) + [
+                    (b"warning", code),
+                    (b"x-data-staleness", str(int(staleness["max_age"])).encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_staleness)
+        finally:
+            request_staleness.reset(token)
@@ -0,0 +1,182 @@
+"""
+Server-Timing breakdown and on-demand profiling of single requests
+
+Every response carries a Server-Timing header splitting the time spent into
+auth, upstream (Supabase calls), compute (the route body) and serialize
+(response validation and encoding). Phases are exclusive: upstream calls made
+during auth count as upstream, not auth.
+
+A request sent with `X-Profile: 1` by an authorised user is sampled by a
+small stack-sampling profiler; the folded stacks (flame graph input, e.g. for
+speedscope or flamegraph.pl) are handed to a callback that stores them, and
+the response carries X-Profile-Id.
+"""
+
+import asyncio
+import functools
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from fastapi.routing import APIRoute
+
+from upstream_trace import current_trace
+
+PHASES = ("auth", "upstream", "compute", "serialize")
+
+
+class RequestTimings:
+    def __init__(self):
+        self.phases = defaultdict(float)
+        # Phase time already attributed, so enclosing phases can exclude it
+        self.accounted = 0.0
+        self.compute_done = None
+
+
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("current_timings", default=None)
+
+
+def _upstream_ms() -> float:
+    trace = current_trace.get()
+    return trace.total_ms if trace is not None else 0.0
+
+
+@contextmanager
+def phase(name: str):
+    """Attribute the time spent in the block to `name`, minus nested phases and upstream calls"""
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    excluded = timings.accounted + _upstream_ms()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - started) * 1000
+        own = elapsed - (timings.accounted + _upstream_ms() - excluded)
+        timings.phases[name] += own
+        timings.accounted += own
+        if name == "compute":
+            timings.compute_done = time.perf_counter()
+
+
+class TimedRoute(APIRoute):
+    """Route class timing the endpoint body as `compute` (dependencies and serialization apart)"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        call = self.dependant.call
+        if asyncio.iscoroutinefunction(call):
+            @functools.wraps(call)
+            async def timed(*a, **kw):
+                with phase("compute"):
+                    return await call(*a, **kw)
+        else:
+            @functools.wraps(call)
+            def timed(*a, **kw):
+                with phase("compute"):
+                    return call(*a, **kw)
+        # Read at request time by FastAPI's handler
+        self.dependant.call = timed
+
+
+class SamplingProfiler:
+    """Samples one thread's stack every `interval` seconds into folded stacks"""
+    def __init__(self, thread_id: int, interval: float = 0.002):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self) -> str:
+        self.stopped.set()
+        self.thread.join()
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common())
+
+
+def server_timing_header(timings: RequestTimings, started: float, upstream_calls: int) -> bytes:
+    now = time.perf_counter()
+    phases = dict(timings.phases)
+    phases["upstream"] = _upstream_ms()
+    # Whatever ran after the endpoint returned: response model validation, encoding
+    if timings.compute_done is not None:
+        phases["serialize"] = phases.get("serialize", 0.0) + (now - timings.compute_done) * 1000
+    entries = [
+        f'upstream;dur={phases["upstream"]:.1f};desc="{upstream_calls} calls"' if name == "upstream"
+        else f"{name};dur={phases.get(name, 0.0):.1f}"
+        for name in PHASES
+    ]
+    entries.append(f"total;dur={(now - started) * 1000:.1f}")
+    return ", ".join(entries).encode()
+
+
+class ServerTimingMiddleware:
+    """Add Server-Timing to every response and profile requests asking for it.
+
+    `authorize_profiling(headers)` decides whether a request may be profiled;
+    `store_profile(profile_id, folded_stacks, path)` keeps the result.
+    """
+    def __init__(self, app, authorize_profiling: Optional[Callable] = None, store_profile: Optional[Callable] = None,
+                 profile_interval: float = 0.002):
+        self.app = app
+        self.authorize_profiling = authorize_profiling
+        self.store_profile = store_profile
+        self.profile_interval = profile_interval
+
+    def _profiler_for(self, scope) -> Optional[SamplingProfiler]:
+        if self.authorize_profiling is None or self.store_profile is None:
+            return None
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+        if headers.get("x-profile") not in ("1", "true") or not self.authorize_profiling(headers):
+            return None
+        return SamplingProfiler(threading.get_ident(), self.profile_interval)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        started = time.perf_counter()
+        profiler = self._profiler_for(scope)
+        profile_id = uuid.uuid4().hex if profiler else None
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                trace = current_trace.get()
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing_header(timings, started, len(trace.calls) if trace else 0)))
+                if profile_id:
+                    headers.append((b"x-profile-id", profile_id.encode()))
+                message["headers"] = headers
+            await send(message)
+
+        if profiler:
+            profiler.start()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_timings.reset(token)
+            if profiler:
+                self.store_profile(profile_id, profiler.stop(), scope["path"])
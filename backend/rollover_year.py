@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Passage à une nouvelle année académique
+
+Copie les classes d'une année dans la suivante (créée si besoin), en une
+insertion par lot. Les matières dépendent de la formation, de la filière et du
+niveau, pas de l'année : elles restent valables telles quelles. Les étudiants
+admis sont ensuite promus classe par classe (POST /api/classes/{id}/promote,
+ou --promouvoir ici).
+
+    python rollover_year.py --source 2024-2025 --cible 2025-2026 --activer
+"""
+
+import uuid
+
+from supinter.db import supabase
+from supinter.rollover import clone_classes, promote_class
+
+
+def find_year(value: str):
+    """Année académique par id ou par nom"""
+    years = supabase.table('academic_years').select('*').no_cache().execute().data
+    return next((y for y in years if value in (y["id"], y["name"])), None)
+
+
+def promote_all(source_year_id: str, target_year_id: str, campus_id, min_average: float, dry_run: bool):
+    """Promouvoir chaque classe vers la classe du niveau suivant (même campus, formation et filière) de l'année cible"""
+    levels = supabase.table('levels').select('*').execute().data
+    following = {prev["id"]: level for prev in levels for level in levels if level["order"] == prev["order"] + 1}
+
+    query = supabase.table('classes').select('*').in_('academic_year_id', [source_year_id, target_year_id])
+    if campus_id:
+        query = query.eq('campus_id', campus_id)
+    classes = query.no_cache().execute().data
+    targets = {}
+    for c in classes:
+        if c["academic_year_id"] == target_year_id:
+            targets.setdefault((c["campus_id"], c["formation_id"], c["filiere_id"], c["level_id"]), []).append(c)
+
+    for source in (c for c in classes if c["academic_year_id"] == source_year_id):
+        level = following.get(source["level_id"])
+        candidates = targets.get((source["campus_id"], source["formation_id"], source["filiere_id"], level["id"]), []) if level else []
+        if len(candidates) != 1:
+            reason = "pas de classe du niveau suivant" if not candidates else "plusieurs classes possibles (POST /api/classes/{id}/promote)"
+            print(f"  ⚠️  {source['code']}: {reason}")
+            continue
+        target = candidates[0]
+        if dry_run:
+            print(f"  … {source['code']} → {target['code']}")
+            continue
+        counts = promote_class(source, target, min_average)
+        print(f"  ✅ {source['code']} → {target['code']}: {counts['promoted']}/{counts['students']} promus, "
+              f"{counts['held_back']} non admis, {counts['ungraded']} sans note")
+
+
+def main():
+    """Fonction principale"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Passage à une nouvelle année académique")
+    parser.add_argument("--source", required=True, help="Année de départ (id ou nom, ex. 2024-2025)")
+    parser.add_argument("--cible", required=True, help="Nouvelle année (id ou nom), créée si elle n'existe pas")
+    parser.add_argument("--campus", help="Ne traiter qu'un campus (id)")
+    parser.add_argument("--activer", action="store_true", help="Faire de la nouvelle année l'année active")
+    parser.add_argument("--promouvoir", action="store_true", help="Promouvoir aussi les étudiants admis vers le niveau suivant")
+    parser.add_argument("--moyenne", type=float, default=10.0, help="Moyenne minimale d'admission (défaut : 10)")
+    parser.add_argument("--dry-run", action="store_true", help="Compter sans modifier la base")
+
+    args = parser.parse_args()
+
+    print("\n📅 Passage à une nouvelle année académique...\n")
+    source = find_year(args.source)
+    if not source:
+        raise SystemExit(f"❌ Année inconnue : {args.source}")
+    target = find_year(args.cible)
+    if not target:
+        target = {"id": str(uuid.uuid4()), "name": args.cible, "is_active": False}
+        if not args.dry_run:
+            supabase.table('academic_years').insert(target).execute()
+        print(f"  ✅ Année {args.cible} créée")
+    if target["id"] == source["id"]:
+        raise SystemExit("❌ L'année cible doit être différente de l'année source")
+
+    counts = clone_classes(source["id"], target["id"], args.campus, args.dry_run)
+    label = "à créer" if args.dry_run else "créées"
+    print(f"  ✅ Classes : {counts['created']} {label}, {counts['existing']} déjà présentes")
+    print("  ℹ️  Matières : communes à toutes les années, rien à copier")
+
+    if args.promouvoir:
+        print("\n🎓 Promotion des étudiants admis...\n")
+        promote_all(source["id"], target["id"], args.campus, args.moyenne, args.dry_run)
+
+    if args.activer and not args.dry_run:
+        supabase.table('academic_years').update({"is_active": False}).neq('id', target["id"]).execute()
+        supabase.table('academic_years').update({"is_active": True}).eq('id', target["id"]).execute()
+        print(f"\n  ✅ {target['name']} est l'année active")
+
+    print("\n✅ Passage terminé\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Cross-process cache tier for multi-worker deployments
+
+With several worker processes, in-process caches would each hold their own
+copy and miss the writes made by the other workers. This module keeps:
+
+- table versions in a SQLite file on shared memory (/dev/shm), so a write in
+  one worker invalidates cached reads in every worker (the invalidation
+  "broadcast" is the version bump every reader checks);
+- a small key-value store with TTLs in the same file, used for the reference
+  tables, the authenticated-user cache and the dashboard snapshots.
+
+SQLite in WAL mode gives safe concurrent access between processes without an
+extra service. With a single worker, LocalVersions / LocalStore keep
+everything in process.
+"""
+
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+import orjson
+
+
+def default_path() -> Path:
+    shm = Path("/dev/shm")
+    return (shm if shm.is_dir() else Path(tempfile.gettempdir())) / "supinter-shared-cache.sqlite"
+
+
+class SharedStore:
+    """Key-value store and version counters shared by every worker on the host"""
+    def __init__(self, path: Path):
+        self.path = str(path)
+        self.local = threading.local()
+        conn = self._connect()
+        conn.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value BLOB, expires_at REAL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS versions (name TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+        # Identifies this cache file, so versions restarting from 0 after a
+        # reboot never reproduce an ETag handed out before it
+        conn.execute("INSERT OR IGNORE INTO versions (name, version) VALUES ('__generation__', ?)",
+                     (random.getrandbits(62),))
+        self.sets = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread (sqlite3 connections are not thread-safe),
+        # never reused across a fork
+        conn = getattr(self.local, "conn", None)
+        if conn is None or self.local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self.local.conn = conn
+            self.local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str):
+        row = self._connect().execute("SELECT value, expires_at FROM kv WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return orjson.loads(row[0])
+
+    def set(self, key: str, value, ttl: float):
+        self._connect().execute(
+            "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, orjson.dumps(value), time.time() + ttl),
+        )
+        self.sets += 1
+        if self.sets % 500 == 0:
+            self.purge_expired()
+
+    def items(self, prefix: str) -> list:
+        """Unexpired (key, value) pairs whose key starts with `prefix`"""
+        rows = self._connect().execute(
+            "SELECT key, value FROM kv WHERE key >= ? AND key < ? AND expires_at >= ?",
+            (prefix, prefix + "\uffff", time.time()),
+        ).fetchall()
+        return [(key, orjson.loads(value)) for key, value in rows]
+
+    def purge_expired(self):
+        self._connect().execute("DELETE FROM kv WHERE expires_at < ?", (time.time(),))
+
+    def bump(self, name: str):
+        self._connect().execute(
+            "INSERT INTO versions (name, version) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET version = version + 1",
+            (name,),
+        )
+
+    def versions(self) -> dict:
+        return dict(self._connect().execute("SELECT name, version FROM versions").fetchall())
+
+
+class LocalStore:
+    """In-process stand-in for SharedStore's key-value part"""
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.entries = {}
+
+    def get(self, key: str):
+        entry = self.entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def items(self, prefix: str) -> list:
+        now = time.monotonic()
+        return [(k, e[1]) for k, e in list(self.entries.items()) if k.startswith(prefix) and e[0] >= now]
+
+    def set(self, key: str, value, ttl: float):
+        if len(self.entries) >= self.max_entries:
+            self.entries.clear()
+        self.entries[key] = (time.monotonic() + ttl, value)
+
+
+class LocalVersions:
+    """Per-table write counters for a single process"""
+    def __init__(self):
+        self.counts = defaultdict(int)
+        self.generation = random.getrandbits(62)
+
+    def __getitem__(self, table: str) -> int:
+        return self.counts[table]
+
+    def bump(self, table: str):
+        self.counts[table] += 1
+
+
+class SharedVersions:
+    """Per-table write counters shared between workers.
+
+    Reads use a snapshot refreshed at most every `poll_interval` seconds, so
+    a write in another worker is seen within that delay; writes made by this
+    worker are seen immediately.
+    """
+    def __init__(self, store: SharedStore, poll_interval: float = 0.05):
+        self.store = store
+        self.poll_interval = poll_interval
+        self.snapshot = {}
+        self.polled_at = 0.0
+        self.generation = store.versions()["__generation__"]
+
+    def __getitem__(self, table: str) -> int:
+        if time.monotonic() - self.polled_at > self.poll_interval:
+            self.snapshot = self.store.versions()
+            self.polled_at = time.monotonic()
+        return self.snapshot.get(table, 0)
+
+    def bump(self, table: str):
+        self.store.bump(table)
+        self.polled_at = 0.0
+
+
+def from_environment():
+    """Build (versions, store) from SHARED_CACHE / SHARED_CACHE_PATH / WEB_CONCURRENCY.
+
+    SHARED_CACHE=auto (default) shares between processes as soon as more than
+    one worker is configured or a path is given.
+    """
+    enabled = os.environ.get("SHARED_CACHE", "auto").lower()
+    workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+    if enabled == "false" or (enabled == "auto" and workers <= 1 and not os.environ.get("SHARED_CACHE_PATH")):
+        return LocalVersions(), LocalStore()
+    store = SharedStore(Path(os.environ.get("SHARED_CACHE_PATH", default_path())))
+    return SharedVersions(store, float(os.environ.get("SHARED_VERSION_POLL", "0.05"))), store
@@ -175,6 +175,10 @@ CREATE TABLE IF NOT EXISTS students (
     tuition_amount FLOAT DEFAULT 0,
     tuition_paid FLOAT DEFAULT 0,
     is_exonerated BOOLEAN DEFAULT FALSE,
+    -- Left to pay, kept up to date by the database (see TUITION ARREARS)
+    balance FLOAT GENERATED ALWAYS AS (
+        CASE WHEN is_exonerated THEN 0 ELSE COALESCE(tuition_amount, 0) - COALESCE(tuition_paid, 0) END
+    ) STORED,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -242,3 +246,84 @@ CREATE INDEX IF NOT EXISTS idx_grades_student ON grades(student_id);
 CREATE INDEX IF NOT EXISTS idx_transactions_campus ON transactions(campus_id);
 CREATE INDEX IF NOT EXISTS idx_transactions_academic_year ON transactions(academic_year_id);
 CREATE INDEX IF NOT EXISTS idx_professor_hours_academic_year ON professor_hours(academic_year_id);
+-- Sort orders of the exports (keyset pages)
+CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(date, id);
+CREATE INDEX IF NOT EXISTS idx_student_absences_date ON student_absences(date, id);
+CREATE INDEX IF NOT EXISTS idx_students_name ON students(last_name, first_name, id);
+CREATE INDEX IF NOT EXISTS idx_grades_student_semester ON grades(student_id, semester, id);
+
+-- ===================== TUITION ARREARS =====================
+-- GET /api/finance/arrears lists students with balance > 0 for a year (and
+-- campus), most owed first. Databases created before students.balance:
+-- ALTER TABLE students ADD COLUMN balance FLOAT GENERATED ALWAYS AS (
+--     CASE WHEN is_exonerated THEN 0 ELSE COALESCE(tuition_amount, 0) - COALESCE(tuition_paid, 0) END
+-- ) STORED;
+CREATE INDEX IF NOT EXISTS idx_students_arrears ON students(academic_year_id, campus_id, balance);
+
+-- Debtors and amount owed per class, summed server-side. The filter columns
+-- are grouped too, so a class whose students differ in formation, filière or
+-- level spans several rows: GET /api/finance/arrears sums them per class
+CREATE OR REPLACE VIEW student_arrears_by_class AS
+SELECT academic_year_id, campus_id, formation_id, filiere_id, level_id, class_id,
+       COUNT(*) AS debtors, SUM(balance) AS outstanding
+FROM students
+WHERE balance > 0
+GROUP BY academic_year_id, campus_id, formation_id, filiere_id, level_id, class_id;
+
+-- ===================== DELTA SYNC =====================
+-- List endpoints accept ?updated_since=<watermark>. This relies on updated_at
+-- being bumped on every UPDATE and on deletions leaving a tombstone. A
+-- tombstone keeps the campus and year of the deleted row (where its table has
+-- them), so a delta only lists deletions within the caller's scope. Databases
+-- created before these columns:
+-- ALTER TABLE tombstones ADD COLUMN campus_id UUID, ADD COLUMN academic_year_id UUID;
+CREATE TABLE IF NOT EXISTS tombstones (
+    id BIGSERIAL PRIMARY KEY,
+    table_name VARCHAR(100) NOT NULL,
+    row_id UUID NOT NULL,
+    campus_id UUID,
+    academic_year_id UUID,
+    deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_tombstones_table_deleted_at ON tombstones(table_name, deleted_at);
+
+CREATE OR REPLACE FUNCTION set_updated_at() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION record_tombstone() RETURNS TRIGGER AS $$
+BEGIN
+    -- NULL for tables without a campus or year column
+    INSERT INTO tombstones (table_name, row_id, campus_id, academic_year_id)
+    VALUES (TG_TABLE_NAME, OLD.id, (to_jsonb(OLD) ->> 'campus_id')::UUID, (to_jsonb(OLD) ->> 'academic_year_id')::UUID);
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Row-level triggers also fire for rows removed by ON DELETE CASCADE
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY[
+        'campuses', 'academic_years', 'formations', 'filieres', 'levels', 'classes',
+        'subjects', 'users', 'professors', 'professor_hours', 'staff', 'students',
+        'grades', 'transactions', 'archives', 'student_absences'
+    ] LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_updated_at ON %I', t, t);
+        EXECUTE format('CREATE TRIGGER trg_%s_updated_at BEFORE UPDATE ON %I FOR EACH ROW EXECUTE FUNCTION set_updated_at()', t, t);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_tombstone ON %I', t, t);
+        EXECUTE format('CREATE TRIGGER trg_%s_tombstone AFTER DELETE ON %I FOR EACH ROW EXECUTE FUNCTION record_tombstone()', t, t);
+        EXECUTE format('CREATE INDEX IF NOT EXISTS idx_%s_updated_at ON %I(updated_at)', t, t);
+    END LOOP;
+END;
+$$;
+
+-- Tombstones only need to outlive the longest client gap: the API answers 410
+-- to a watermark older than TOMBSTONE_RETENTION_DAYS (90 by default), and the
+-- client reloads the full list. Run periodically, with the same number of days:
+-- DELETE FROM tombstones WHERE deleted_at < CURRENT_TIMESTAMP - INTERVAL '90 days';
@@ -0,0 +1,16 @@
+"""
+SUP'INTER University Management System API
+
+    supinter.db             data layer (Supabase REST wrapper, caches)
+    supinter.auth           password hashing, JWT, current user
+    supinter.models         Pydantic models
+    supinter.routes.<name>  one router per domain, see supinter.app.DOMAINS
+    supinter.app            create_app(), mounting a subset of domains
+"""
+
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+BACKEND_DIR = Path(__file__).parent.parent
+load_dotenv(BACKEND_DIR / '.env')
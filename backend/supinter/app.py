@@ -0,0 +1,134 @@
+"""
+Application factory
+
+    create_app()                        # every domain (or SUPINTER_DOMAINS)
+    create_app(["finance"])             # finance-only worker pool
+
+Only the route modules of the selected domains are imported, so a lean
+worker neither loads nor builds the others. System routes (health, ready,
+metrics, stats, profiles) are always mounted, and tokens issued by the auth
+workers are accepted everywhere.
+"""
+
+import asyncio
+import importlib
+import logging
+import os
+from typing import Iterable, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from starlette.middleware.cors import CORSMiddleware
+
+from admission import AdmissionMiddleware, Overloaded, SHED_DETAIL
+from compression import CompressionMiddleware
+from metrics import MetricsMiddleware
+from read_cache import StalenessMiddleware, UpstreamError
+from request_timing import ServerTimingMiddleware
+from upstream_trace import UpstreamTraceMiddleware
+from supinter.db import upstream_monitor, SHARED_CACHE_ENABLED
+from supinter.jobs import JobRejected, jobs
+from supinter.observability import metrics, publish_metrics, bulkheads, route_class, profiling_allowed, store_profile
+from supinter.routes import system
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Mounted in this order (supinter/routes/<domain>.py)
+DOMAINS = ("auth", "academic", "students", "finance", "documents", "dashboard", "exports")
+
+
+def domains_from_env() -> list:
+    """Domains listed in SUPINTER_DOMAINS (comma-separated), all of them by default"""
+    value = os.environ.get('SUPINTER_DOMAINS', '').strip()
+    if not value or value == "all":
+        return list(DOMAINS)
+    return [d.strip() for d in value.split(',') if d.strip()]
+
+
+async def start_upstream_monitor():
+    upstream_monitor.start()
+    asyncio.get_running_loop().create_task(upstream_monitor.watch_event_loop())
+
+
+async def drain_jobs():
+    # Let this worker's background jobs finish before it exits (gunicorn recycling or deploy)
+    left = await asyncio.to_thread(jobs.drain)
+    if left:
+        logger.warning(f"{left} background job(s) still running at shutdown, reported as interrupted")
+
+
+async def overloaded_handler(request: Request, exc: Overloaded):
+    # The route's class ran out of upstream slots before its deadline
+    return JSONResponse(status_code=503, content={"detail": SHED_DETAIL}, headers={"Retry-After": str(exc.retry_after)})
+
+
+async def job_rejected_handler(request: Request, exc: JobRejected):
+    # Per-user job limit reached (429) or job queue full (503)
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail}, headers={"Retry-After": "30"})
+
+
+async def upstream_error_handler(request: Request, exc: UpstreamError):
+    # Upstream is down and nothing cached can stand in: say so instead of an empty page
+    logger.error(f"Upstream error on {request.url.path}: {exc}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Service temporairement indisponible, réessayez dans quelques instants"},
+        headers={"Retry-After": "5"}
+    )
+
+
+def create_app(domains: Optional[Iterable[str]] = None) -> FastAPI:
+    """Build the API with the routes of `domains` (SUPINTER_DOMAINS when not given)"""
+    selected = set(domains_from_env() if domains is None else domains)
+    unknown = selected - set(DOMAINS)
+    if unknown:
+        raise ValueError(f"Unknown domains: {', '.join(sorted(unknown))} (expected {', '.join(DOMAINS)})")
+
+    app = FastAPI(title="SUP'INTER University Management System")
+    app.state.domains = [d for d in DOMAINS if d in selected]
+    for domain in app.state.domains:
+        app.include_router(importlib.import_module(f"supinter.routes.{domain}").router)
+    app.include_router(system.router)
+    app.include_router(system.metrics_router)
+
+    app.add_event_handler("startup", start_upstream_monitor)
+    app.add_event_handler("shutdown", drain_jobs)
+    app.add_exception_handler(Overloaded, overloaded_handler)
+    app.add_exception_handler(UpstreamError, upstream_error_handler)
+    app.add_exception_handler(JobRejected, job_rejected_handler)
+
+    # Server-Timing header on every response, X-Profile on demand
+    app.add_middleware(ServerTimingMiddleware, authorize_profiling=profiling_allowed, store_profile=store_profile)
+
+    # Per-class concurrency limits, queueing and load shedding
+    app.add_middleware(AdmissionMiddleware, classify=route_class, bulkheads=bulkheads)
+
+    # Request latency / in-flight metrics. Added after (so outside) admission
+    # control: latency includes bulkhead queueing and shed requests are counted;
+    # the route's own time is in Server-Timing
+    app.add_middleware(MetricsMiddleware, metrics=metrics, publish=publish_metrics if SHARED_CACHE_ENABLED else None)
+
+    # Upstream call tracing (summary log line per request, N+1 detector in development)
+    app.add_middleware(
+        UpstreamTraceMiddleware,
+        n_plus_one_threshold=int(os.environ.get('N_PLUS_ONE_THRESHOLD', '10'))
+        if os.environ.get('UPSTREAM_DEBUG', 'false').lower() == 'true' else 0,
+    )
+
+    # Warning / X-Data-Staleness headers when cached data was served stale
+    app.add_middleware(StalenessMiddleware)
+
+    # Compression (brotli when available, gzip otherwise) for large bodies
+    app.add_middleware(CompressionMiddleware, minimum_size=int(os.environ.get('COMPRESSION_MIN_SIZE', '1024')))
+
+    # CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_credentials=True,
+        allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    return app
@@ -0,0 +1,129 @@
+"""
+Authentication helpers: password hashing, JWT and the current user dependency
+
+Shared by every domain, so a worker without the auth routes still accepts the
+tokens issued by the others (they all use JWT_SECRET).
+"""
+
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+from typing import Optional
+
+from fastapi import HTTPException, Depends
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from starlette.concurrency import run_in_threadpool
+
+from request_timing import phase
+from supinter.db import supabase, table_versions, cache_store
+
+# JWT Configuration
+SECRET_KEY = os.environ.get('JWT_SECRET', 'supinter-secret-key-2025')
+ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_HOURS = 24
+
+# Password hashing
+# Hashes below BCRYPT_ROUNDS are upgraded transparently on the next login
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+
+# python-jose and passlib are imported where first used, so workers start fast
+# (see tests/test_startup.py)
+@functools.lru_cache(maxsize=None)
+def get_pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+security = HTTPBearer()
+
+# ===================== AUTH HELPERS =====================
+class PasswordHasher:
+    """Runs bcrypt on a bounded thread pool so it never blocks the event loop.
+
+    bcrypt releases the GIL while hashing, so `workers` threads use up to
+    `workers` cores; further requests queue (see `pending`).
+    """
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self.pending = 0
+
+    async def run(self, fn, *args):
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self.run(get_pwd_context().hash, password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: Optional[str]):
+        """Return (valid, new_hash); new_hash is set when the stored hash needs an upgrade"""
+        if not hashed_password:
+            # Same cost as a real check, so unknown e-mails cannot be told apart by timing
+            await self.run(get_pwd_context().dummy_verify)
+            return False, None
+        return await self.run(get_pwd_context().verify_and_update, plain_password, hashed_password)
+
+password_hasher = PasswordHasher(int(os.environ.get('PASSWORD_HASH_WORKERS', str(os.cpu_count() or 2))))
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    valid, _ = await password_hasher.verify_and_update(plain_password, hashed_password)
+    return valid
+
+async def get_password_hash(password: str) -> str:
+    return await password_hasher.hash(password)
+
+def create_access_token(data: dict) -> str:
+    from jose import jwt
+    to_encode = data.copy()
+    expire = datetime.now(timezone.utc) + timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
+    to_encode.update({"exp": expire})
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+# Authenticated users, keyed by (user id, users table version) so that any
+# write to `users` invalidates every entry. The cache may be shared between
+# workers (/dev/shm), so entries never hold the password hash: only the login
+# route reads it, uncached
+USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', '60'))
+
+def user_id_from_token(token: str) -> str:
+    from jose import jwt, JWTError
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Token invalide")
+    user_id = payload.get("sub")
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="Token invalide")
+    return user_id
+
+def cached_user(user_id: str) -> Optional[dict]:
+    return cache_store.get(f"user:{user_id}:{table_versions['users']}")
+
+def load_user(user_id: str) -> dict:
+    """Read a user from Supabase (without the password hash) and cache it"""
+    cache_key = f"user:{user_id}:{table_versions['users']}"
+    response = supabase.table('users').select('*').eq('id', user_id).no_cache().execute()
+    if not response.data:
+        raise HTTPException(status_code=401, detail="Utilisateur non trouvé")
+    user = {key: value for key, value in response.data[0].items() if key != "password"}
+    cache_store.set(cache_key, user, USER_CACHE_TTL)
+    return user
+
+def user_from_token(token: str) -> dict:
+    user_id = user_id_from_token(token)
+    return cached_user(user_id) or load_user(user_id)
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    with phase("auth"):
+        user_id = user_id_from_token(credentials.credentials)
+        user = cached_user(user_id)
+        if user is None:
+            # A Supabase read held to the request's bulkhead like the route's
+            # own calls: in the threadpool it waits for an upstream slot until
+            # the deadline, where on the event loop it would be shed at once
+            user = await run_in_threadpool(load_user, user_id)
+        return user
@@ -0,0 +1,280 @@
+"""
+Data layer: Supabase REST wrapper, caches and upstream health
+
+Every domain reads and writes through `supabase` (or `TableQueryBuilder`);
+writes bump the per-table versions used for ETags and cache invalidation.
+"""
+
+import os
+import threading
+import time
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import shared_cache
+from admission import upstream_slot
+from read_cache import ReadCache, UpstreamError
+from upstream_monitor import UpstreamMonitor
+from upstream_trace import record_call, listeners as upstream_listeners
+from supinter.storage import backend_for
+
+# Supabase connection via REST API (sqlite:// runs offline, see storage.py)
+SUPABASE_URL = os.environ.get('SUPABASE_URL')
+SUPABASE_KEY = os.environ.get('SUPABASE_ANON_KEY')
+SUPABASE_TIMEOUT = float(os.environ.get('SUPABASE_TIMEOUT', '10'))
+SUPABASE_POOL_SIZE = int(os.environ.get('SUPABASE_POOL_SIZE', '20'))
+# Simulated round trip for the SQLite backend (ignored with Supabase)
+STORAGE_LATENCY = float(os.environ.get('STORAGE_LATENCY_MS', '0')) / 1000
+# Ids per in() filter and rows per bulk insert/update, to keep PostgREST URLs and bodies short
+UPSTREAM_BATCH_SIZE = int(os.environ.get('UPSTREAM_BATCH_SIZE', '200'))
+
+
+def chunks(items: list, size: int = UPSTREAM_BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+# Kept-alive connections to Supabase, shared by every query
+upstream_session = requests.Session()
+upstream_session.mount("https://", HTTPAdapter(pool_maxsize=SUPABASE_POOL_SIZE))
+upstream_session.mount("http://", HTTPAdapter(pool_maxsize=SUPABASE_POOL_SIZE))
+upstream_in_flight = 0
+upstream_in_flight_lock = threading.Lock()
+
+# Per-table write counters, bumped by every insert/update/delete going through
+# the wrapper, and a key-value cache store. Used for ETags and to invalidate
+# caches. Both are shared between worker processes in multi-worker mode
+# (see shared_cache.py), in-process otherwise.
+table_versions, cache_store = shared_cache.from_environment()
+SHARED_CACHE_ENABLED = isinstance(cache_store, shared_cache.SharedStore)
+
+# Reference tables are also cached in the shared tier, so each worker does not
+# have to fetch them itself
+SHARED_CACHE_TABLES = {'campuses', 'academic_years', 'formations', 'filieres', 'filiere_formations', 'levels', 'classes', 'subjects'}
+REFERENCE_CACHE_TTL = float(os.environ.get('REFERENCE_CACHE_TTL', '300'))
+
+# Read-through cache for GET queries (stale-while-revalidate, see read_cache.py)
+read_cache = ReadCache(
+    soft_ttl=float(os.environ.get('READ_CACHE_SOFT_TTL', '5')),
+    hard_ttl=float(os.environ.get('READ_CACHE_HARD_TTL', '60')),
+    max_stale=float(os.environ.get('READ_CACHE_MAX_STALE', '3600')),
+    max_entries=int(os.environ.get('READ_CACHE_MAX_ENTRIES', '5000')),
+)
+READ_CACHE_ENABLED = os.environ.get('READ_CACHE_ENABLED', 'true').lower() == 'true'
+
+# Supabase REST API wrapper class
+class SupabaseClient:
+    """Wrapper for Supabase REST API"""
+    def __init__(self, url: str, key: str, backend=None):
+        self.url = url.rstrip('/')
+        self.key = key
+        self.backend = backend or backend_for(url, upstream_session, SUPABASE_TIMEOUT, STORAGE_LATENCY)
+        self.headers = {
+            "Authorization": f"Bearer {key}",
+            "Content-Type": "application/json",
+            "apikey": key
+        }
+    
+    def table(self, table_name: str):
+        """Return a table query builder"""
+        return TableQueryBuilder(self.url, table_name, self.headers, self.backend)
+
+class APIResponse:
+    """Result of an executed query (same shape as supabase-py)"""
+    def __init__(self, data, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+class TableQueryBuilder:
+    """Helper class for building Supabase queries"""
+    def __init__(self, base_url: str, table: str, headers: dict, backend):
+        self.base_url = base_url
+        self.backend = backend
+        self.table = table
+        self.headers = dict(headers)
+        self.url = f"{base_url}/rest/v1/{table}"
+        self.method = "GET"
+        self.payload = None
+        self.params = []
+        self.count = None
+        self.use_cache = READ_CACHE_ENABLED
+    
+    def _filter(self, column: str, operator: str, value):
+        self.params.append((column, f"{operator}.{value}"))
+        return self
+    
+    def insert(self, data):
+        """Insert one row or a list of rows"""
+        self.method = "POST"
+        self.payload = data
+        self.headers["Prefer"] = "return=representation"
+        return self
+    
+    def select(self, *fields, count: Optional[str] = None):
+        """Select specific fields"""
+        self.params.append(("select", ",".join(fields) if fields else "*"))
+        self.count = count
+        return self
+    
+    def eq(self, column: str, value):
+        """Filter by equality"""
+        return self._filter(column, "eq", value)
+    
+    def neq(self, column: str, value):
+        """Filter by inequality"""
+        return self._filter(column, "neq", value)
+    
+    def gt(self, column: str, value):
+        """Filter by strictly greater than"""
+        return self._filter(column, "gt", value)
+    
+    def gte(self, column: str, value):
+        """Filter by greater than or equal"""
+        return self._filter(column, "gte", value)
+    
+    def lt(self, column: str, value):
+        """Filter by strictly lower than"""
+        return self._filter(column, "lt", value)
+    
+    def lte(self, column: str, value):
+        """Filter by lower than or equal"""
+        return self._filter(column, "lte", value)
+    
+    def like(self, column: str, pattern: str):
+        """Filter by pattern (case sensitive)"""
+        return self._filter(column, "like", pattern)
+    
+    def ilike(self, column: str, pattern: str):
+        """Filter by pattern (case insensitive)"""
+        return self._filter(column, "ilike", pattern)
+    
+    def in_(self, column: str, values):
+        """Filter by membership"""
+        return self._filter(column, "in", f"({','.join(str(v) for v in values)})")
+    
+    def is_(self, column: str, value):
+        """Filter by IS (null, true, false)"""
+        return self._filter(column, "is", "null" if value is None else value)
+    
+    def order(self, column: str, desc: bool = False):
+        """Sort results (called again: by this column next, like postgrest-py)"""
+        term = f"{column}.{'desc' if desc else 'asc'}"
+        for i, (key, value) in enumerate(self.params):
+            if key == "order":
+                self.params[i] = ("order", f"{value},{term}")
+                return self
+        self.params.append(("order", term))
+        return self
+    
+    def limit(self, count: int):
+        """Limit the number of rows"""
+        self.params.append(("limit", count))
+        return self
+    
+    def no_cache(self):
+        """Always read from upstream (for read-modify-write sequences)"""
+        self.use_cache = False
+        return self
+    
+    def range(self, start: int, end: int):
+        """Return rows start..end (inclusive)"""
+        self.params.append(("offset", start))
+        self.params.append(("limit", end - start + 1))
+        return self
+    
+    def _request(self):
+        headers = self.headers
+        if self.count:
+            headers = {**headers, "Prefer": ", ".join(filter(None, [headers.get("Prefer"), f"count={self.count}"]))}
+        global upstream_in_flight
+        # Bounded per route class (see admission.py)
+        with upstream_slot():
+            started = time.perf_counter()
+            with upstream_in_flight_lock:
+                upstream_in_flight += 1
+            try:
+                response = self.backend.request(self.method, self.url, self.table, self.params, self.payload, headers)
+            except requests.RequestException as e:
+                record_call(self.table, self.method, self.params, started, 0, 0)
+                raise UpstreamError(f"{self.method} {self.table}: {e}")
+            finally:
+                with upstream_in_flight_lock:
+                    upstream_in_flight -= 1
+        record_call(self.table, self.method, self.params, started, response.status_code, len(response.content))
+        return response
+    
+    def _response(self, response):
+        data = response.json() if response.text else []
+        count = None
+        content_range = response.headers.get("Content-Range", "")
+        if self.count and "/" in content_range:
+            total = content_range.split("/")[-1]
+            count = int(total) if total.isdigit() else None
+        return APIResponse(data, count)
+    
+    def _fetch(self):
+        response = self._request()
+        if response.status_code not in [200, 206]:
+            raise UpstreamError(f"GET {self.table} failed ({response.status_code}): {response.text[:200]}")
+        return self._response(response)
+    
+    def _fetch_shared(self, version: int):
+        key = f"q:{self.table}:{version}:{self.params}:{self.count}"
+        cached = cache_store.get(key)
+        if cached is not None:
+            return APIResponse(cached["data"], cached["count"])
+        result = self._fetch()
+        cache_store.set(key, {"data": result.data, "count": result.count}, REFERENCE_CACHE_TTL)
+        return result
+    
+    def execute(self):
+        """Execute and get results"""
+        if self.method == "GET":
+            if not self.use_cache:
+                return self._fetch()
+            key = (self.table, tuple(self.params), self.count)
+            version = table_versions[self.table]
+            fetch = self._fetch
+            if SHARED_CACHE_ENABLED and self.table in SHARED_CACHE_TABLES:
+                fetch = lambda: self._fetch_shared(version)
+            return read_cache.get(key, version, fetch)
+        response = self._request()
+        # Bumped once the write is done, so a tag is never paired with older data
+        table_versions.bump(self.table)
+        if self.method == "DELETE":
+            table_versions.bump("tombstones")
+        if response.status_code not in [200, 201, 204]:
+            raise Exception(f"{self.method} {self.table} failed: {response.text}")
+        return self._response(response)
+    
+    def single(self):
+        """Get single result"""
+        results = self.execute().data
+        return results[0] if results else None
+    
+    def update(self, data):
+        """Update rows"""
+        self.method = "PATCH"
+        self.payload = data
+        self.headers["Prefer"] = "return=representation"
+        return self
+    
+    def delete(self):
+        """Delete rows"""
+        self.method = "DELETE"
+        self.headers["Prefer"] = "return=representation"
+        return self
+
+supabase = SupabaseClient(SUPABASE_URL, SUPABASE_KEY)
+
+# Rolling upstream latency, background probe and event-loop lag (see upstream_monitor.py)
+upstream_monitor = UpstreamMonitor(
+    probe=lambda: supabase.table('campuses').select('id').limit(1).no_cache().execute(),
+    probe_interval=float(os.environ.get('UPSTREAM_PROBE_INTERVAL', '15')),
+    slow_probe_ms=float(os.environ.get('UPSTREAM_SLOW_PROBE_MS', '500')),
+    p99_degraded_ms=float(os.environ.get('UPSTREAM_P99_DEGRADED_MS', '2000')),
+    loop_lag_degraded_ms=float(os.environ.get('LOOP_LAG_DEGRADED_MS', '100')),
+)
+upstream_listeners.append(upstream_monitor.observe)
+read_cache.upstream_down = upstream_monitor.upstream_down
@@ -0,0 +1,277 @@
+"""
+Background jobs: operations too long for a request, tracked by id
+
+    job = jobs.submit("promote", current_user, run)   # run(job) -> result dict
+    jobs.state(job.id)                                 # status, progress, result
+    jobs.cancel(job.id)
+
+The storage client is synchronous, so jobs run in a bounded thread pool
+(JOB_WORKERS) behind a bounded queue (JOB_QUEUE_SIZE) rather than on the event
+loop. A job reports progress with job.advance(), which is also where a
+cancellation is noticed, and may write a file with job.artifact() that
+GET /jobs/{id}/result streams back.
+
+Jobs run under the runner's bulkhead (the bulk class of the app's), so their
+upstream calls share the bulk cap instead of running unlimited.
+
+Job state is kept as JSON files under JOB_DIR, so any worker of the host can
+answer for a job, and a job whose worker died (restart, crash) is reported as
+failed instead of staying "running" forever. Finished jobs and their files
+are removed after JOB_TTL seconds.
+
+A worker that shuts down (deploy, or gunicorn recycling it after
+max_requests) drains first: it refuses new jobs and lets its own finish for up
+to JOB_DRAIN_TIMEOUT seconds, which gunicorn's graceful_timeout leaves room
+for (see gunicorn.conf.py). Jobs still running after that are lost and
+reported as interrupted.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Optional
+
+from admission import Bulkhead, current_bulkhead, current_deadline
+from supinter.observability import bulkheads
+
+logger = logging.getLogger(__name__)
+
+JOB_DIR = Path(os.environ.get('JOB_DIR', Path(__file__).parent.parent / "jobs"))
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))
+JOB_QUEUE_SIZE = int(os.environ.get('JOB_QUEUE_SIZE', '32'))
+# Queued or running jobs per user, across the workers of the host
+JOB_USER_LIMIT = int(os.environ.get('JOB_USER_LIMIT', '2'))
+JOB_TTL = float(os.environ.get('JOB_TTL', str(24 * 3600)))
+# Progress is written to disk at most this often (status changes always are)
+JOB_SAVE_INTERVAL = float(os.environ.get('JOB_SAVE_INTERVAL', '0.5'))
+# Time a stopping worker waits for its jobs (keep below GUNICORN_GRACEFUL_TIMEOUT)
+JOB_DRAIN_TIMEOUT = float(os.environ.get('JOB_DRAIN_TIMEOUT', '120'))
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+ACTIVE = (QUEUED, RUNNING)
+INTERRUPTED = "Tâche interrompue par un redémarrage du serveur"
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobRejected(Exception):
+    """Too many jobs for the user (429) or for the queue (503)"""
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class JobStore:
+    """{id}.json (state), {id}.result (artifact) and {id}.cancel (request) files in a directory"""
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, job_id: str, suffix: str) -> Path:
+        return self.root / f"{job_id}.{suffix}"
+
+    def save(self, state: dict):
+        target = self.path(state["id"], "json")
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp, target)
+
+    def load(self, job_id: str) -> Optional[dict]:
+        try:
+            return json.loads(self.path(job_id, "json").read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def all(self) -> list:
+        states = (self.load(p.stem) for p in self.root.glob("*.json"))
+        return [s for s in states if s]
+
+    def remove(self, job_id: str):
+        for suffix in ("json", "result", "cancel"):
+            self.path(job_id, suffix).unlink(missing_ok=True)
+
+
+class Job:
+    def __init__(self, kind: str, user: dict, store: JobStore):
+        self.store = store
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.user_id = user["id"]
+        self.status = QUEUED
+        self.done = 0
+        self.total = 0
+        self.message: Optional[str] = None
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.filename: Optional[str] = None
+        self.media_type: Optional[str] = None
+        self.created_at = now_iso()
+        self.finished_at: Optional[str] = None
+        self.saved_at = 0.0
+
+    def advance(self, done: int = 1, total: Optional[int] = None, message: Optional[str] = None):
+        """Report progress: `done` more steps (out of `total`, when known); raises JobCancelled when asked to stop"""
+        self.done += done
+        if total is not None:
+            self.total = total
+        if message is not None:
+            self.message = message
+        if time.monotonic() - self.saved_at >= JOB_SAVE_INTERVAL:
+            if self.store.path(self.id, "cancel").exists():
+                raise JobCancelled()
+            self.save()
+
+    @contextmanager
+    def artifact(self, filename: str, media_type: str):
+        """Binary file for the job's result, kept only if the block completes"""
+        target = self.store.path(self.id, "result")
+        tmp = target.with_name(f"{target.name}.tmp")
+        try:
+            with open(tmp, "wb") as out:
+                yield out
+            os.replace(tmp, target)
+        finally:
+            tmp.unlink(missing_ok=True)
+        self.filename, self.media_type = filename, media_type
+
+    def save(self):
+        self.saved_at = time.monotonic()
+        self.store.save(self.state())
+
+    def state(self) -> dict:
+        return {
+            "id": self.id, "kind": self.kind, "user_id": self.user_id, "pid": os.getpid(), "status": self.status,
+            "done": self.done, "total": self.total, "message": self.message, "result": self.result, "error": self.error,
+            "filename": self.filename, "media_type": self.media_type,
+            "created_at": self.created_at, "finished_at": self.finished_at,
+        }
+
+
+class JobRunner:
+    def __init__(self, root: Path = JOB_DIR, workers: int = JOB_WORKERS, queue_size: int = JOB_QUEUE_SIZE,
+                 user_limit: int = JOB_USER_LIMIT, ttl: float = JOB_TTL, bulkhead: Optional[Bulkhead] = None):
+        self.store = JobStore(root)
+        self.bulkhead = bulkhead
+        self.queue_size = queue_size
+        self.user_limit = user_limit
+        self.ttl = ttl
+        # Jobs of this worker that are not finished yet
+        self.jobs: dict = {}
+        self.draining = False
+        self.lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+
+    def submit(self, kind: str, user: dict, run: Callable) -> Job:
+        """Queue run(job); its return value becomes the job's result"""
+        with self.lock:
+            if self.draining:
+                raise JobRejected(503, "Serveur en cours de redémarrage, réessayez dans quelques instants")
+            if len(self.jobs) >= self.queue_size:
+                raise JobRejected(503, "Trop de tâches en attente, réessayez dans quelques instants")
+            self.clean()
+            active = sum(1 for s in self.states() if s["user_id"] == user["id"] and s["status"] in ACTIVE)
+            if active >= self.user_limit:
+                raise JobRejected(429, f"Vous avez déjà {active} tâche(s) en cours : attendez leur fin")
+            job = Job(kind, user, self.store)
+            # In memory before on disk: state() takes a file of this pid missing from memory for an interrupted job
+            self.jobs[job.id] = job
+            job.save()
+        self.pool.submit(self.run, job, run)
+        return job
+
+    def run(self, job: Job, run: Callable):
+        # Pool threads start from an empty context: the submitting request's bulkhead does not follow
+        bulkhead_token = current_bulkhead.set(self.bulkhead)
+        deadline_token = current_deadline.set(None)
+        try:
+            if job.status != QUEUED or self.store.path(job.id, "cancel").exists():
+                raise JobCancelled()
+            job.status = RUNNING
+            job.save()
+            job.result = run(job)
+            job.status = DONE
+        except JobCancelled:
+            job.status = CANCELLED
+        except Exception as e:
+            logger.exception(f"Job {job.kind} {job.id} failed")
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            current_bulkhead.reset(bulkhead_token)
+            current_deadline.reset(deadline_token)
+        job.finished_at = now_iso()
+        job.save()
+        with self.lock:
+            self.jobs.pop(job.id, None)
+
+    def state(self, job_id: str) -> Optional[dict]:
+        """Current state of a job, whichever worker of the host runs it"""
+        job = self.jobs.get(job_id)
+        if job:
+            return job.state()
+        state = self.store.load(job_id)
+        # This worker's unfinished jobs are all in memory (its pid may be a previous process's)
+        if state and state["status"] in ACTIVE and (state["pid"] == os.getpid() or not pid_alive(state["pid"])):
+            state = self.interrupted(state)
+        return state
+
+    def states(self) -> list:
+        return [self.state(s["id"]) if s["status"] in ACTIVE else s for s in self.store.all()]
+
+    def cancel(self, job_id: str):
+        """Ask a job to stop; a queued job never starts, a running one stops at its next advance()"""
+        self.store.path(job_id, "cancel").touch()
+        job = self.jobs.get(job_id)
+        if job and job.status == QUEUED:
+            job.status = CANCELLED
+            job.finished_at = now_iso()
+            job.save()
+
+    def drain(self, timeout: float = JOB_DRAIN_TIMEOUT) -> int:
+        """Refuse new jobs and wait up to `timeout` seconds for this worker's to finish; returns how many are left"""
+        with self.lock:
+            self.draining = True
+        deadline = time.monotonic() + timeout
+        while self.jobs and time.monotonic() < deadline:
+            time.sleep(0.1)
+        return len(self.jobs)
+
+    def interrupted(self, state: dict) -> dict:
+        state = {**state, "status": FAILED, "error": INTERRUPTED, "finished_at": now_iso()}
+        self.store.save(state)
+        return state
+
+    def clean(self):
+        """Fail the jobs of dead workers and forget the expired ones"""
+        limit = time.time() - self.ttl
+        for state in self.states():
+            finished = state.get("finished_at")
+            if finished and datetime.fromisoformat(finished).timestamp() < limit:
+                self.store.remove(state["id"])
+
+
+jobs = JobRunner(bulkhead=bulkheads["bulk"])
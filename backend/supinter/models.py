@@ -0,0 +1,429 @@
+"""
+Enums, constants and Pydantic request / response models
+"""
+
+from typing import Generic, List, Optional, TypeVar
+
+from pydantic import BaseModel, EmailStr
+
+# ===================== ENUMS & CONSTANTS =====================
+class UserRole:
+    FOUNDER = "founder"
+    DIRECTOR = "director"
+    ACCOUNTANT = "accountant"
+    IT = "it"
+    SECRETARY = "secretary"
+
+class StudentStatus:
+    AFFECTE = "affecté"
+    NON_AFFECTE = "non_affecté"
+
+FORMATION_TYPES = ["BTS", "DUT", "LICENCE", "MASTER", "QUALIF"]
+LEVELS = ["1ère Année", "2ème Année", "3ème Année", "Master 1", "Master 2", "6 Mois"]
+
+# ===================== PYDANTIC MODELS =====================
+class UserCreate(BaseModel):
+    email: EmailStr
+    password: str
+    name: str
+    role: str = UserRole.SECRETARY
+    campus_id: str
+
+class UserLogin(BaseModel):
+    email: str
+    password: str
+
+class UserResponse(BaseModel):
+    id: str
+    email: str
+    name: str
+    role: str
+    campus_id: str
+    campus_name: Optional[str] = None
+
+class TokenResponse(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    user: UserResponse
+
+class CampusCreate(BaseModel):
+    name: str
+    address: Optional[str] = None
+    phone: Optional[str] = None
+
+class CampusResponse(BaseModel):
+    id: str
+    name: str
+    address: Optional[str] = None
+    phone: Optional[str] = None
+
+class AcademicYearCreate(BaseModel):
+    name: str
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    is_active: bool = False
+
+class AcademicYearResponse(BaseModel):
+    id: str
+    name: str
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    is_active: bool
+
+class FormationCreate(BaseModel):
+    name: str
+    code: str
+
+class FormationResponse(BaseModel):
+    id: str
+    name: str
+    code: str
+
+class FiliereCreate(BaseModel):
+    name: str
+    code: str
+    formation_ids: List[str]
+
+class FiliereResponse(BaseModel):
+    id: str
+    name: str
+    code: str
+    formation_ids: List[str]
+    formations: Optional[List[FormationResponse]] = None
+
+class LevelCreate(BaseModel):
+    name: str
+    order: int = 1
+
+class LevelResponse(BaseModel):
+    id: str
+    name: str
+    order: int
+
+class ClassCreate(BaseModel):
+    name: str
+    code: str
+    formation_id: str
+    filiere_id: str
+    level_id: str
+    campus_id: str
+    academic_year_id: str
+
+class ClassResponse(BaseModel):
+    id: str
+    name: str
+    code: str
+    formation_id: str
+    filiere_id: str
+    level_id: str
+    campus_id: str
+    academic_year_id: str
+    formation_name: Optional[str] = None
+    filiere_name: Optional[str] = None
+    level_name: Optional[str] = None
+    campus_name: Optional[str] = None
+
+class SubjectCreate(BaseModel):
+    name: str
+    code: str
+    credits: int = 2
+    coefficient: float = 1.0
+    formation_id: str
+    filiere_id: str
+    level_id: str
+
+class SubjectResponse(BaseModel):
+    id: str
+    name: str
+    code: str
+    credits: int
+    coefficient: float
+    formation_id: str
+    filiere_id: str
+    level_id: str
+
+class StudentCreate(BaseModel):
+    permanent_id: str
+    photo: Optional[str] = None
+    matricule_bac: Optional[str] = None
+    numero_table_bac: Optional[str] = None
+    campus_id: str
+    academic_year_id: str
+    formation_id: str
+    filiere_id: str
+    level_id: str
+    class_id: str
+    status: str = StudentStatus.NON_AFFECTE
+    first_name: str
+    last_name: str
+    birth_date: str
+    birth_place: str
+    gender: str
+    phone: str
+    email: Optional[str] = None
+    nationality: str = "Ivoirienne"
+    emergency_contact_name: Optional[str] = None
+    emergency_contact_phone: Optional[str] = None
+    tuition_amount: float = 0
+    is_exonerated: bool = False
+
+class StudentResponse(BaseModel):
+    id: str
+    matricule: str
+    permanent_id: str
+    photo: Optional[str] = None
+    matricule_bac: Optional[str] = None
+    numero_table_bac: Optional[str] = None
+    campus_id: str
+    academic_year_id: str
+    formation_id: str
+    filiere_id: str
+    level_id: str
+    class_id: str
+    status: str
+    first_name: str
+    last_name: str
+    birth_date: str
+    birth_place: str
+    gender: str
+    phone: str
+    email: Optional[str] = None
+    nationality: str
+    emergency_contact_name: Optional[str] = None
+    emergency_contact_phone: Optional[str] = None
+    tuition_amount: float
+    tuition_paid: float = 0
+    is_exonerated: bool
+    balance: Optional[float] = None
+    created_at: str
+    formation_name: Optional[str] = None
+    filiere_name: Optional[str] = None
+    level_name: Optional[str] = None
+    class_name: Optional[str] = None
+    campus_name: Optional[str] = None
+    academic_year_name: Optional[str] = None
+
+class StudentReenroll(BaseModel):
+    academic_year_id: str
+    formation_id: str
+    filiere_id: str
+    level_id: str
+    class_id: str
+    status: str = StudentStatus.NON_AFFECTE
+
+class ClassPromote(BaseModel):
+    target_class_id: str
+    min_average: float = 10.0
+    include_ungraded: bool = False  # promote students without any grade for the year
+
+class StudentImportRow(BaseModel):
+    line: int
+    status: str  # created, valid (dry run) or error
+    matricule: Optional[str] = None
+    id: Optional[str] = None
+    errors: List[str] = []
+
+class StudentImportReport(BaseModel):
+    total: int
+    created: int
+    failed: int
+    dry_run: bool
+    rows: List[StudentImportRow]
+
+class ProfessorCreate(BaseModel):
+    first_name: str
+    last_name: str
+    phone: str
+    email: Optional[str] = None
+    specialty: str
+    campus_id: str
+
+class ProfessorResponse(BaseModel):
+    id: str
+    first_name: str
+    last_name: str
+    phone: str
+    email: Optional[str] = None
+    specialty: str
+    campus_id: str
+    campus_name: Optional[str] = None
+
+class ProfessorHoursCreate(BaseModel):
+    professor_id: str
+    academic_year_id: str
+    formation_id: str
+    filiere_id: str
+    level_id: str
+    class_id: str
+    total_hours_planned: float
+    date: str
+    start_time: str
+    end_time: str
+    hours_done: float
+
+class ProfessorHoursResponse(BaseModel):
+    id: str
+    professor_id: str
+    professor_name: Optional[str] = None
+    academic_year_id: str
+    formation_id: str
+    filiere_id: str
+    level_id: str
+    class_id: str
+    total_hours_planned: float
+    total_hours_done: float
+    hours_remaining: float
+    date: str
+    start_time: str
+    end_time: str
+
+class StaffCreate(BaseModel):
+    first_name: str
+    last_name: str
+    birth_date: str
+    birth_place: str
+    function: str
+    phone: Optional[str] = None
+    campus_id: str
+    academic_year_id: str
+    photo: Optional[str] = None
+
+class StaffResponse(BaseModel):
+    id: str
+    first_name: str
+    last_name: str
+    birth_date: str
+    birth_place: str
+    function: str
+    phone: Optional[str] = None
+    campus_id: str
+    academic_year_id: str
+    campus_name: Optional[str] = None
+    photo: Optional[str] = None
+
+class GradeCreate(BaseModel):
+    student_id: str
+    subject_id: str
+    semester: int
+    academic_year_id: str
+    value: float
+
+class GradeResponse(BaseModel):
+    id: str
+    student_id: str
+    subject_id: str
+    subject_name: Optional[str] = None
+    semester: int
+    academic_year_id: str
+    value: float
+
+class TransactionCreate(BaseModel):
+    date: str
+    type: str  # INCOME or EXPENSE
+    category: str
+    amount: float
+    description: str
+    student_id: Optional[str] = None
+    campus_id: str
+    academic_year_id: str
+
+class TransactionResponse(BaseModel):
+    id: str
+    date: str
+    type: str
+    category: str
+    amount: float
+    description: str
+    student_id: Optional[str] = None
+    student_name: Optional[str] = None
+    campus_id: str
+    academic_year_id: str
+    created_at: str
+
+class ArrearsStudent(BaseModel):
+    id: str
+    matricule: str
+    first_name: str
+    last_name: str
+    class_id: Optional[str] = None
+    class_name: Optional[str] = None
+    campus_id: str
+    campus_name: Optional[str] = None
+    tuition_amount: float
+    tuition_paid: float
+    balance: float
+
+class ArrearsTotal(BaseModel):
+    id: Optional[str] = None
+    name: Optional[str] = None
+    debtors: int
+    outstanding: float
+
+class ArrearsReport(BaseModel):
+    academic_year_id: str
+    debtors: int
+    outstanding: float
+    page: int
+    page_size: int
+    items: List[ArrearsStudent]
+    by_class: List[ArrearsTotal]
+    by_campus: List[ArrearsTotal]
+
+class ArchiveCreate(BaseModel):
+    document_type: str
+    student_id: str
+    academic_year_id: str
+    campus_id: str
+    downloaded_by: str
+
+class ArchiveResponse(BaseModel):
+    id: str
+    document_type: str
+    student_id: str
+    student_name: Optional[str] = None
+    academic_year_id: str
+    campus_id: str
+    downloaded_by: str
+    downloaded_at: str
+
+class DocumentBatch(BaseModel):
+    class_id: Optional[str] = None
+    student_ids: Optional[List[str]] = None  # all the students of class_id when omitted
+    output: str = "pdf"  # one merged PDF, or "zip" for one PDF per student
+
+class StudentAbsenceCreate(BaseModel):
+    student_id: str
+    academic_year_id: str
+    date: str
+    hours: float
+    reason: Optional[str] = None
+
+class StudentAbsenceResponse(BaseModel):
+    id: str
+    student_id: str
+    student_name: Optional[str] = None
+    academic_year_id: str
+    date: str
+    hours: float
+    reason: Optional[str] = None
+    total_hours: Optional[float] = None
+
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    status: str  # queued, running, done, failed or cancelled
+    done: int
+    total: int
+    message: Optional[str] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    filename: Optional[str] = None  # GET /jobs/{id}/result once done
+    created_at: str
+    finished_at: Optional[str] = None
+
+T = TypeVar("T")
+
+class DeltaResponse(BaseModel, Generic[T]):
+    items: List[T]
+    deleted: List[str]
+    watermark: str
@@ -0,0 +1,126 @@
+"""
+Metrics collectors, bulkheads and profiling settings shared by the app factory
+and the system routes
+"""
+
+import os
+import re
+from typing import Optional
+
+from fastapi import HTTPException
+
+from admission import Bulkhead
+from metrics import Metrics
+from upstream_trace import listeners as upstream_listeners
+from supinter import db
+from supinter.auth import password_hasher, user_from_token
+from supinter.db import read_cache, cache_store, upstream_monitor
+from supinter.models import UserRole
+
+# ===================== METRICS =====================
+metrics = Metrics()
+upstream_listeners.append(metrics.observe_upstream)
+
+# Optional bearer token for /metrics (the API is publicly reachable)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+# How long a worker's published snapshot stays visible after its last request
+METRICS_WORKER_TTL = float(os.environ.get('METRICS_WORKER_TTL', '300'))
+
+def read_cache_metrics():
+    return [
+        ("supinter_read_cache_events_total", "counter", "Read cache lookups and refreshes by outcome",
+         [({"event": event}, count) for event, count in read_cache.stats.items()]),
+        ("supinter_read_cache_entries", "gauge", "Entries held by the read cache",
+         [({}, len(read_cache.entries))]),
+    ]
+
+def password_hash_metrics():
+    pending = password_hasher.pending
+    return [
+        ("supinter_password_hash_queue_depth", "gauge", "bcrypt jobs waiting for a pool thread",
+         [({}, max(pending - password_hasher.workers, 0))]),
+        ("supinter_password_hash_in_progress", "gauge", "bcrypt jobs running",
+         [({}, min(pending, password_hasher.workers))]),
+    ]
+
+def upstream_health_metrics():
+    latency = upstream_monitor.latency()
+    return [
+        ("supinter_upstream_latency_rolling_ms", "gauge", "Rolling upstream latency percentiles",
+         [({"quantile": q}, latency[key]) for q, key in (("0.5", "p50_ms"), ("0.99", "p99_ms")) if latency[key] is not None]),
+        ("supinter_event_loop_lag_ms", "gauge", "Recent maximum event loop lag",
+         [({}, upstream_monitor.loop_lag_ms)]),
+        ("supinter_upstream_pool_in_use", "gauge", "Supabase requests in flight",
+         [({}, db.upstream_in_flight)]),
+    ]
+
+metrics.add_collector(read_cache_metrics)
+metrics.add_collector(upstream_health_metrics)
+metrics.add_collector(password_hash_metrics)
+
+def publish_metrics(snapshot: dict):
+    cache_store.set(f"metrics:{os.getpid()}", snapshot, METRICS_WORKER_TTL)
+
+# ===================== ADMISSION CONTROL =====================
+# Each route class has its own slots, queue and upstream call budget per
+# worker, so bulk work cannot starve payments and logins. Every value can be
+# overridden with BULKHEAD_<CLASS>_<SETTING>, e.g. BULKHEAD_BULK_LIMIT=4.
+def bulkhead_from_env(name: str, **defaults) -> Bulkhead:
+    settings = {key: type(value)(os.environ.get(f"BULKHEAD_{name.upper()}_{key.upper()}", value))
+                for key, value in defaults.items()}
+    return Bulkhead(name, **settings)
+
+bulkheads = {
+    "critical": bulkhead_from_env("critical", limit=16, max_queue=64, queue_timeout=5.0, deadline=15.0, upstream_limit=4),
+    "interactive": bulkhead_from_env("interactive", limit=32, max_queue=128, queue_timeout=10.0, deadline=30.0, upstream_limit=8),
+    "dashboard": bulkhead_from_env("dashboard", limit=4, max_queue=16, queue_timeout=15.0, deadline=30.0, upstream_limit=3),
+    "bulk": bulkhead_from_env("bulk", limit=2, max_queue=4, queue_timeout=30.0, deadline=300.0, upstream_limit=3),
+}
+
+# First match wins; other /api routes are interactive
+ROUTE_CLASSES = [
+    ("critical", re.compile(r"^POST /api/(auth/login|transactions)$")),
+    ("dashboard", re.compile(r"^GET /api/dashboard/")),
+    ("bulk", re.compile(r"/(exports?|import|batch|receipts\.pdf)(/|$)")),
+]
+# Probes and metrics must answer even when every class is saturated
+UNLIMITED_PATHS = {"/api/health", "/api/ready", "/metrics"}
+
+def route_class(method: str, path: str) -> Optional[str]:
+    if path in UNLIMITED_PATHS or not path.startswith("/api/"):
+        return None
+    key = f"{method} {path}"
+    for name, pattern in ROUTE_CLASSES:
+        if pattern.search(key):
+            return name
+    return "interactive"
+
+def bulkhead_metrics():
+    return [
+        (metric, kind, help, [({"class": name}, bulkhead.snapshot()[field]) for name, bulkhead in bulkheads.items()])
+        for metric, kind, field, help in (
+            ("supinter_bulkhead_active", "gauge", "active", "Requests holding a bulkhead slot"),
+            ("supinter_bulkhead_waiting", "gauge", "waiting", "Requests queued for a bulkhead slot"),
+            ("supinter_bulkhead_shed_total", "counter", "shed", "Requests refused with 503 by a bulkhead"),
+        )
+    ]
+
+metrics.add_collector(bulkhead_metrics)
+
+# ===================== PROFILING =====================
+# A request sent with `X-Profile: 1` by one of these roles is profiled; the
+# folded stacks are kept PROFILE_TTL seconds under the returned X-Profile-Id
+PROFILING_ROLES = {UserRole.FOUNDER, UserRole.IT}
+PROFILE_TTL = float(os.environ.get('PROFILE_TTL', '3600'))
+
+def profiling_allowed(headers: dict) -> bool:
+    authorization = headers.get("authorization", "")
+    if not authorization.startswith("Bearer "):
+        return False
+    try:
+        return user_from_token(authorization[len("Bearer "):])["role"] in PROFILING_ROLES
+    except HTTPException:
+        return False
+
+def store_profile(profile_id: str, folded: str, path: str):
+    cache_store.set(f"profile:{profile_id}", {"path": path, "folded": folded}, PROFILE_TTL)
@@ -0,0 +1,277 @@
+"""
+PDF output: campus letterheads, payment receipts and school documents
+
+Everything on a page but its fields (logo, school and campus lines, frame,
+titles, fixed wording, signature boxes) is the same for every receipt or
+document of a campus. It is built once per campus and document type as a
+reportlab Drawing and kept in memory; each PDF emits it once as a form XObject
+that all its pages reference, so a page only draws its own values. Text uses
+the standard PDF fonts, which need no loading or embedding. ReportLab (and
+PIL, for the logo) is imported on first use, never at startup.
+"""
+
+import os
+from datetime import date
+from functools import lru_cache
+from typing import List, Optional
+
+SCHOOL_NAME = "SUP'INTER"
+# PNG/JPEG drawn at the top left of the letterhead; the school name is written instead when unset
+PRINT_LOGO = os.environ.get('PRINT_LOGO')
+
+NAVY, GREY = "#0f172a", "#64748b"
+
+RECEIPT_LABELS = ["N° de reçu", "Date", "Reçu de", "Matricule", "Classe", "Année académique", "Motif", "Détail"]
+RECEIPT_TOP = 400
+RECEIPT_STEP = 24
+VALUE_X = 150
+
+# document_type (as in archives) -> title; the fixed closing sentence of the letters
+DOCUMENT_TYPES = {
+    "diploma": "DIPLÔME",
+    "attestation_inscription": "ATTESTATION D'INSCRIPTION",
+    "certificate_scolarite": "CERTIFICAT DE SCOLARITÉ",
+}
+LETTER_CLOSINGS = {
+    "attestation_inscription": "En foi de quoi la présente attestation lui est délivrée pour servir et valoir ce que de droit.",
+    "certificate_scolarite": "En foi de quoi le présent certificat lui est délivré pour servir et valoir ce que de droit.",
+}
+LETTER_TOP = 560
+
+
+def money(amount) -> str:
+    return f"{amount or 0:,.0f} FCFA".replace(",", " ")
+
+
+def receipt_number(transaction: dict) -> str:
+    return transaction["id"][:8].upper()
+
+
+def french_date(value) -> str:
+    if not value:
+        return "-"
+    try:
+        return date.fromisoformat(str(value)[:10]).strftime("%d/%m/%Y")
+    except ValueError:
+        return str(value)
+
+
+@lru_cache(maxsize=1)
+def logo():
+    if not PRINT_LOGO or not os.path.exists(PRINT_LOGO):
+        return None
+    from reportlab.lib.utils import ImageReader
+    return ImageReader(PRINT_LOGO)
+
+
+def campus_key(campus: Optional[dict]) -> tuple:
+    """The campus details a letterhead depends on (a renamed campus gets a new one)"""
+    campus = campus or {}
+    return campus.get("name") or "", campus.get("address") or "", campus.get("phone") or ""
+
+
+def add_letterhead(page, name: str, address: str, phone: str):
+    """School name (unless there is a logo), campus lines and rule at the top of a portrait page"""
+    from reportlab.graphics.shapes import Line, String
+    from reportlab.lib import colors
+
+    width, height = page.width, page.height
+    if logo() is None:
+        page.add(String(40, height - 70, SCHOOL_NAME, fontName="Helvetica-Bold", fontSize=20, fillColor=colors.HexColor(NAVY)))
+    header = [line for line in (name, address, f"Tél. : {phone}" if phone else "") if line]
+    for i, line in enumerate(header):
+        page.add(String(width - 40, height - 52 - 13 * i, line, textAnchor="end",
+                        fontName="Helvetica-Bold" if i == 0 else "Helvetica", fontSize=9, fillColor=colors.HexColor(GREY)))
+    page.add(Line(40, height - 100, width - 40, height - 100, strokeColor=colors.HexColor(NAVY), strokeWidth=0.5))
+
+
+def use_template(pdf, forms: dict, key: tuple, template):
+    """Draw a cached Drawing on the current page, emitting it as a form XObject the first time in this PDF"""
+    from reportlab.graphics import renderPDF
+
+    if key not in forms:
+        forms[key] = f"Template{len(forms)}"
+        pdf.beginForm(forms[key])
+        renderPDF.draw(template, pdf, 0, 0)
+        if logo() is not None:
+            pdf.drawImage(logo(), 40, template.height - 90, width=120, height=60, preserveAspectRatio=True, anchor="sw", mask="auto")
+        pdf.endForm()
+    pdf.doForm(forms[key])
+
+
+# ===================== RECEIPTS =====================
+@lru_cache(maxsize=64)
+def receipt_letterhead(name: str, address: str, phone: str):
+    """Static part of a campus's receipt page (A5), built once per campus details"""
+    from reportlab.graphics.shapes import Drawing, Rect, String
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A5
+
+    width, height = A5
+    navy, grey = colors.HexColor(NAVY), colors.HexColor(GREY)
+    page = Drawing(width, height)
+    page.add(Rect(20, 20, width - 40, height - 40, fillColor=None, strokeColor=navy, strokeWidth=1))
+    add_letterhead(page, name, address, phone)
+    page.add(String(width / 2, height - 135, "REÇU DE PAIEMENT", textAnchor="middle", fontName="Helvetica-Bold", fontSize=16, fillColor=navy))
+    for i, label in enumerate(RECEIPT_LABELS):
+        page.add(String(45, RECEIPT_TOP - RECEIPT_STEP * i, f"{label} :", fontName="Helvetica", fontSize=10, fillColor=grey))
+    amount_y = RECEIPT_TOP - RECEIPT_STEP * len(RECEIPT_LABELS) - 14
+    page.add(Rect(40, amount_y - 12, width - 80, 34, fillColor=colors.HexColor("#f1f5f9"), strokeColor=navy, strokeWidth=0.5))
+    page.add(String(50, amount_y, "Montant versé", fontName="Helvetica-Bold", fontSize=12, fillColor=navy))
+    page.add(String(width - 45, 150, "Signature et cachet de la caisse", textAnchor="end", fontName="Helvetica", fontSize=9, fillColor=grey))
+    page.add(Rect(width - 210, 70, 165, 70, fillColor=None, strokeColor=grey, strokeWidth=0.5))
+    page.add(String(width / 2, 35, "Ce reçu tient lieu de justificatif de paiement. Conservez-le.",
+                    textAnchor="middle", fontName="Helvetica-Oblique", fontSize=8, fillColor=grey))
+    return page
+
+
+def receipt_values(transaction: dict, student: Optional[dict], class_name: Optional[str], year_name: Optional[str]) -> List[str]:
+    """The variable fields of a receipt, in RECEIPT_LABELS order"""
+    student = student or {}
+    payer = f"{student.get('last_name', '')} {student.get('first_name', '')}".strip()
+    return [
+        receipt_number(transaction), str(transaction.get("date") or "")[:10], payer or "-",
+        student.get("matricule") or "-", class_name or "-", year_name or "-",
+        transaction.get("category") or "-", transaction.get("description") or "-",
+    ]
+
+
+def write_receipts(out, receipts: list):
+    """One A5 page per receipt; each receipt is {"campus": campus row, "values": receipt_values(...), "amount": float}"""
+    from reportlab.lib.pagesizes import A5
+    from reportlab.pdfgen.canvas import Canvas
+
+    width, _ = A5
+    pdf = Canvas(out, pagesize=A5)
+    pdf.setTitle("Reçus de paiement" if len(receipts) != 1 else f"Reçu {receipts[0]['values'][0]}")
+    pdf.setAuthor(SCHOOL_NAME)
+    forms = {}
+    for receipt in receipts:
+        key = campus_key(receipt["campus"])
+        use_template(pdf, forms, key, receipt_letterhead(*key))
+        pdf.setFont("Helvetica-Bold", 10)
+        for i, value in enumerate(receipt["values"]):
+            pdf.drawString(VALUE_X, RECEIPT_TOP - RECEIPT_STEP * i, value[:60])
+        pdf.setFont("Helvetica-Bold", 14)
+        pdf.drawRightString(width - 50, RECEIPT_TOP - RECEIPT_STEP * len(RECEIPT_LABELS) - 14, money(receipt["amount"]))
+        pdf.showPage()
+    if not receipts:
+        pdf.showPage()
+    pdf.save()
+
+
+# ===================== SCHOOL DOCUMENTS =====================
+def document_pagesize(document_type: str) -> tuple:
+    from reportlab.lib.pagesizes import A4, landscape
+    return landscape(A4) if document_type == "diploma" else A4
+
+
+@lru_cache(maxsize=64)
+def document_template(document_type: str, name: str, address: str, phone: str):
+    """Static part of a campus's diploma (A4 landscape) or letter (A4), built once per type and campus details"""
+    from reportlab.graphics.shapes import Drawing, Rect, String
+    from reportlab.lib import colors
+    from reportlab.lib.utils import simpleSplit
+
+    width, height = document_pagesize(document_type)
+    navy, grey = colors.HexColor(NAVY), colors.HexColor(GREY)
+    page = Drawing(width, height)
+    title = DOCUMENT_TYPES[document_type]
+    if document_type == "diploma":
+        gold = colors.HexColor("#b45309")
+        page.add(Rect(18, 18, width - 36, height - 36, fillColor=None, strokeColor=gold, strokeWidth=3))
+        page.add(Rect(28, 28, width - 56, height - 56, fillColor=None, strokeColor=navy, strokeWidth=0.75))
+        page.add(String(width / 2, height - 80, SCHOOL_NAME, textAnchor="middle", fontName="Times-Bold", fontSize=26, fillColor=navy))
+        if name:
+            page.add(String(width / 2, height - 100, name, textAnchor="middle", fontName="Times-Roman", fontSize=12, fillColor=grey))
+        page.add(String(width / 2, height - 170, title, textAnchor="middle", fontName="Times-Bold", fontSize=44, fillColor=gold))
+        page.add(String(width / 2, height - 255, "est décerné à", textAnchor="middle", fontName="Times-Italic", fontSize=16, fillColor=grey))
+        for x, label in ((190, "Le Directeur des études"), (width - 190, "Le Fondateur")):
+            page.add(String(x, 110, label, textAnchor="middle", fontName="Times-Bold", fontSize=12, fillColor=navy))
+        return page
+
+    page.add(Rect(20, 20, width - 40, height - 40, fillColor=None, strokeColor=navy, strokeWidth=1))
+    add_letterhead(page, name, address, phone)
+    page.add(String(width / 2, height - 170, title, textAnchor="middle", fontName="Helvetica-Bold", fontSize=20, fillColor=navy))
+    closing = simpleSplit(LETTER_CLOSINGS[document_type], "Helvetica", 11, width - 140)
+    for i, line in enumerate(closing):
+        page.add(String(70, 360 - 16 * i, line, fontName="Helvetica", fontSize=11, fillColor=navy))
+    page.add(String(width - 70, 230, "Le Directeur", textAnchor="end", fontName="Helvetica-Bold", fontSize=11, fillColor=navy))
+    page.add(String(width / 2, 35, "Toute rature ou surcharge rend ce document nul.",
+                    textAnchor="middle", fontName="Helvetica-Oblique", fontSize=8, fillColor=grey))
+    return page
+
+
+def document_fields(document_type: str, student: dict, context: dict) -> dict:
+    """The variable text of a student's document; context holds the class, formation, filière, level, year and campus names"""
+    feminine = (student.get("gender") or "").upper().startswith("F")
+    born = "née" if feminine else "né"
+    full_name = f"{(student.get('last_name') or '').upper()} {student.get('first_name') or ''}".strip()
+    birth = f"{born} le {french_date(student.get('birth_date'))}" + (f" à {student['birth_place']}" if student.get("birth_place") else "")
+    fields = {
+        "name": full_name, "birth": birth, "matricule": student.get("matricule") or "-",
+        "issued": f"Fait à {context.get('campus') or SCHOOL_NAME}, le {date.today().strftime('%d/%m/%Y')}",
+        **context,
+    }
+    if document_type != "diploma":
+        civility = "Mme" if feminine else "M."
+        enrolled = "inscrite" if feminine else "inscrit"
+        course = f"{context.get('formation') or '-'}, filière {context.get('filiere') or '-'}, niveau {context.get('level') or '-'}"
+        statement = (
+            f"Le Directeur de {SCHOOL_NAME}, soussigné, atteste que {civility} {full_name}, {birth}, matricule {fields['matricule']}, "
+            f"est régulièrement {enrolled} au titre de l'année académique {context.get('year') or '-'} en {course} "
+            f"(classe {context.get('class') or '-'})."
+            if document_type == "attestation_inscription" else
+            f"Le Directeur de {SCHOOL_NAME}, soussigné, certifie que {civility} {full_name}, {birth}, matricule {fields['matricule']}, "
+            f"suit régulièrement les enseignements de {course} (classe {context.get('class') or '-'}) "
+            f"au titre de l'année académique {context.get('year') or '-'}."
+        )
+        fields["statement"] = statement
+    return fields
+
+
+def draw_document(pdf, document_type: str, fields: dict):
+    from reportlab.lib.utils import simpleSplit
+
+    width, height = document_pagesize(document_type)
+    if document_type == "diploma":
+        pdf.setFillColorRGB(0.06, 0.09, 0.16)
+        pdf.setFont("Times-Italic", 18)
+        pdf.drawCentredString(width / 2, height - 210, f"de {fields.get('formation') or '-'}")
+        pdf.setFont("Times-Bold", 30)
+        pdf.drawCentredString(width / 2, height - 300, fields["name"])
+        pdf.setFont("Times-Roman", 14)
+        pdf.drawCentredString(width / 2, height - 330, fields["birth"])
+        pdf.drawCentredString(width / 2, height - 360, f"Filière {fields.get('filiere') or '-'}, {fields.get('level') or '-'}")
+        pdf.drawCentredString(width / 2, height - 385, f"Année académique {fields.get('year') or '-'}")
+        pdf.setFont("Times-Roman", 11)
+        pdf.drawCentredString(width / 2, 150, fields["issued"])
+        pdf.drawString(45, 45, f"N° {fields['matricule']}")
+        return
+    pdf.setFillColorRGB(0.06, 0.09, 0.16)
+    pdf.setFont("Helvetica", 11)
+    for i, line in enumerate(simpleSplit(fields["statement"], "Helvetica", 11, width - 140)):
+        pdf.drawString(70, LETTER_TOP - 18 * i, line)
+    pdf.drawRightString(width - 70, 260, fields["issued"])
+    pdf.setFont("Helvetica", 8)
+    pdf.drawString(40, 45, f"Réf. {fields['matricule']}")
+
+
+def write_documents(out, document_type: str, documents):
+    """One page per document of the iterable; each is {"campus": campus row, "fields": document_fields(...)}"""
+    from reportlab.pdfgen.canvas import Canvas
+
+    pdf = Canvas(out, pagesize=document_pagesize(document_type))
+    pdf.setTitle(DOCUMENT_TYPES[document_type].capitalize())
+    pdf.setAuthor(SCHOOL_NAME)
+    forms = {}
+    pages = 0
+    for document in documents:
+        key = campus_key(document["campus"])
+        use_template(pdf, forms, key, document_template(document_type, *key))
+        draw_document(pdf, document_type, document["fields"])
+        pdf.showPage()
+        pages += 1
+    if not pages:
+        pdf.showPage()
+    pdf.save()
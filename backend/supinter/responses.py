@@ -0,0 +1,125 @@
+"""
+Response helpers shared by the list routes: delta sync, fast encoding, ETags
+"""
+
+import hashlib
+import os
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from fastapi import HTTPException, Response, Request
+from fastapi.responses import ORJSONResponse
+
+from request_timing import phase
+from supinter.db import supabase, table_versions
+from supinter.models import DeltaResponse, UserRole
+
+# ===================== DELTA SYNC =====================
+# List routes accept ?updated_since=<watermark>: they then return only the rows
+# changed since the watermark, the ids deleted since (from the `tombstones`
+# table, within the campus and year the list is restricted to) and a new
+# watermark. Full loads return the watermark in a header. Tombstones are pruned
+# after TOMBSTONE_RETENTION_DAYS, so an older watermark gets a 410: the client
+# may hold rows whose deletion is no longer known and must reload the list.
+EPOCH_WATERMARK = "1970-01-01T00:00:00"
+TOMBSTONE_RETENTION_DAYS = int(os.environ.get('TOMBSTONE_RETENTION_DAYS', '90'))
+# Watermarks handed out are never older than this, so a list nobody changes
+# does not age past the retention window (rows are re-sent at the watermark)
+WATERMARK_LAG = timedelta(days=1)
+
+def utc_now() -> datetime:
+    """Current time as the database stores a TIMESTAMP column (naive UTC)"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def parse_watermark(updated_since: Optional[str]) -> Optional[str]:
+    if updated_since is None:
+        return None
+    try:
+        watermark = datetime.fromisoformat(updated_since)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Watermark invalide")
+    if watermark.tzinfo is not None:
+        watermark = watermark.astimezone(timezone.utc).replace(tzinfo=None)
+    if watermark < utc_now() - timedelta(days=TOMBSTONE_RETENTION_DAYS):
+        raise HTTPException(status_code=410, detail="Watermark expiré, rechargez la liste complète")
+    return updated_since
+
+def campus_scope(current_user: dict, campus_id: Optional[str] = None) -> Optional[str]:
+    """The campus a list is restricted to: the one asked for, else the caller's own (founders see all)"""
+    if campus_id or current_user["role"] == UserRole.FOUNDER:
+        return campus_id
+    return current_user["campus_id"]
+
+def changed_since(query, updated_since: Optional[str]):
+    """Restrict a query to rows updated at or after the watermark"""
+    if updated_since:
+        query = query.gte('updated_at', parse_watermark(updated_since))
+    return query
+
+def delta_result(table: str, rows: list, result: list, updated_since: Optional[str], response: Response,
+                 campus_id: Optional[str] = None, academic_year_id: Optional[str] = None):
+    """Wrap a list result for delta sync (rows are re-sent at the watermark, updates are idempotent)
+
+    campus_id and academic_year_id are the filters of the list query, applied
+    to its deletions too. Deletions outside its other filters may be listed:
+    the client holds no such row and ignores them.
+    """
+    floor = (utc_now() - WATERMARK_LAG).isoformat()
+    watermark = max([r["updated_at"] for r in rows if r.get("updated_at")] + [updated_since or EPOCH_WATERMARK, floor])
+    if not updated_since:
+        response.headers["X-Sync-Watermark"] = watermark
+        return result
+    query = supabase.table('tombstones').select('row_id', 'deleted_at').eq('table_name', table).gte('deleted_at', updated_since)
+    if campus_id:
+        query = query.eq('campus_id', campus_id)
+    if academic_year_id:
+        query = query.eq('academic_year_id', academic_year_id)
+    tombstones = query.execute().data
+    watermark = max([watermark] + [t["deleted_at"] for t in tombstones])
+    return DeltaResponse.model_construct(items=result, deleted=[t["row_id"] for t in tombstones], watermark=watermark)
+
+# ===================== FAST RESPONSES =====================
+# Large list routes opt in to a fast path: rows come straight from our own
+# database, so instead of building and re-validating one Pydantic model per
+# row they are projected onto the response model's fields and encoded with
+# orjson. Set FAST_RESPONSES=false to fall back to the validated path.
+FAST_RESPONSES = os.environ.get('FAST_RESPONSES', 'true').lower() == 'true'
+
+model_fields_cache = {}
+
+def trusted_rows(model, rows: list) -> list:
+    """Project trusted rows onto a response model's fields, without validation"""
+    fields = model_fields_cache.get(model)
+    if fields is None:
+        fields = [(name, None if field.is_required() else field.get_default()) for name, field in model.model_fields.items()]
+        model_fields_cache[model] = fields
+    return [{name: row.get(name, default) for name, default in fields} for row in rows]
+
+def fast_response(model, payload, response: Response) -> ORJSONResponse:
+    """Encode a list (or delta) of trusted rows with orjson, bypassing response_model"""
+    with phase("serialize"):
+        if isinstance(payload, DeltaResponse):
+            content = {"items": trusted_rows(model, payload.items), "deleted": payload.deleted, "watermark": payload.watermark}
+        else:
+            content = trusted_rows(model, payload)
+        headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+        return ORJSONResponse(content, headers=headers)
+
+# ===================== CONDITIONAL REQUESTS =====================
+# Reference lists get a strong ETag derived from the versions of every table
+# they are built from, the query string and the caller's campus scope. A
+# matching If-None-Match is answered with 304 before any upstream call.
+def compute_etag(tables: List[str], request: Request, current_user: Optional[dict] = None) -> str:
+    scope = (current_user["role"], current_user["campus_id"]) if current_user else None
+    key = repr((table_versions.generation, [(t, table_versions[t]) for t in tables], sorted(request.query_params.multi_items()), scope))
+    return f'"{hashlib.sha1(key.encode()).hexdigest()}"'
+
+def check_not_modified(tables: List[str], request: Request, response: Response, current_user: Optional[dict] = None) -> Optional[Response]:
+    """Return a 304 response if the client copy is current, else tag the response"""
+    etag = compute_etag(tables, request, current_user)
+    if_none_match = request.headers.get("if-none-match", "")
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
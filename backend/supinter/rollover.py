@@ -0,0 +1,78 @@
+"""
+Year rollover: whole-class promotion and cloning of classes into a new year
+
+Students keep a single row whose academic_year_id, level and class move from
+year to year (see POST /students/{id}/reenroll). Promotion moves every passing
+student of a class with a few filtered bulk updates instead of one request
+(and a full student read) per student. Subjects belong to a formation, filière
+and level, not to a year, so a new year only needs its classes.
+"""
+
+import uuid
+from typing import Optional
+
+from supinter.db import chunks, supabase
+
+
+def student_averages(student_ids: list, academic_year_id: str) -> dict:
+    """student id -> year average (grades weighted by subject coefficient), for students with grades"""
+    grades = []
+    for ids in chunks(student_ids):
+        grades += (supabase.table('grades').select('student_id, subject_id, value')
+                   .in_('student_id', ids).eq('academic_year_id', academic_year_id).no_cache().execute().data)
+    subject_ids = list({g["subject_id"] for g in grades})
+    coefficients = {}
+    for ids in chunks(subject_ids):
+        coefficients.update({s["id"]: s.get("coefficient") or 1.0 for s in supabase.table('subjects').select('id, coefficient').in_('id', ids).execute().data})
+    totals = {}
+    for g in grades:
+        weight = coefficients.get(g["subject_id"], 1.0)
+        points, weights = totals.get(g["student_id"], (0.0, 0.0))
+        totals[g["student_id"]] = (points + g["value"] * weight, weights + weight)
+    return {student_id: points / weights for student_id, (points, weights) in totals.items() if weights}
+
+
+def promote_class(source: dict, target: dict, min_average: float = 10.0, include_ungraded: bool = False, job=None) -> dict:
+    """Move the passing students of class `source` into class `target` (and its year, level...)"""
+    students = (supabase.table('students').select('id').eq('class_id', source["id"])
+                .eq('academic_year_id', source["academic_year_id"]).no_cache().execute().data)
+    ids = [s["id"] for s in students]
+    averages = student_averages(ids, source["academic_year_id"])
+    passing = [i for i in ids if (i in averages and averages[i] >= min_average) or (include_ungraded and i not in averages)]
+    changes = {
+        "academic_year_id": target["academic_year_id"], "formation_id": target["formation_id"],
+        "filiere_id": target["filiere_id"], "level_id": target["level_id"], "class_id": target["id"],
+    }
+    if job:
+        job.advance(0, total=len(passing), message=f"{len(passing)} étudiant(s) admis sur {len(ids)}")
+    promoted = 0
+    for batch in chunks(passing):
+        # Still filtered on the source class, so a student moved meanwhile is left alone
+        promoted += len(supabase.table('students').update(changes).eq('class_id', source["id"]).in_('id', batch).execute().data)
+        if job:
+            job.advance(len(batch))
+    return {
+        "students": len(ids),
+        "promoted": promoted,
+        "held_back": sum(1 for i in ids if i in averages and averages[i] < min_average),
+        "ungraded": sum(1 for i in ids if i not in averages),
+    }
+
+
+def clone_classes(source_year_id: str, target_year_id: str, campus_id: Optional[str] = None, dry_run: bool = False) -> dict:
+    """Copy the classes of a year into another, skipping codes the target year already has on the campus"""
+    query = supabase.table('classes').select('*').eq('academic_year_id', source_year_id)
+    existing_query = supabase.table('classes').select('code, campus_id').eq('academic_year_id', target_year_id)
+    if campus_id:
+        query, existing_query = query.eq('campus_id', campus_id), existing_query.eq('campus_id', campus_id)
+    classes = query.no_cache().execute().data
+    existing = {(c["code"], c["campus_id"]) for c in existing_query.no_cache().execute().data}
+    copies = [{
+        "id": str(uuid.uuid4()), "name": c["name"], "code": c["code"], "formation_id": c["formation_id"],
+        "filiere_id": c["filiere_id"], "level_id": c["level_id"], "campus_id": c["campus_id"],
+        "academic_year_id": target_year_id,
+    } for c in classes if (c["code"], c["campus_id"]) not in existing]
+    if not dry_run:
+        for batch in chunks(copies):
+            supabase.table('classes').insert(batch).execute()
+    return {"classes": len(classes), "created": len(copies), "existing": len(classes) - len(copies)}
@@ -0,0 +1 @@
+"""One router per domain, imported by create_app() only when mounted"""
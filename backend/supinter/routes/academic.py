@@ -0,0 +1,579 @@
+"""
+Academic structure routes: campuses, academic years, formations, filières,
+levels, classes, subjects, professors, their hours and staff
+"""
+
+import uuid
+from typing import List, Optional, Union
+
+from fastapi import APIRouter, HTTPException, Depends, Response, Request
+
+from photo_store import photo_store
+from request_timing import TimedRoute
+from supinter.auth import get_current_user
+from supinter.db import supabase
+from supinter.models import (
+    UserRole, DeltaResponse,
+    CampusCreate, CampusResponse, AcademicYearCreate, AcademicYearResponse,
+    FormationCreate, FormationResponse, FiliereCreate, FiliereResponse, LevelCreate, LevelResponse,
+    ClassCreate, ClassResponse, SubjectCreate, SubjectResponse,
+    ProfessorCreate, ProfessorResponse, ProfessorHoursCreate, ProfessorHoursResponse, StaffCreate, StaffResponse,
+)
+from supinter.responses import campus_scope, changed_since, check_not_modified, delta_result
+
+router = APIRouter(prefix="/api", route_class=TimedRoute)
+
+# ===================== CAMPUS ROUTES =====================
+@router.post("/campuses", response_model=CampusResponse)
+async def create_campus(campus_data: CampusCreate):
+    campus_id = str(uuid.uuid4())
+    campus_doc = {
+        "id": campus_id,
+        "name": campus_data.name,
+        "address": campus_data.address,
+        "phone": campus_data.phone
+    }
+    response = supabase.table('campuses').insert(campus_doc).execute()
+    if not response.data:
+        raise HTTPException(status_code=400, detail="Erreur lors de la création")
+    return CampusResponse(**campus_doc)
+
+@router.get("/campuses", response_model=Union[List[CampusResponse], DeltaResponse[CampusResponse]])
+async def get_campuses(request: Request, response: Response, updated_since: Optional[str] = None):
+    not_modified = check_not_modified(['campuses'], request, response)
+    if not_modified:
+        return not_modified
+    campuses = changed_since(supabase.table('campuses').select('*'), updated_since).execute().data
+    return delta_result('campuses', campuses, [CampusResponse(**c) for c in campuses], updated_since, response)
+
+@router.put("/campuses/{campus_id}", response_model=CampusResponse)
+async def update_campus(campus_id: str, campus_data: CampusCreate, current_user: dict = Depends(get_current_user)):
+    response = supabase.table('campuses').update({
+        "name": campus_data.name,
+        "address": campus_data.address,
+        "phone": campus_data.phone
+    }).eq('id', campus_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Campus non trouvé")
+    return CampusResponse(id=campus_id, **campus_data.model_dump())
+
+@router.delete("/campuses/{campus_id}")
+async def delete_campus(campus_id: str, current_user: dict = Depends(get_current_user)):
+    response = supabase.table('campuses').delete().eq('id', campus_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Campus non trouvé")
+    return {"message": "Campus supprimé"}
+
+# ===================== ACADEMIC YEAR ROUTES =====================
+@router.post("/academic-years", response_model=AcademicYearResponse)
+async def create_academic_year(year_data: AcademicYearCreate):
+    year_id = str(uuid.uuid4())
+    year_doc = {
+        "id": year_id,
+        "name": year_data.name,
+        "start_date": year_data.start_date,
+        "end_date": year_data.end_date,
+        "is_active": year_data.is_active
+    }
+    if year_data.is_active:
+        supabase.table('academic_years').update({"is_active": False}).execute()
+    response = supabase.table('academic_years').insert(year_doc).execute()
+    if not response.data:
+        raise HTTPException(status_code=400, detail="Erreur lors de la création")
+    return AcademicYearResponse(**year_doc)
+
+@router.get("/academic-years", response_model=Union[List[AcademicYearResponse], DeltaResponse[AcademicYearResponse]])
+async def get_academic_years(request: Request, response: Response, updated_since: Optional[str] = None):
+    not_modified = check_not_modified(['academic_years'], request, response)
+    if not_modified:
+        return not_modified
+    years = changed_since(supabase.table('academic_years').select('*'), updated_since).execute().data
+    return delta_result('academic_years', years, [AcademicYearResponse(**y) for y in years], updated_since, response)
+
+@router.put("/academic-years/{year_id}", response_model=AcademicYearResponse)
+async def update_academic_year(year_id: str, year_data: AcademicYearCreate, current_user: dict = Depends(get_current_user)):
+    if year_data.is_active:
+        supabase.table('academic_years').update({"is_active": False}).execute()
+    response = supabase.table('academic_years').update(year_data.model_dump()).eq('id', year_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Année académique non trouvée")
+    return AcademicYearResponse(id=year_id, **year_data.model_dump())
+
+@router.delete("/academic-years/{year_id}")
+async def delete_academic_year(year_id: str, current_user: dict = Depends(get_current_user)):
+    response = supabase.table('academic_years').delete().eq('id', year_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Année académique non trouvée")
+    return {"message": "Année académique supprimée"}
+
+# ===================== FORMATION ROUTES =====================
+@router.post("/formations", response_model=FormationResponse)
+async def create_formation(formation_data: FormationCreate):
+    formation_id = str(uuid.uuid4())
+    formation_doc = {
+        "id": formation_id,
+        "name": formation_data.name,
+        "code": formation_data.code
+    }
+    response = supabase.table('formations').insert(formation_doc).execute()
+    if not response.data:
+        raise HTTPException(status_code=400, detail="Erreur lors de la création")
+    return FormationResponse(**formation_doc)
+
+@router.get("/formations", response_model=Union[List[FormationResponse], DeltaResponse[FormationResponse]])
+async def get_formations(request: Request, response: Response, updated_since: Optional[str] = None):
+    not_modified = check_not_modified(['formations'], request, response)
+    if not_modified:
+        return not_modified
+    formations = changed_since(supabase.table('formations').select('*'), updated_since).execute().data
+    return delta_result('formations', formations, [FormationResponse(**f) for f in formations], updated_since, response)
+
+@router.put("/formations/{formation_id}", response_model=FormationResponse)
+async def update_formation(formation_id: str, formation_data: FormationCreate, current_user: dict = Depends(get_current_user)):
+    response = supabase.table('formations').update(formation_data.model_dump()).eq('id', formation_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Formation non trouvée")
+    return FormationResponse(id=formation_id, **formation_data.model_dump())
+
+@router.delete("/formations/{formation_id}")
+async def delete_formation(formation_id: str, current_user: dict = Depends(get_current_user)):
+    response = supabase.table('formations').delete().eq('id', formation_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Formation non trouvée")
+    return {"message": "Formation supprimée"}
+
+# ===================== FILIERE ROUTES =====================
+@router.post("/filieres", response_model=FiliereResponse)
+async def create_filiere(filiere_data: FiliereCreate):
+    filiere_id = str(uuid.uuid4())
+    filiere_doc = {
+        "id": filiere_id,
+        "name": filiere_data.name,
+        "code": filiere_data.code
+    }
+    response = supabase.table('filieres').insert(filiere_doc).execute()
+    if not response.data:
+        raise HTTPException(status_code=400, detail="Erreur lors de la création")
+    
+    # Insert many-to-many relationships
+    for formation_id in filiere_data.formation_ids:
+        supabase.table('filiere_formations').insert({
+            "filiere_id": filiere_id,
+            "formation_id": formation_id
+        }).execute()
+    
+    return FiliereResponse(**filiere_doc, formation_ids=filiere_data.formation_ids)
+
+@router.get("/filieres", response_model=Union[List[FiliereResponse], DeltaResponse[FiliereResponse]])
+async def get_filieres(request: Request, response: Response, formation_id: Optional[str] = None, updated_since: Optional[str] = None):
+    not_modified = check_not_modified(['filieres', 'filiere_formations', 'formations'], request, response)
+    if not_modified:
+        return not_modified
+    query = changed_since(supabase.table('filieres').select('*'), updated_since)
+    if formation_id:
+        # Get filieres linked to this formation
+        ff_response = supabase.table('filiere_formations').select('filiere_id').eq('formation_id', formation_id).execute()
+        filiere_ids = [ff['filiere_id'] for ff in ff_response.data] if ff_response.data else []
+        if not filiere_ids:
+            return delta_result('filieres', [], [], updated_since, response)
+        query = query.in_('id', filiere_ids)
+    
+    filieres = query.execute().data
+    result = []
+    for f in filieres:
+        # Get formation_ids for this filiere
+        ff_response = supabase.table('filiere_formations').select('formation_id').eq('filiere_id', f['id']).execute()
+        formation_ids = [ff['formation_id'] for ff in ff_response.data] if ff_response.data else []
+        
+        # Get formations
+        if formation_ids:
+            formations_response = supabase.table('formations').select('*').in_('id', formation_ids).execute()
+            formations = formations_response.data if formations_response.data else []
+        else:
+            formations = []
+        
+        result.append(FiliereResponse(
+            id=f["id"],
+            name=f["name"],
+            code=f["code"],
+            formation_ids=formation_ids,
+            formations=[FormationResponse(**fmt) for fmt in formations]
+        ))
+    return delta_result('filieres', filieres, result, updated_since, response)
+
+@router.put("/filieres/{filiere_id}", response_model=FiliereResponse)
+async def update_filiere(filiere_id: str, filiere_data: FiliereCreate, current_user: dict = Depends(get_current_user)):
+    # Update filiere
+    response = supabase.table('filieres').update({
+        "name": filiere_data.name,
+        "code": filiere_data.code
+    }).eq('id', filiere_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Filière non trouvée")
+    
+    # Update many-to-many relationships
+    supabase.table('filiere_formations').delete().eq('filiere_id', filiere_id).execute()
+    for formation_id in filiere_data.formation_ids:
+        supabase.table('filiere_formations').insert({
+            "filiere_id": filiere_id,
+            "formation_id": formation_id
+        }).execute()
+    
+    return FiliereResponse(
+        id=filiere_id,
+        name=filiere_data.name,
+        code=filiere_data.code,
+        formation_ids=filiere_data.formation_ids
+    )
+
+@router.delete("/filieres/{filiere_id}")
+async def delete_filiere(filiere_id: str, current_user: dict = Depends(get_current_user)):
+    response = supabase.table('filieres').delete().eq('id', filiere_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Filière non trouvée")
+    return {"message": "Filière supprimée"}
+
+# ===================== LEVEL ROUTES =====================
+@router.post("/levels", response_model=LevelResponse)
+async def create_level(level_data: LevelCreate):
+    level_id = str(uuid.uuid4())
+    level_doc = {
+        "id": level_id,
+        "name": level_data.name,
+        "order": level_data.order
+    }
+    response = supabase.table('levels').insert(level_doc).execute()
+    if not response.data:
+        raise HTTPException(status_code=400, detail="Erreur lors de la création")
+    return LevelResponse(**level_doc)
+
+@router.get("/levels", response_model=Union[List[LevelResponse], DeltaResponse[LevelResponse]])
+async def get_levels(request: Request, response: Response, updated_since: Optional[str] = None):
+    not_modified = check_not_modified(['levels'], request, response)
+    if not_modified:
+        return not_modified
+    levels = changed_since(supabase.table('levels').select('*').order('order', desc=False), updated_since).execute().data
+    return delta_result('levels', levels, [LevelResponse(**l) for l in levels], updated_since, response)
+
+@router.put("/levels/{level_id}", response_model=LevelResponse)
+async def update_level(level_id: str, level_data: LevelCreate, current_user: dict = Depends(get_current_user)):
+    response = supabase.table('levels').update(level_data.model_dump()).eq('id', level_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Niveau non trouvé")
+    return LevelResponse(id=level_id, **level_data.model_dump())
+
+@router.delete("/levels/{level_id}")
+async def delete_level(level_id: str, current_user: dict = Depends(get_current_user)):
+    response = supabase.table('levels').delete().eq('id', level_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Niveau non trouvé")
+    return {"message": "Niveau supprimé"}
+
+# ===================== CLASS ROUTES =====================
+@router.post("/classes", response_model=ClassResponse)
+async def create_class(class_data: ClassCreate, current_user: dict = Depends(get_current_user)):
+    class_id = str(uuid.uuid4())
+    class_doc = {
+        "id": class_id,
+        **class_data.model_dump()
+    }
+    response = supabase.table('classes').insert(class_doc).execute()
+    if not response.data:
+        raise HTTPException(status_code=400, detail="Erreur lors de la création")
+    return ClassResponse(**class_doc)
+
+@router.get("/classes", response_model=Union[List[ClassResponse], DeltaResponse[ClassResponse]])
+async def get_classes(
+    request: Request,
+    response: Response,
+    academic_year_id: Optional[str] = None,
+    formation_id: Optional[str] = None,
+    filiere_id: Optional[str] = None,
+    level_id: Optional[str] = None,
+    campus_id: Optional[str] = None,
+    updated_since: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    not_modified = check_not_modified(
+        ['classes', 'formations', 'filieres', 'levels', 'campuses', 'academic_years'], request, response, current_user
+    )
+    if not_modified:
+        return not_modified
+    query = changed_since(supabase.table('classes').select('*'), updated_since)
+    if academic_year_id:
+        query = query.eq('academic_year_id', academic_year_id)
+    if formation_id:
+        query = query.eq('formation_id', formation_id)
+    if filiere_id:
+        query = query.eq('filiere_id', filiere_id)
+    if level_id:
+        query = query.eq('level_id', level_id)
+    campus_id = campus_scope(current_user, campus_id)
+    if campus_id:
+        query = query.eq('campus_id', campus_id)
+
+    classes = query.execute().data
+    result = []
+    for c in classes:
+        formation_response = supabase.table('formations').select('*').eq('id', c.get("formation_id")).execute()
+        formation = formation_response.data[0] if formation_response.data else None
+        filiere_response = supabase.table('filieres').select('*').eq('id', c.get("filiere_id")).execute()
+        filiere = filiere_response.data[0] if filiere_response.data else None
+        level_response = supabase.table('levels').select('*').eq('id', c.get("level_id")).execute()
+        level = level_response.data[0] if level_response.data else None
+        campus_response = supabase.table('campuses').select('*').eq('id', c.get("campus_id")).execute()
+        campus = campus_response.data[0] if campus_response.data else None
+        result.append(ClassResponse(
+            **c,
+            formation_name=formation.get("name") if formation else None,
+            filiere_name=filiere.get("name") if filiere else None,
+            level_name=level.get("name") if level else None,
+            campus_name=campus.get("name") if campus else None
+        ))
+    return delta_result('classes', classes, result, updated_since, response, campus_id, academic_year_id)
+
+@router.put("/classes/{class_id}", response_model=ClassResponse)
+async def update_class(class_id: str, class_data: ClassCreate, current_user: dict = Depends(get_current_user)):
+    response = supabase.table('classes').update(class_data.model_dump()).eq('id', class_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Classe non trouvée")
+    return ClassResponse(id=class_id, **class_data.model_dump())
+
+@router.delete("/classes/{class_id}")
+async def delete_class(class_id: str, current_user: dict = Depends(get_current_user)):
+    response = supabase.table('classes').delete().eq('id', class_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Classe non trouvée")
+    return {"message": "Classe supprimée"}
+
+# ===================== SUBJECT ROUTES =====================
+@router.post("/subjects", response_model=SubjectResponse)
+async def create_subject(subject_data: SubjectCreate, current_user: dict = Depends(get_current_user)):
+    subject_id = str(uuid.uuid4())
+    subject_doc = {
+        "id": subject_id,
+        **subject_data.model_dump()
+    }
+    response = supabase.table('subjects').insert(subject_doc).execute()
+    if not response.data:
+        raise HTTPException(status_code=400, detail="Erreur lors de la création")
+    return SubjectResponse(**subject_doc)
+
+@router.get("/subjects", response_model=Union[List[SubjectResponse], DeltaResponse[SubjectResponse]])
+async def get_subjects(
+    request: Request,
+    response: Response,
+    formation_id: Optional[str] = None,
+    filiere_id: Optional[str] = None,
+    level_id: Optional[str] = None,
+    updated_since: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    not_modified = check_not_modified(['subjects', 'formations', 'filieres', 'levels'], request, response, current_user)
+    if not_modified:
+        return not_modified
+    query = changed_since(supabase.table('subjects').select('*'), updated_since)
+    if formation_id:
+        query = query.eq('formation_id', formation_id)
+    if filiere_id:
+        query = query.eq('filiere_id', filiere_id)
+    if level_id:
+        query = query.eq('level_id', level_id)
+    
+    subjects = query.execute().data
+    return delta_result('subjects', subjects, [SubjectResponse(**s) for s in subjects], updated_since, response)
+
+@router.put("/subjects/{subject_id}", response_model=SubjectResponse)
+async def update_subject(subject_id: str, subject_data: SubjectCreate, current_user: dict = Depends(get_current_user)):
+    response = supabase.table('subjects').update(subject_data.model_dump()).eq('id', subject_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Matière non trouvée")
+    return SubjectResponse(id=subject_id, **subject_data.model_dump())
+
+@router.delete("/subjects/{subject_id}")
+async def delete_subject(subject_id: str, current_user: dict = Depends(get_current_user)):
+    response = supabase.table('subjects').delete().eq('id', subject_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Matière non trouvée")
+    return {"message": "Matière supprimée"}
+
+# ===================== PROFESSOR ROUTES =====================
+@router.post("/professors", response_model=ProfessorResponse)
+async def create_professor(professor_data: ProfessorCreate, current_user: dict = Depends(get_current_user)):
+    professor_id = str(uuid.uuid4())
+    campus_id = professor_data.campus_id
+    if current_user["role"] != UserRole.FOUNDER:
+        campus_id = current_user["campus_id"]
+    
+    professor_doc = {
+        "id": professor_id,
+        **professor_data.model_dump(),
+        "campus_id": campus_id
+    }
+    response = supabase.table('professors').insert(professor_doc).execute()
+    if not response.data:
+        raise HTTPException(status_code=400, detail="Erreur lors de la création")
+    
+    campus_response = supabase.table('campuses').select('*').eq('id', campus_id).execute()
+    campus = campus_response.data[0] if campus_response.data else None
+    return ProfessorResponse(**professor_doc, campus_name=campus.get("name") if campus else None)
+
+@router.get("/professors", response_model=Union[List[ProfessorResponse], DeltaResponse[ProfessorResponse]])
+async def get_professors(response: Response, campus_id: Optional[str] = None, updated_since: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    query = changed_since(supabase.table('professors').select('*'), updated_since)
+    campus_id = campus_scope(current_user, campus_id)
+    if campus_id:
+        query = query.eq('campus_id', campus_id)
+
+    professors = query.execute().data
+    result = []
+    for p in professors:
+        campus_response = supabase.table('campuses').select('*').eq('id', p.get("campus_id")).execute()
+        campus = campus_response.data[0] if campus_response.data else None
+        result.append(ProfessorResponse(**p, campus_name=campus.get("name") if campus else None))
+    return delta_result('professors', professors, result, updated_since, response, campus_id)
+
+@router.put("/professors/{professor_id}", response_model=ProfessorResponse)
+async def update_professor(professor_id: str, professor_data: ProfessorCreate, current_user: dict = Depends(get_current_user)):
+    response = supabase.table('professors').update(professor_data.model_dump()).eq('id', professor_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Professeur non trouvé")
+    campus_response = supabase.table('campuses').select('*').eq('id', professor_data.campus_id).execute()
+    campus = campus_response.data[0] if campus_response.data else None
+    return ProfessorResponse(id=professor_id, **professor_data.model_dump(), campus_name=campus.get("name") if campus else None)
+
+@router.delete("/professors/{professor_id}")
+async def delete_professor(professor_id: str, current_user: dict = Depends(get_current_user)):
+    response = supabase.table('professors').delete().eq('id', professor_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Professeur non trouvé")
+    return {"message": "Professeur supprimé"}
+
+# ===================== PROFESSOR HOURS ROUTES =====================
+@router.post("/professor-hours", response_model=ProfessorHoursResponse)
+async def create_professor_hours(hours_data: ProfessorHoursCreate, current_user: dict = Depends(get_current_user)):
+    hours_id = str(uuid.uuid4())
+    hours_doc = {
+        "id": hours_id,
+        **hours_data.model_dump(),
+        "total_hours_done": hours_data.hours_done,
+        "hours_remaining": hours_data.total_hours_planned - hours_data.hours_done
+    }
+    response = supabase.table('professor_hours').insert(hours_doc).execute()
+    if not response.data:
+        raise HTTPException(status_code=400, detail="Erreur lors de la création")
+    
+    professor_response = supabase.table('professors').select('*').eq('id', hours_data.professor_id).execute()
+    professor = professor_response.data[0] if professor_response.data else None
+    professor_name = f"{professor.get('first_name', '')} {professor.get('last_name', '')}" if professor else None
+    
+    return ProfessorHoursResponse(**hours_doc, professor_name=professor_name)
+
+@router.get("/professor-hours", response_model=Union[List[ProfessorHoursResponse], DeltaResponse[ProfessorHoursResponse]])
+async def get_professor_hours(
+    response: Response,
+    professor_id: Optional[str] = None,
+    academic_year_id: Optional[str] = None,
+    updated_since: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    query = changed_since(supabase.table('professor_hours').select('*'), updated_since)
+    if professor_id:
+        query = query.eq('professor_id', professor_id)
+    if academic_year_id:
+        query = query.eq('academic_year_id', academic_year_id)
+    
+    hours_list = query.execute().data
+    result = []
+    for h in hours_list:
+        professor_response = supabase.table('professors').select('*').eq('id', h.get("professor_id")).execute()
+        professor = professor_response.data[0] if professor_response.data else None
+        professor_name = f"{professor.get('first_name', '')} {professor.get('last_name', '')}" if professor else None
+        result.append(ProfessorHoursResponse(**h, professor_name=professor_name))
+    return delta_result('professor_hours', hours_list, result, updated_since, response, academic_year_id=academic_year_id)
+
+@router.put("/professor-hours/{hours_id}", response_model=ProfessorHoursResponse)
+async def update_professor_hours(hours_id: str, hours_data: ProfessorHoursCreate, current_user: dict = Depends(get_current_user)):
+    update_doc = {
+        **hours_data.model_dump(),
+        "total_hours_done": hours_data.hours_done,
+        "hours_remaining": hours_data.total_hours_planned - hours_data.hours_done
+    }
+    response = supabase.table('professor_hours').update(update_doc).eq('id', hours_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Heures non trouvées")
+    
+    professor_response = supabase.table('professors').select('*').eq('id', hours_data.professor_id).execute()
+    professor = professor_response.data[0] if professor_response.data else None
+    professor_name = f"{professor.get('first_name', '')} {professor.get('last_name', '')}" if professor else None
+    
+    return ProfessorHoursResponse(id=hours_id, **update_doc, professor_name=professor_name)
+
+@router.delete("/professor-hours/{hours_id}")
+async def delete_professor_hours(hours_id: str, current_user: dict = Depends(get_current_user)):
+    response = supabase.table('professor_hours').delete().eq('id', hours_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Heures non trouvées")
+    return {"message": "Heures supprimées"}
+
+# ===================== STAFF ROUTES =====================
+@router.post("/staff", response_model=StaffResponse)
+async def create_staff(staff_data: StaffCreate, current_user: dict = Depends(get_current_user)):
+    staff_id = str(uuid.uuid4())
+    campus_id = staff_data.campus_id
+    if current_user["role"] != UserRole.FOUNDER:
+        campus_id = current_user["campus_id"]
+    
+    staff_doc = {
+        "id": staff_id,
+        **staff_data.model_dump(),
+        "photo": photo_store.ingest(staff_data.photo),
+        "campus_id": campus_id
+    }
+    response = supabase.table('staff').insert(staff_doc).execute()
+    if not response.data:
+        raise HTTPException(status_code=400, detail="Erreur lors de la création")
+    
+    campus_response = supabase.table('campuses').select('*').eq('id', campus_id).execute()
+    campus = campus_response.data[0] if campus_response.data else None
+    return StaffResponse(**staff_doc, campus_name=campus.get("name") if campus else None)
+
+@router.get("/staff", response_model=Union[List[StaffResponse], DeltaResponse[StaffResponse]])
+async def get_staff(
+    response: Response,
+    campus_id: Optional[str] = None,
+    academic_year_id: Optional[str] = None,
+    updated_since: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    query = changed_since(supabase.table('staff').select('*'), updated_since)
+    campus_id = campus_scope(current_user, campus_id)
+    if campus_id:
+        query = query.eq('campus_id', campus_id)
+    if academic_year_id:
+        query = query.eq('academic_year_id', academic_year_id)
+    
+    staff_list = query.execute().data
+    result = []
+    for s in staff_list:
+        campus_response = supabase.table('campuses').select('*').eq('id', s.get("campus_id")).execute()
+        campus = campus_response.data[0] if campus_response.data else None
+        result.append(StaffResponse(**s, campus_name=campus.get("name") if campus else None))
+    return delta_result('staff', staff_list, result, updated_since, response, campus_id, academic_year_id)
+
+@router.put("/staff/{staff_id}", response_model=StaffResponse)
+async def update_staff(staff_id: str, staff_data: StaffCreate, current_user: dict = Depends(get_current_user)):
+    update_doc = {**staff_data.model_dump(), "photo": photo_store.ingest(staff_data.photo)}
+    response = supabase.table('staff').update(update_doc).eq('id', staff_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Personnel non trouvé")
+    campus_response = supabase.table('campuses').select('*').eq('id', staff_data.campus_id).execute()
+    campus = campus_response.data[0] if campus_response.data else None
+    return StaffResponse(id=staff_id, **update_doc, campus_name=campus.get("name") if campus else None)
+
+@router.delete("/staff/{staff_id}")
+async def delete_staff(staff_id: str, current_user: dict = Depends(get_current_user)):
+    response = supabase.table('staff').delete().eq('id', staff_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Personnel non trouvé")
+    return {"message": "Personnel supprimé"}
@@ -0,0 +1,156 @@
+"""
+Authentication and user management routes
+"""
+
+import uuid
+from typing import List, Optional, Union
+
+from fastapi import APIRouter, HTTPException, Depends, Response
+
+from request_timing import TimedRoute
+from supinter.auth import password_hasher, get_password_hash, create_access_token, get_current_user
+from supinter.db import supabase
+from supinter.models import UserRole, UserCreate, UserLogin, UserResponse, TokenResponse, DeltaResponse
+from supinter.responses import campus_scope, changed_since, delta_result
+
+router = APIRouter(prefix="/api", route_class=TimedRoute)
+
+# ===================== AUTH ROUTES =====================
+@router.post("/auth/register", response_model=TokenResponse)
+async def register(user_data: UserCreate):
+    # Check if email already exists
+    existing = supabase.table('users').select('id').eq('email', user_data.email).no_cache().execute()
+    if existing.data:
+        raise HTTPException(status_code=400, detail="Email déjà utilisé")
+    
+    # Check if campus exists
+    campus_response = supabase.table('campuses').select('*').eq('id', user_data.campus_id).execute()
+    if not campus_response.data:
+        raise HTTPException(status_code=400, detail="Campus non trouvé")
+    campus = campus_response.data[0]
+    
+    user_id = str(uuid.uuid4())
+    hashed_password = await get_password_hash(user_data.password)
+    
+    user_doc = {
+        "id": user_id,
+        "email": user_data.email,
+        "password": hashed_password,
+        "name": user_data.name,
+        "role": user_data.role,
+        "campus_id": user_data.campus_id
+    }
+    
+    response = supabase.table('users').insert(user_doc).execute()
+    if not response.data:
+        raise HTTPException(status_code=400, detail="Erreur lors de la création de l'utilisateur")
+    
+    token = create_access_token({"sub": user_id})
+    user_response = UserResponse(
+        id=user_id,
+        email=user_data.email,
+        name=user_data.name,
+        role=user_data.role,
+        campus_id=user_data.campus_id,
+        campus_name=campus.get("name")
+    )
+    
+    return TokenResponse(access_token=token, user=user_response)
+
+@router.post("/auth/login", response_model=TokenResponse)
+async def login(credentials: UserLogin):
+    response = supabase.table('users').select('*').eq('email', credentials.email).no_cache().execute()
+    user = response.data[0] if response.data else None
+    valid, new_hash = await password_hasher.verify_and_update(credentials.password, user["password"] if user else None)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Email ou mot de passe incorrect")
+    if new_hash:
+        # Work factor raised since this hash was made: store the stronger one
+        supabase.table('users').update({"password": new_hash}).eq('id', user["id"]).execute()
+
+    campus_response = supabase.table('campuses').select('*').eq('id', user["campus_id"]).execute()
+    campus = campus_response.data[0] if campus_response.data else None
+
+    token = create_access_token({"sub": user["id"]})
+    user_response = UserResponse(
+        id=user["id"],
+        email=user["email"],
+        name=user["name"],
+        role=user["role"],
+        campus_id=user["campus_id"],
+        campus_name=campus.get("name") if campus else None
+    )
+
+    return TokenResponse(access_token=token, user=user_response)
+
+@router.get("/auth/me", response_model=UserResponse)
+async def get_me(current_user: dict = Depends(get_current_user)):
+    campus_response = supabase.table('campuses').select('*').eq('id', current_user["campus_id"]).execute()
+    campus = campus_response.data[0] if campus_response.data else None
+    return UserResponse(
+        id=current_user["id"],
+        email=current_user["email"],
+        name=current_user["name"],
+        role=current_user["role"],
+        campus_id=current_user["campus_id"],
+        campus_name=campus.get("name") if campus else None
+    )
+
+# ===================== USERS MANAGEMENT =====================
+@router.get("/users", response_model=Union[List[UserResponse], DeltaResponse[UserResponse]])
+async def get_users(response: Response, updated_since: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    query = changed_since(supabase.table('users').select('*'), updated_since)
+    campus_id = campus_scope(current_user)
+    if campus_id:
+        query = query.eq('campus_id', campus_id)
+
+    users = query.execute().data
+    result = []
+    for u in users:
+        campus_response = supabase.table('campuses').select('*').eq('id', u["campus_id"]).execute()
+        campus = campus_response.data[0] if campus_response.data else None
+        result.append(UserResponse(
+            id=u["id"],
+            email=u["email"],
+            name=u["name"],
+            role=u["role"],
+            campus_id=u["campus_id"],
+            campus_name=campus.get("name") if campus else None
+        ))
+    return delta_result('users', users, result, updated_since, response, campus_id)
+
+@router.put("/users/{user_id}", response_model=UserResponse)
+async def update_user(user_id: str, user_data: UserCreate, current_user: dict = Depends(get_current_user)):
+    user_response = supabase.table('users').select('*').eq('id', user_id).execute()
+    if not user_response.data:
+        raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
+    
+    update_data = {
+        "email": user_data.email,
+        "name": user_data.name,
+        "role": user_data.role,
+        "campus_id": user_data.campus_id
+    }
+    if user_data.password:
+        update_data["password"] = await get_password_hash(user_data.password)
+    
+    supabase.table('users').update(update_data).eq('id', user_id).execute()
+    
+    campus_response = supabase.table('campuses').select('*').eq('id', user_data.campus_id).execute()
+    campus = campus_response.data[0] if campus_response.data else None
+    
+    return UserResponse(
+        id=user_id,
+        email=user_data.email,
+        name=user_data.name,
+        role=user_data.role,
+        campus_id=user_data.campus_id,
+        campus_name=campus.get("name") if campus else None
+    )
+
+@router.delete("/users/{user_id}")
+async def delete_user(user_id: str, current_user: dict = Depends(get_current_user)):
+    response = supabase.table('users').delete().eq('id', user_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
+    return {"message": "Utilisateur supprimé"}
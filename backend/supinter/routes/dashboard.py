@@ -0,0 +1,159 @@
+"""
+Dashboard statistics
+"""
+
+import hashlib
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends
+
+from request_timing import TimedRoute
+from supinter.auth import get_current_user
+from supinter.db import supabase, table_versions, cache_store
+from supinter.models import UserRole
+
+router = APIRouter(prefix="/api", route_class=TimedRoute)
+
+# ===================== DASHBOARD STATS =====================
+# Snapshots are keyed on the versions of every table the stats read, so any
+# write (in any worker) makes the next call recompute them
+DASHBOARD_TABLES = ['students', 'professors', 'classes', 'formations', 'filieres', 'levels', 'transactions']
+DASHBOARD_SNAPSHOT_TTL = float(os.environ.get('DASHBOARD_SNAPSHOT_TTL', '30'))
+
+@router.get("/dashboard/stats")
+async def get_dashboard_stats(
+    academic_year_id: Optional[str] = None,
+    campus_id: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    scope = None if current_user["role"] == UserRole.FOUNDER else current_user["campus_id"]
+    snapshot_key = "dashboard:" + hashlib.sha1(repr((
+        [table_versions[t] for t in DASHBOARD_TABLES], academic_year_id, campus_id, scope
+    )).encode()).hexdigest()
+    snapshot = cache_store.get(snapshot_key)
+    if snapshot is not None:
+        return snapshot
+
+    # Base queries
+    student_query = supabase.table('students').select('*', count='exact')
+    if academic_year_id:
+        student_query = student_query.eq('academic_year_id', academic_year_id)
+    if campus_id:
+        student_query = student_query.eq('campus_id', campus_id)
+    elif current_user["role"] != UserRole.FOUNDER:
+        student_query = student_query.eq('campus_id', current_user["campus_id"])
+    
+    student_response = student_query.execute()
+    total_students = len(student_response.data) if student_response.data else 0
+    
+    # Professors count
+    prof_query = supabase.table('professors').select('*', count='exact')
+    if campus_id:
+        prof_query = prof_query.eq('campus_id', campus_id)
+    elif current_user["role"] != UserRole.FOUNDER:
+        prof_query = prof_query.eq('campus_id', current_user["campus_id"])
+    
+    prof_response = prof_query.execute()
+    total_professors = len(prof_response.data) if prof_response.data else 0
+    
+    # Classes count
+    class_query = supabase.table('classes').select('*', count='exact')
+    if academic_year_id:
+        class_query = class_query.eq('academic_year_id', academic_year_id)
+    if campus_id:
+        class_query = class_query.eq('campus_id', campus_id)
+    
+    class_response = class_query.execute()
+    total_classes = len(class_response.data) if class_response.data else 0
+    
+    # Formations and Filieres count
+    formations_response = supabase.table('formations').select('*', count='exact').execute()
+    total_formations = len(formations_response.data) if formations_response.data else 0
+    
+    filieres_response = supabase.table('filieres').select('*', count='exact').execute()
+    total_filieres = len(filieres_response.data) if filieres_response.data else 0
+    
+    # Students by formation
+    students_by_formation = {}
+    if student_response.data:
+        for student in student_response.data:
+            formation_id = student.get('formation_id')
+            if formation_id:
+                students_by_formation[formation_id] = students_by_formation.get(formation_id, 0) + 1
+    
+    formation_stats = []
+    for formation_id, count in students_by_formation.items():
+        formation_response = supabase.table('formations').select('*').eq('id', formation_id).execute()
+        formation = formation_response.data[0] if formation_response.data else None
+        formation_stats.append({
+            "formation_id": formation_id,
+            "formation_name": formation.get("name") if formation else "Inconnu",
+            "count": count
+        })
+    
+    # Students by filiere
+    students_by_filiere = {}
+    if student_response.data:
+        for student in student_response.data:
+            filiere_id = student.get('filiere_id')
+            if filiere_id:
+                students_by_filiere[filiere_id] = students_by_filiere.get(filiere_id, 0) + 1
+    
+    filiere_stats = []
+    for filiere_id, count in students_by_filiere.items():
+        filiere_response = supabase.table('filieres').select('*').eq('id', filiere_id).execute()
+        filiere = filiere_response.data[0] if filiere_response.data else None
+        filiere_stats.append({
+            "filiere_id": filiere_id,
+            "filiere_name": filiere.get("name") if filiere else "Inconnu",
+            "count": count
+        })
+    
+    # Students by level
+    students_by_level = {}
+    if student_response.data:
+        for student in student_response.data:
+            level_id = student.get('level_id')
+            if level_id:
+                students_by_level[level_id] = students_by_level.get(level_id, 0) + 1
+    
+    level_stats = []
+    for level_id, count in students_by_level.items():
+        level_response = supabase.table('levels').select('*').eq('id', level_id).execute()
+        level = level_response.data[0] if level_response.data else None
+        level_stats.append({
+            "level_id": level_id,
+            "level_name": level.get("name") if level else "Inconnu",
+            "count": count
+        })
+    
+    # Financial summary
+    transaction_query = supabase.table('transactions').select('*')
+    if campus_id:
+        transaction_query = transaction_query.eq('campus_id', campus_id)
+    elif current_user["role"] != UserRole.FOUNDER:
+        transaction_query = transaction_query.eq('campus_id', current_user["campus_id"])
+    if academic_year_id:
+        transaction_query = transaction_query.eq('academic_year_id', academic_year_id)
+    
+    transactions = transaction_query.execute().data if transaction_query.execute().data else []
+    
+    total_income = sum([t.get('amount', 0) for t in transactions if t.get('type') == 'INCOME'])
+    total_expenses = sum([t.get('amount', 0) for t in transactions if t.get('type') == 'EXPENSE'])
+    
+    stats = {
+        "total_students": total_students,
+        "total_professors": total_professors,
+        "total_classes": total_classes,
+        "total_formations": total_formations,
+        "total_filieres": total_filieres,
+        "students_by_formation": formation_stats,
+        "students_by_filiere": filiere_stats,
+        "students_by_level": level_stats,
+        "total_income": total_income,
+        "total_expenses": total_expenses,
+        "balance": total_income - total_expenses
+    }
+    cache_store.set(snapshot_key, stats, DASHBOARD_SNAPSHOT_TTL)
+    return stats
@@ -0,0 +1,110 @@
+"""
+Document routes: photos, diplomas and certificates, and the archive of issued documents
+"""
+
+import uuid
+from datetime import datetime, timezone
+from typing import List, Optional, Union
+
+from fastapi import APIRouter, HTTPException, Depends, Response
+
+from photo_store import photo_store, is_photo_hash, guess_mime, PHOTO_VARIANTS
+from request_timing import TimedRoute
+from supinter.auth import get_current_user
+from supinter import school_documents
+from supinter.db import supabase
+from supinter.jobs import jobs
+from supinter.models import UserRole, DeltaResponse, ArchiveCreate, ArchiveResponse, DocumentBatch, JobResponse
+from supinter.printing import DOCUMENT_TYPES
+from supinter.responses import campus_scope, changed_since, delta_result
+
+router = APIRouter(prefix="/api", route_class=TimedRoute)
+
+# ===================== PHOTO ROUTES =====================
+@router.get("/photos/{photo_hash}")
+async def get_photo(photo_hash: str, variant: Optional[str] = None):
+    if not is_photo_hash(photo_hash) or (variant and variant not in PHOTO_VARIANTS):
+        raise HTTPException(status_code=404, detail="Photo non trouvée")
+    data = photo_store.get(photo_hash, variant)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Photo non trouvée")
+    # Content-addressed: the bytes behind a hash never change, unless the
+    # variant is still being rendered and the original is served meanwhile
+    ready = photo_store.has(photo_hash, variant)
+    return Response(content=data, media_type=guess_mime(data), headers={
+        "Cache-Control": "public, max-age=31536000, immutable" if ready else "no-cache",
+        "ETag": f'"{photo_hash}.{variant or "original"}"' if ready else f'"{photo_hash}.original"'
+    })
+
+# ===================== DOCUMENT GENERATION =====================
+@router.post("/documents/{document_type}", response_model=JobResponse, status_code=202)
+async def generate_documents(document_type: str, batch: DocumentBatch, current_user: dict = Depends(get_current_user)):
+    """Diplomas, attestations d'inscription or certificats de scolarité of a selection, as a background job
+
+    The PDF (or ZIP) is fetched with GET /jobs/{id}/result; each document is archived.
+    """
+    if document_type not in DOCUMENT_TYPES:
+        raise HTTPException(status_code=404, detail="Type de document inconnu")
+    if batch.output not in ("pdf", "zip"):
+        raise HTTPException(status_code=400, detail="Format inconnu (pdf ou zip)")
+    if not batch.class_id and not batch.student_ids:
+        raise HTTPException(status_code=400, detail="Sélectionnez une classe ou des étudiants")
+    campus_id = None if current_user["role"] == UserRole.FOUNDER else current_user["campus_id"]
+    students = school_documents.select_students(batch.class_id, batch.student_ids, campus_id)
+    if not students:
+        raise HTTPException(status_code=404, detail="Aucun étudiant sélectionné")
+    if len(students) > school_documents.DOCUMENT_MAX_STUDENTS:
+        raise HTTPException(status_code=400, detail=f"Au plus {school_documents.DOCUMENT_MAX_STUDENTS} étudiants par génération")
+
+    def run(job):
+        media_type = "application/zip" if batch.output == "zip" else "application/pdf"
+        with job.artifact(f"{document_type}.{batch.output}", media_type) as out:
+            return school_documents.issue_documents(document_type, students, current_user, batch.output, out, job)
+
+    return jobs.submit(f"documents:{document_type}", current_user, run).state()
+
+# ===================== ARCHIVE ROUTES =====================
+@router.post("/archives", response_model=ArchiveResponse)
+async def create_archive(archive_data: ArchiveCreate, current_user: dict = Depends(get_current_user)):
+    archive_id = str(uuid.uuid4())
+    archive_doc = {
+        "id": archive_id,
+        **archive_data.model_dump(),
+        "downloaded_at": datetime.now(timezone.utc).isoformat()
+    }
+    response = supabase.table('archives').insert(archive_doc).execute()
+    if not response.data:
+        raise HTTPException(status_code=400, detail="Erreur lors de la création")
+    
+    student_response = supabase.table('students').select('*').eq('id', archive_data.student_id).execute()
+    student = student_response.data[0] if student_response.data else None
+    student_name = f"{student.get('first_name', '')} {student.get('last_name', '')}" if student else None
+    
+    return ArchiveResponse(**archive_doc, student_name=student_name)
+
+@router.get("/archives", response_model=Union[List[ArchiveResponse], DeltaResponse[ArchiveResponse]])
+async def get_archives(
+    response: Response,
+    campus_id: Optional[str] = None,
+    academic_year_id: Optional[str] = None,
+    document_type: Optional[str] = None,
+    updated_since: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    query = changed_since(supabase.table('archives').select('*'), updated_since)
+    campus_id = campus_scope(current_user, campus_id)
+    if campus_id:
+        query = query.eq('campus_id', campus_id)
+    if academic_year_id:
+        query = query.eq('academic_year_id', academic_year_id)
+    if document_type:
+        query = query.eq('document_type', document_type)
+    
+    archives = query.order('downloaded_at', desc=True).execute().data
+    result = []
+    for a in archives:
+        student_response = supabase.table('students').select('*').eq('id', a.get("student_id")).execute()
+        student = student_response.data[0] if student_response.data else None
+        student_name = f"{student.get('first_name', '')} {student.get('last_name', '')}" if student else None
+        result.append(ArchiveResponse(**a, student_name=student_name))
+    return delta_result('archives', archives, result, updated_since, response, campus_id, academic_year_id)
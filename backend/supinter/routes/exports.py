@@ -0,0 +1,274 @@
+"""
+Export routes: students, transactions, grades and absences as CSV or XLSX
+
+    GET /api/exports/students.csv?class_id=...
+    GET /api/exports/transactions.xlsx?year=2025&month=10
+    POST /api/exports/transactions.xlsx?year=2025   # background job (GET /api/jobs/{id}/result)
+
+Filters are those of the matching list route. Rows are read upstream one page
+at a time and written to the response as they come, with names taken from
+reference tables read once (through the read cache), so a 200 000-row ledger
+takes the memory of one page.
+"""
+
+import os
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from request_timing import TimedRoute
+from supinter.auth import get_current_user
+from supinter.db import supabase
+from supinter.jobs import jobs
+from supinter.models import UserRole, JobResponse
+from supinter.spreadsheets import XLSX_CONTENT_TYPE, csv_chunks, xlsx_chunks
+
+router = APIRouter(prefix="/api", route_class=TimedRoute)
+
+EXPORT_PAGE_SIZE = int(os.environ.get('EXPORT_PAGE_SIZE', '1000'))
+
+# Column titles match the student import, so an export can be edited and imported back
+STUDENT_COLUMNS = [
+    "Matricule", "Identifiant permanent", "Nom", "Prénoms", "Date de naissance", "Lieu de naissance", "Sexe",
+    "Téléphone", "Email", "Nationalité", "Campus", "Année académique", "Formation", "Filière", "Niveau", "Classe",
+    "Statut", "Scolarité", "Payé", "Reste à payer", "Exonéré",
+]
+TRANSACTION_COLUMNS = ["Date", "Type", "Catégorie", "Montant", "Description", "Matricule", "Étudiant", "Campus", "Année académique"]
+GRADE_COLUMNS = ["Matricule", "Étudiant", "Matière", "Code matière", "Semestre", "Note", "Année académique"]
+ABSENCE_COLUMNS = ["Date", "Matricule", "Étudiant", "Heures", "Motif", "Année académique"]
+
+
+def names(table: str, column: str = 'name') -> dict:
+    """id -> `column` of a reference table"""
+    return {r["id"]: r.get(column) for r in supabase.table(table).select(f'id, {column}').execute().data}
+
+
+def pages(query_factory, column: str, *more):
+    """Lists of rows, EXPORT_PAGE_SIZE at a time, ordered by `column`, `more` and id
+
+    Keyset paging on `column`: each page starts at the last value seen, skipping
+    the rows of that value already sent, so no page has to sort past the
+    previous ones the way an ever growing offset would.
+    """
+    last, seen = None, 0
+    while True:
+        query = query_factory()
+        if last is not None:
+            query = query.gte(column, last)
+        for name in (column, *more, 'id'):
+            query = query.order(name)
+        rows = query.range(seen, seen + EXPORT_PAGE_SIZE - 1).no_cache().execute().data
+        if rows:
+            yield rows
+        if len(rows) < EXPORT_PAGE_SIZE:
+            return
+        value = rows[-1][column]
+        seen = (seen if value == last else 0) + sum(1 for r in rows if r[column] == value)
+        last = value
+
+
+def with_students(row_pages):
+    """Pages of rows with the {id: student} of the students they point to (one read per page)"""
+    for rows in row_pages:
+        ids = list({r["student_id"] for r in rows if r.get("student_id")})
+        students = supabase.table('students').select('id, matricule, first_name, last_name').in_('id', ids).no_cache().execute().data if ids else []
+        yield rows, {s["id"]: s for s in students}
+
+
+def full_name(student: Optional[dict]) -> str:
+    return f"{student.get('first_name', '')} {student.get('last_name', '')}".strip() if student else ""
+
+
+def month_range(year: Optional[int], month: Optional[int]) -> tuple:
+    """[start, end) dates of a month, or of a whole year without one"""
+    if not year:
+        return None, None
+    if not month:
+        return f"{year}-01-01", f"{year + 1}-01-01"
+    if not 1 <= month <= 12:
+        raise HTTPException(status_code=400, detail="Mois invalide")
+    return f"{year}-{month:02d}-01", f"{year + month // 12}-{month % 12 + 1:02d}-01"
+
+
+# ===================== DATASETS =====================
+def student_rows(filters: dict, current_user: dict):
+    campuses, years = names('campuses'), names('academic_years')
+    formations, filieres, levels, classes = names('formations'), names('filieres'), names('levels'), names('classes')
+
+    def query():
+        q = supabase.table('students').select('*')
+        for column in ("academic_year_id", "formation_id", "filiere_id", "level_id", "class_id"):
+            if filters.get(column):
+                q = q.eq(column, filters[column])
+        if filters.get("campus_id"):
+            q = q.eq('campus_id', filters["campus_id"])
+        elif current_user["role"] != UserRole.FOUNDER:
+            q = q.eq('campus_id', current_user["campus_id"])
+        return q
+
+    def generate():
+        for rows in pages(query, 'last_name', 'first_name'):
+            out = []
+            for s in rows:
+                amount, paid = s.get("tuition_amount") or 0, s.get("tuition_paid") or 0
+                out.append([
+                    s.get("matricule"), s.get("permanent_id"), s.get("last_name"), s.get("first_name"), s.get("birth_date"),
+                    s.get("birth_place"), s.get("gender"), s.get("phone"), s.get("email"), s.get("nationality"),
+                    campuses.get(s.get("campus_id")), years.get(s.get("academic_year_id")), formations.get(s.get("formation_id")),
+                    filieres.get(s.get("filiere_id")), levels.get(s.get("level_id")), classes.get(s.get("class_id")),
+                    s.get("status"), amount, paid, 0 if s.get("is_exonerated") else amount - paid,
+                    "Oui" if s.get("is_exonerated") else "Non",
+                ])
+            yield out
+    return generate()
+
+
+def transaction_rows(filters: dict, current_user: dict):
+    campuses, years = names('campuses'), names('academic_years')
+    start, end = month_range(filters.get("year"), filters.get("month"))
+
+    def query():
+        q = supabase.table('transactions').select('*')
+        if filters.get("campus_id"):
+            q = q.eq('campus_id', filters["campus_id"])
+        elif current_user["role"] != UserRole.FOUNDER:
+            q = q.eq('campus_id', current_user["campus_id"])
+        if filters.get("academic_year_id"):
+            q = q.eq('academic_year_id', filters["academic_year_id"])
+        if filters.get("type"):
+            q = q.eq('type', filters["type"])
+        if start:
+            q = q.gte('date', start).lt('date', end)
+        return q
+
+    def generate():
+        for rows, students in with_students(pages(query, 'date')):
+            yield [[
+                t.get("date"), t.get("type"), t.get("category"), t.get("amount"), t.get("description"),
+                (students.get(t.get("student_id")) or {}).get("matricule"), full_name(students.get(t.get("student_id"))),
+                campuses.get(t.get("campus_id")), years.get(t.get("academic_year_id")),
+            ] for t in rows]
+    return generate()
+
+
+def grade_rows(filters: dict, current_user: dict):
+    years = names('academic_years')
+    subjects = {r["id"]: r for r in supabase.table('subjects').select('id, name, code').execute().data}
+
+    def query():
+        q = supabase.table('grades').select('*')
+        if filters.get("student_id"):
+            q = q.eq('student_id', filters["student_id"])
+        if filters.get("academic_year_id"):
+            q = q.eq('academic_year_id', filters["academic_year_id"])
+        if filters.get("semester"):
+            q = q.eq('semester', filters["semester"])
+        return q
+
+    def generate():
+        for rows, students in with_students(pages(query, 'student_id', 'semester')):
+            yield [[
+                (students.get(g.get("student_id")) or {}).get("matricule"), full_name(students.get(g.get("student_id"))),
+                (subjects.get(g.get("subject_id")) or {}).get("name"), (subjects.get(g.get("subject_id")) or {}).get("code"),
+                g.get("semester"), g.get("value"), years.get(g.get("academic_year_id")),
+            ] for g in rows]
+    return generate()
+
+
+def absence_rows(filters: dict, current_user: dict):
+    years = names('academic_years')
+
+    def query():
+        q = supabase.table('student_absences').select('*')
+        if filters.get("student_id"):
+            q = q.eq('student_id', filters["student_id"])
+        if filters.get("academic_year_id"):
+            q = q.eq('academic_year_id', filters["academic_year_id"])
+        return q
+
+    def generate():
+        for rows, students in with_students(pages(query, 'date')):
+            yield [[
+                a.get("date"), (students.get(a.get("student_id")) or {}).get("matricule"), full_name(students.get(a.get("student_id"))),
+                a.get("hours"), a.get("reason"), years.get(a.get("academic_year_id")),
+            ] for a in rows]
+    return generate()
+
+
+# dataset -> (sheet title, columns, rows)
+EXPORTS = {
+    "students": ("Etudiants", STUDENT_COLUMNS, student_rows),
+    "transactions": ("Transactions", TRANSACTION_COLUMNS, transaction_rows),
+    "grades": ("Notes", GRADE_COLUMNS, grade_rows),
+    "absences": ("Absences", ABSENCE_COLUMNS, absence_rows),
+}
+
+
+# ===================== EXPORT ROUTES =====================
+def export_filters(
+    campus_id: Optional[str] = None,
+    academic_year_id: Optional[str] = None,
+    formation_id: Optional[str] = None,
+    filiere_id: Optional[str] = None,
+    level_id: Optional[str] = None,
+    class_id: Optional[str] = None,
+    student_id: Optional[str] = None,
+    type: Optional[str] = None,
+    semester: Optional[int] = None,
+    year: Optional[int] = None,
+    month: Optional[int] = None,
+) -> dict:
+    month_range(year, month)  # bad months fail here, not halfway through the body
+    return {
+        "campus_id": campus_id, "academic_year_id": academic_year_id, "formation_id": formation_id,
+        "filiere_id": filiere_id, "level_id": level_id, "class_id": class_id, "student_id": student_id,
+        "type": type, "semester": semester, "year": year, "month": month,
+    }
+
+
+def export_pages(dataset: str, fmt: str, filters: dict, current_user: dict) -> tuple:
+    """(sheet title, columns, pages of rows); reference tables are read now, the pages as they are iterated"""
+    if dataset not in EXPORTS or fmt not in ("csv", "xlsx"):
+        raise HTTPException(status_code=404, detail="Export inconnu")
+    title, columns, rows = EXPORTS[dataset]
+    return title, columns, rows(filters, current_user)
+
+
+def export_body(fmt: str, title: str, columns: list, pages_of_rows) -> tuple:
+    """(byte chunks, media type) of an export"""
+    if fmt == "csv":
+        return csv_chunks(columns, pages_of_rows), "text/csv; charset=utf-8"
+    return xlsx_chunks(columns, pages_of_rows, title), XLSX_CONTENT_TYPE
+
+
+def counted(pages_of_rows, job):
+    for rows in pages_of_rows:
+        job.advance(len(rows))
+        yield rows
+
+
+@router.get("/exports/{dataset}.{fmt}")
+async def export(dataset: str, fmt: str, filters: dict = Depends(export_filters), current_user: dict = Depends(get_current_user)):
+    # Reference reads in the threadpool, then a plain generator that Starlette also iterates there
+    body, media_type = export_body(fmt, *await run_in_threadpool(export_pages, dataset, fmt, filters, current_user))
+    return StreamingResponse(body, media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="{dataset}.{fmt}"',
+        "Cache-Control": "no-store",
+    })
+
+
+@router.post("/exports/{dataset}.{fmt}", response_model=JobResponse, status_code=202)
+async def export_job(dataset: str, fmt: str, filters: dict = Depends(export_filters), current_user: dict = Depends(get_current_user)):
+    """The same export as a background job, fetched with GET /jobs/{id}/result"""
+    title, columns, pages_of_rows = await run_in_threadpool(export_pages, dataset, fmt, filters, current_user)
+
+    def run(job):
+        body, media_type = export_body(fmt, title, columns, counted(pages_of_rows, job))
+        with job.artifact(f"{dataset}.{fmt}", media_type) as out:
+            for chunk in body:
+                out.write(chunk)
+        return {"rows": job.done}
+
+    return jobs.submit(f"export:{dataset}", current_user, run).state()
@@ -0,0 +1,248 @@
+"""
+Finance routes: transactions, tuition payments, receipts and arrears
+"""
+
+import io
+import uuid
+from datetime import date as Date, datetime, timezone
+from typing import List, Optional, Union
+
+from fastapi import APIRouter, HTTPException, Depends, Response
+from starlette.concurrency import run_in_threadpool
+
+from request_timing import TimedRoute
+from supinter.auth import get_current_user
+from supinter.db import chunks, supabase
+from supinter.models import (
+    UserRole, DeltaResponse, TransactionCreate, TransactionResponse, ArrearsStudent, ArrearsTotal, ArrearsReport,
+)
+from supinter.printing import receipt_number, receipt_values, write_receipts
+from supinter.responses import FAST_RESPONSES, campus_scope, changed_since, delta_result, fast_response
+
+router = APIRouter(prefix="/api", route_class=TimedRoute)
+
+# ===================== TRANSACTION ROUTES =====================
+@router.post("/transactions", response_model=TransactionResponse)
+async def create_transaction(transaction_data: TransactionCreate, current_user: dict = Depends(get_current_user)):
+    transaction_id = str(uuid.uuid4())
+    campus_id = transaction_data.campus_id
+    if current_user["role"] != UserRole.FOUNDER:
+        campus_id = current_user["campus_id"]
+    
+    transaction_doc = {
+        "id": transaction_id,
+        **transaction_data.model_dump(),
+        "campus_id": campus_id,
+        "created_at": datetime.now(timezone.utc).isoformat()
+    }
+    response = supabase.table('transactions').insert(transaction_doc).execute()
+    if not response.data:
+        raise HTTPException(status_code=400, detail="Erreur lors de la création")
+    
+    # Update student tuition if student payment
+    if transaction_data.student_id and transaction_data.type == "INCOME" and transaction_data.category == "Scolarité":
+        student_response = supabase.table('students').select('tuition_paid').eq('id', transaction_data.student_id).no_cache().execute()
+        if student_response.data:
+            student = student_response.data[0]
+            new_tuition_paid = (student.get('tuition_paid', 0) or 0) + transaction_data.amount
+            supabase.table('students').update({"tuition_paid": new_tuition_paid}).eq('id', transaction_data.student_id).execute()
+    
+    student_name = None
+    if transaction_data.student_id:
+        student_response = supabase.table('students').select('*').eq('id', transaction_data.student_id).execute()
+        if student_response.data:
+            student = student_response.data[0]
+            student_name = f"{student.get('first_name', '')} {student.get('last_name', '')}"
+    
+    return TransactionResponse(**transaction_doc, student_name=student_name)
+
+@router.get("/transactions", response_model=Union[List[TransactionResponse], DeltaResponse[TransactionResponse]])
+async def get_transactions(
+    response: Response,
+    campus_id: Optional[str] = None,
+    academic_year_id: Optional[str] = None,
+    type: Optional[str] = None,
+    month: Optional[int] = None,
+    year: Optional[int] = None,
+    updated_since: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    query = changed_since(supabase.table('transactions').select('*'), updated_since)
+    campus_id = campus_scope(current_user, campus_id)
+    if campus_id:
+        query = query.eq('campus_id', campus_id)
+    if academic_year_id:
+        query = query.eq('academic_year_id', academic_year_id)
+    if type:
+        query = query.eq('type', type)
+    
+    transactions = query.order('created_at', desc=True).execute().data
+    result = []
+    for t in transactions:
+        student_name = None
+        if t.get("student_id"):
+            student_response = supabase.table('students').select('*').eq('id', t.get("student_id")).execute()
+            if student_response.data:
+                student = student_response.data[0]
+                student_name = f"{student.get('first_name', '')} {student.get('last_name', '')}"
+        result.append({**t, "student_name": student_name} if FAST_RESPONSES else TransactionResponse(**t, student_name=student_name))
+    payload = delta_result('transactions', transactions, result, updated_since, response, campus_id, academic_year_id)
+    return fast_response(TransactionResponse, payload, response) if FAST_RESPONSES else payload
+
+@router.delete("/transactions/{transaction_id}")
+async def delete_transaction(transaction_id: str, current_user: dict = Depends(get_current_user)):
+    transaction_response = supabase.table('transactions').select('*').eq('id', transaction_id).execute()
+    if not transaction_response.data:
+        raise HTTPException(status_code=404, detail="Transaction non trouvée")
+    
+    transaction = transaction_response.data[0]
+    
+    # Reverse student payment if applicable
+    if transaction.get("student_id") and transaction.get("type") == "INCOME" and transaction.get("category") == "Scolarité":
+        student_response = supabase.table('students').select('tuition_paid').eq('id', transaction.get("student_id")).no_cache().execute()
+        if student_response.data:
+            student = student_response.data[0]
+            new_tuition_paid = (student.get('tuition_paid', 0) or 0) - transaction.get("amount", 0)
+            supabase.table('students').update({"tuition_paid": new_tuition_paid}).eq('id', transaction.get("student_id")).execute()
+    
+    supabase.table('transactions').delete().eq('id', transaction_id).execute()
+    return {"message": "Transaction supprimée"}
+
+# ===================== RECEIPTS =====================
+def receipts_pdf(transactions: list) -> bytes:
+    """One receipt page per payment, with the students, classes, years and campuses read in bulk"""
+    student_ids = list({t["student_id"] for t in transactions if t.get("student_id")})
+    students = {}
+    for ids in chunks(student_ids):
+        students.update({s["id"]: s for s in supabase.table('students').select(
+            'id, matricule, first_name, last_name, class_id'
+        ).in_('id', ids).execute().data})
+    class_ids = list({s["class_id"] for s in students.values() if s.get("class_id")})
+    classes = {}
+    for ids in chunks(class_ids):
+        classes.update({c["id"]: c["name"] for c in supabase.table('classes').select('id, name').in_('id', ids).execute().data})
+    years = {y["id"]: y["name"] for y in supabase.table('academic_years').select('id, name').execute().data}
+    campuses = {c["id"]: c for c in supabase.table('campuses').select('*').execute().data}
+    receipts = []
+    for t in transactions:
+        student = students.get(t.get("student_id"))
+        receipts.append({
+            "campus": campuses.get(t.get("campus_id")),
+            "values": receipt_values(t, student, classes.get((student or {}).get("class_id")), years.get(t.get("academic_year_id"))),
+            "amount": t.get("amount"),
+        })
+    out = io.BytesIO()
+    write_receipts(out, receipts)
+    return out.getvalue()
+
+def pdf_response(content: bytes, filename: str) -> Response:
+    return Response(content=content, media_type="application/pdf", headers={
+        "Content-Disposition": f'inline; filename="{filename}"',
+        "Cache-Control": "no-store",
+    })
+
+@router.get("/transactions/receipts.pdf")
+async def get_day_receipts(
+    date: Optional[Date] = None,
+    campus_id: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Receipts of every payment (INCOME transaction) of a day, today by default, in one PDF"""
+    day = (date or datetime.now(timezone.utc).date()).isoformat()
+    if current_user["role"] != UserRole.FOUNDER:
+        campus_id = current_user["campus_id"]
+
+    def render():
+        query = supabase.table('transactions').select('*').eq('date', day).eq('type', 'INCOME')
+        if campus_id:
+            query = query.eq('campus_id', campus_id)
+        transactions = query.order('created_at').order('id').execute().data
+        return receipts_pdf(transactions) if transactions else None
+
+    # Bulk work: reads and rendering run in the threadpool, off the event loop
+    content = await run_in_threadpool(render)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Aucun paiement à cette date")
+    return pdf_response(content, f"recus-{day}.pdf")
+
+@router.get("/transactions/{transaction_id}/receipt.pdf")
+async def get_receipt(transaction_id: str, current_user: dict = Depends(get_current_user)):
+    transactions = supabase.table('transactions').select('*').eq('id', transaction_id).execute().data
+    if not transactions or (current_user["role"] != UserRole.FOUNDER and transactions[0].get("campus_id") != current_user["campus_id"]):
+        raise HTTPException(status_code=404, detail="Transaction non trouvée")
+    if transactions[0].get("type") != "INCOME":
+        raise HTTPException(status_code=400, detail="Pas de reçu pour une dépense")
+    return pdf_response(receipts_pdf(transactions), f"recu-{receipt_number(transactions[0])}.pdf")
+
+# ===================== ARREARS =====================
+ARREARS_SORTS = {
+    "balance": (("balance", True), ("id", False)),
+    "name": (("last_name", False), ("first_name", False), ("id", False)),
+}
+
+@router.get("/finance/arrears", response_model=ArrearsReport)
+async def get_arrears(
+    academic_year_id: Optional[str] = None,
+    campus_id: Optional[str] = None,
+    formation_id: Optional[str] = None,
+    filiere_id: Optional[str] = None,
+    level_id: Optional[str] = None,
+    class_id: Optional[str] = None,
+    sort: str = "balance",
+    page: int = 1,
+    page_size: int = 50,
+    current_user: dict = Depends(get_current_user)
+):
+    """Students who still owe tuition (students.balance > 0), with totals per class and campus"""
+    if sort not in ARREARS_SORTS:
+        raise HTTPException(status_code=400, detail="Tri inconnu (balance ou name)")
+    page, page_size = max(page, 1), min(max(page_size, 1), 500)
+    if not academic_year_id:
+        active = supabase.table('academic_years').select('id').eq('is_active', True).execute().data
+        if not active:
+            raise HTTPException(status_code=400, detail="Aucune année académique active")
+        academic_year_id = active[0]["id"]
+    if current_user["role"] != UserRole.FOUNDER:
+        campus_id = current_user["campus_id"]
+
+    def filtered(query):
+        query = query.eq('academic_year_id', academic_year_id)
+        for column, value in (("campus_id", campus_id), ("formation_id", formation_id), ("filiere_id", filiere_id),
+                              ("level_id", level_id), ("class_id", class_id)):
+            if value:
+                query = query.eq(column, value)
+        return query
+
+    # One page of debtors (idx_students_arrears), and the per-class sums of the view
+    query = filtered(supabase.table('students').select(
+        'id, matricule, first_name, last_name, class_id, campus_id, tuition_amount, tuition_paid, balance'
+    )).gt('balance', 0)
+    for column, desc in ARREARS_SORTS[sort]:
+        query = query.order(column, desc=desc)
+    start = (page - 1) * page_size
+    debtors = query.range(start, start + page_size - 1).execute().data
+    groups = filtered(supabase.table('student_arrears_by_class').select('campus_id, class_id, debtors, outstanding')).no_cache().execute().data
+
+    classes = {c["id"]: c["name"] for c in supabase.table('classes').select('id, name').eq('academic_year_id', academic_year_id).execute().data}
+    campuses = {c["id"]: c["name"] for c in supabase.table('campuses').select('id, name').execute().data}
+
+    def totals(column: str) -> dict:
+        # The view has one row per (class, formation, filière, level): a class
+        # whose students differ in those columns spans several rows
+        sums = {}
+        for g in groups:
+            total = sums.setdefault(g[column], {"debtors": 0, "outstanding": 0.0})
+            total["debtors"] += g["debtors"]
+            total["outstanding"] += g["outstanding"]
+        return sums
+
+    return ArrearsReport(
+        academic_year_id=academic_year_id,
+        debtors=sum(g["debtors"] for g in groups),
+        outstanding=sum(g["outstanding"] for g in groups),
+        page=page,
+        page_size=page_size,
+        items=[ArrearsStudent(**s, class_name=classes.get(s["class_id"]), campus_name=campuses.get(s["campus_id"])) for s in debtors],
+        by_class=sorted((ArrearsTotal(id=c, name=classes.get(c), **t) for c, t in totals("class_id").items()), key=lambda t: -t.outstanding),
+        by_campus=sorted((ArrearsTotal(id=c, name=campuses.get(c), **t) for c, t in totals("campus_id").items()), key=lambda t: -t.outstanding),
+    )
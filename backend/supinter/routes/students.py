@@ -0,0 +1,554 @@
+"""
+Student routes: enrolment, re-enrolment, grades and absences
+"""
+
+import os
+import uuid
+from datetime import datetime, timezone
+from typing import List, Optional, Union
+
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from photo_store import photo_store
+from request_timing import TimedRoute
+from supinter.auth import get_current_user
+from supinter import rollover
+from supinter.db import supabase
+from supinter.jobs import jobs
+from supinter.models import (
+    UserRole, StudentStatus, DeltaResponse, StudentCreate, StudentResponse, StudentReenroll,
+    StudentImportRow, StudentImportReport, ClassPromote, JobResponse,
+    GradeCreate, GradeResponse, StudentAbsenceCreate, StudentAbsenceResponse,
+)
+from supinter.responses import FAST_RESPONSES, campus_scope, changed_since, delta_result, fast_response
+from supinter.spreadsheets import read_records
+
+router = APIRouter(prefix="/api", route_class=TimedRoute)
+
+# ===================== MATRICULE GENERATOR =====================
+def matricule_prefix() -> str:
+    return f"ESI{datetime.now().year}"
+
+# Matricules are the year's prefix and a number zero-padded to this width
+MATRICULE_DIGITS = 4
+
+def next_matricule_number(prefix: str) -> int:
+    """First free number after the highest matricule of the year (start of a block)
+
+    Numbers of one width sort as strings, so the highest of each width is the
+    last matricule of its range in the unique index on matricule: one row is
+    read per width, from the padded one up, never the whole year.
+    """
+    highest, width = 0, MATRICULE_DIGITS
+    while True:
+        top = (supabase.table('students').select('matricule')
+               .gte('matricule', prefix + "0" * width).lte('matricule', prefix + "9" * width)
+               .like('matricule', prefix + "_" * width)
+               .order('matricule', desc=True).limit(1).no_cache().execute().data)
+        if not top:
+            return highest + 1
+        suffix = top[0]["matricule"][len(prefix):]
+        if suffix.isdigit():
+            highest = int(suffix)
+        width += 1
+
+def format_matricule(prefix: str, number: int) -> str:
+    return f"{prefix}{str(number).zfill(MATRICULE_DIGITS)}"
+
+def generate_matricule(prefix: str) -> str:
+    return format_matricule(prefix, next_matricule_number(prefix))
+
+# Inserts tried with a fresh matricule when another enrolment took the previous one
+MATRICULE_ATTEMPTS = 3
+
+def insert_student(doc: dict, prefix: str) -> list:
+    """Insert a student under the next free matricule (set in `doc`), retrying on a matricule conflict"""
+    for _ in range(MATRICULE_ATTEMPTS):
+        doc["matricule"] = generate_matricule(prefix)
+        try:
+            return supabase.table('students').insert(doc).execute().data
+        except Exception as e:
+            if "matricule" not in str(e):
+                raise
+    raise HTTPException(status_code=409, detail="Aucun matricule libre, réessayez")
+
+# ===================== STUDENT ROUTES =====================
+@router.post("/students", response_model=StudentResponse)
+async def create_student(student_data: StudentCreate, current_user: dict = Depends(get_current_user)):
+    student_id = str(uuid.uuid4())
+    
+    campus_id = student_data.campus_id
+    if current_user["role"] != UserRole.FOUNDER:
+        campus_id = current_user["campus_id"]
+    
+    student_doc = {
+        "id": student_id,
+        **student_data.model_dump(),
+        "photo": photo_store.ingest(student_data.photo),
+        "campus_id": campus_id,
+        "tuition_paid": 0
+    }
+    
+    if not insert_student(student_doc, matricule_prefix()):
+        raise HTTPException(status_code=400, detail="Erreur lors de la création")
+    
+    # Fetch related data for response
+    formation_response = supabase.table('formations').select('*').eq('id', student_data.formation_id).execute()
+    formation = formation_response.data[0] if formation_response.data else None
+    filiere_response = supabase.table('filieres').select('*').eq('id', student_data.filiere_id).execute()
+    filiere = filiere_response.data[0] if filiere_response.data else None
+    level_response = supabase.table('levels').select('*').eq('id', student_data.level_id).execute()
+    level = level_response.data[0] if level_response.data else None
+    class_response = supabase.table('classes').select('*').eq('id', student_data.class_id).execute()
+    class_obj = class_response.data[0] if class_response.data else None
+    campus_response = supabase.table('campuses').select('*').eq('id', campus_id).execute()
+    campus = campus_response.data[0] if campus_response.data else None
+    academic_year_response = supabase.table('academic_years').select('*').eq('id', student_data.academic_year_id).execute()
+    academic_year = academic_year_response.data[0] if academic_year_response.data else None
+    
+    return StudentResponse(
+        **student_doc,
+        created_at=datetime.now(timezone.utc).isoformat(),
+        formation_name=formation.get("name") if formation else None,
+        filiere_name=filiere.get("name") if filiere else None,
+        level_name=level.get("name") if level else None,
+        class_name=class_obj.get("name") if class_obj else None,
+        campus_name=campus.get("name") if campus else None,
+        academic_year_name=academic_year.get("name") if academic_year else None
+    )
+
+@router.get("/students", response_model=Union[List[StudentResponse], DeltaResponse[StudentResponse]])
+async def get_students(
+    response: Response,
+    academic_year_id: Optional[str] = None,
+    formation_id: Optional[str] = None,
+    filiere_id: Optional[str] = None,
+    level_id: Optional[str] = None,
+    class_id: Optional[str] = None,
+    campus_id: Optional[str] = None,
+    search: Optional[str] = None,
+    updated_since: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    query = changed_since(supabase.table('students').select('*'), updated_since)
+    if academic_year_id:
+        query = query.eq('academic_year_id', academic_year_id)
+    if formation_id:
+        query = query.eq('formation_id', formation_id)
+    if filiere_id:
+        query = query.eq('filiere_id', filiere_id)
+    if level_id:
+        query = query.eq('level_id', level_id)
+    if class_id:
+        query = query.eq('class_id', class_id)
+    campus_id = campus_scope(current_user, campus_id)
+    if campus_id:
+        query = query.eq('campus_id', campus_id)
+
+    students = query.execute().data
+    result = []
+    for s in students:
+        formation_response = supabase.table('formations').select('*').eq('id', s.get("formation_id")).execute()
+        formation = formation_response.data[0] if formation_response.data else None
+        filiere_response = supabase.table('filieres').select('*').eq('id', s.get("filiere_id")).execute()
+        filiere = filiere_response.data[0] if filiere_response.data else None
+        level_response = supabase.table('levels').select('*').eq('id', s.get("level_id")).execute()
+        level = level_response.data[0] if level_response.data else None
+        class_response = supabase.table('classes').select('*').eq('id', s.get("class_id")).execute()
+        class_obj = class_response.data[0] if class_response.data else None
+        campus_response = supabase.table('campuses').select('*').eq('id', s.get("campus_id")).execute()
+        campus = campus_response.data[0] if campus_response.data else None
+        academic_year_response = supabase.table('academic_years').select('*').eq('id', s.get("academic_year_id")).execute()
+        academic_year = academic_year_response.data[0] if academic_year_response.data else None
+        names = dict(
+            formation_name=formation.get("name") if formation else None,
+            filiere_name=filiere.get("name") if filiere else None,
+            level_name=level.get("name") if level else None,
+            class_name=class_obj.get("name") if class_obj else None,
+            campus_name=campus.get("name") if campus else None,
+            academic_year_name=academic_year.get("name") if academic_year else None
+        )
+        result.append({**s, **names} if FAST_RESPONSES else StudentResponse(**s, **names))
+    payload = delta_result('students', students, result, updated_since, response, campus_id, academic_year_id)
+    return fast_response(StudentResponse, payload, response) if FAST_RESPONSES else payload
+
+@router.get("/students/{student_id}", response_model=StudentResponse)
+async def get_student(student_id: str, current_user: dict = Depends(get_current_user)):
+    student_response = supabase.table('students').select('*').eq('id', student_id).execute()
+    if not student_response.data:
+        raise HTTPException(status_code=404, detail="Étudiant non trouvé")
+    
+    student = student_response.data[0]
+    
+    formation_response = supabase.table('formations').select('*').eq('id', student.get("formation_id")).execute()
+    formation = formation_response.data[0] if formation_response.data else None
+    filiere_response = supabase.table('filieres').select('*').eq('id', student.get("filiere_id")).execute()
+    filiere = filiere_response.data[0] if filiere_response.data else None
+    level_response = supabase.table('levels').select('*').eq('id', student.get("level_id")).execute()
+    level = level_response.data[0] if level_response.data else None
+    class_response = supabase.table('classes').select('*').eq('id', student.get("class_id")).execute()
+    class_obj = class_response.data[0] if class_response.data else None
+    campus_response = supabase.table('campuses').select('*').eq('id', student.get("campus_id")).execute()
+    campus = campus_response.data[0] if campus_response.data else None
+    academic_year_response = supabase.table('academic_years').select('*').eq('id', student.get("academic_year_id")).execute()
+    academic_year = academic_year_response.data[0] if academic_year_response.data else None
+    
+    return StudentResponse(
+        **student,
+        formation_name=formation.get("name") if formation else None,
+        filiere_name=filiere.get("name") if filiere else None,
+        level_name=level.get("name") if level else None,
+        class_name=class_obj.get("name") if class_obj else None,
+        campus_name=campus.get("name") if campus else None,
+        academic_year_name=academic_year.get("name") if academic_year else None
+    )
+
+@router.put("/students/{student_id}", response_model=StudentResponse)
+async def update_student(student_id: str, student_data: StudentCreate, current_user: dict = Depends(get_current_user)):
+    update_doc = {**student_data.model_dump(), "photo": photo_store.ingest(student_data.photo)}
+    response = supabase.table('students').update(update_doc).eq('id', student_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Étudiant non trouvé")
+    return await get_student(student_id, current_user)
+
+@router.post("/students/{student_id}/reenroll", response_model=StudentResponse)
+async def reenroll_student(student_id: str, reenroll_data: StudentReenroll, current_user: dict = Depends(get_current_user)):
+    student_response = supabase.table('students').select('*').eq('id', student_id).execute()
+    if not student_response.data:
+        raise HTTPException(status_code=404, detail="Étudiant non trouvé")
+    
+    supabase.table('students').update(reenroll_data.model_dump()).eq('id', student_id).execute()
+    return await get_student(student_id, current_user)
+
+@router.post("/classes/{class_id}/promote", response_model=JobResponse, status_code=202)
+async def promote_class(class_id: str, promotion: ClassPromote, current_user: dict = Depends(get_current_user)):
+    """Re-enroll the passing students of a class into the target class, as a background job"""
+    classes = {c["id"]: c for c in supabase.table('classes').select('*').in_('id', [class_id, promotion.target_class_id]).no_cache().execute().data}
+    source, target = classes.get(class_id), classes.get(promotion.target_class_id)
+    if not source:
+        raise HTTPException(status_code=404, detail="Classe non trouvée")
+    if not target:
+        raise HTTPException(status_code=404, detail="Classe cible non trouvée")
+    if target["academic_year_id"] == source["academic_year_id"]:
+        raise HTTPException(status_code=400, detail="La classe cible doit appartenir à une autre année académique")
+    if current_user["role"] != UserRole.FOUNDER and {source["campus_id"], target["campus_id"]} != {current_user["campus_id"]}:
+        raise HTTPException(status_code=403, detail="Accès refusé")
+    job = jobs.submit("promote", current_user, lambda job: rollover.promote_class(
+        source, target, promotion.min_average, promotion.include_ungraded, job
+    ))
+    return job.state()
+
+@router.delete("/students/{student_id}")
+async def delete_student(student_id: str, current_user: dict = Depends(get_current_user)):
+    response = supabase.table('students').delete().eq('id', student_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Étudiant non trouvé")
+    return {"message": "Étudiant supprimé"}
+
+# ===================== STUDENT IMPORT =====================
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', '500'))
+IMPORT_MAX_ROWS = int(os.environ.get('IMPORT_MAX_ROWS', '10000'))
+
+# Normalized spreadsheet headers -> StudentCreate fields, or reference columns
+# (campus, academic_year, formation, filiere, level, class) given by code or name
+IMPORT_COLUMNS = {
+    **{field: field for field in StudentCreate.model_fields if not field.endswith("_id") and field != "photo"},
+    "permanent_id": "permanent_id", "identifiant_permanent": "permanent_id", "id_permanent": "permanent_id",
+    "numero_de_table": "numero_table_bac", "numero_table": "numero_table_bac",
+    "nom": "last_name", "prenom": "first_name", "prenoms": "first_name",
+    "date_de_naissance": "birth_date", "date_naissance": "birth_date",
+    "lieu_de_naissance": "birth_place", "lieu_naissance": "birth_place",
+    "sexe": "gender", "genre": "gender", "telephone": "phone", "contact": "phone", "nationalite": "nationality",
+    "contact_d_urgence": "emergency_contact_name", "contact_urgence": "emergency_contact_name",
+    "telephone_d_urgence": "emergency_contact_phone", "telephone_urgence": "emergency_contact_phone",
+    "scolarite": "tuition_amount", "montant_scolarite": "tuition_amount", "exonere": "is_exonerated", "statut": "status",
+    "campus": "campus", "annee": "academic_year", "annee_academique": "academic_year", "formation": "formation",
+    "filiere": "filiere", "niveau": "level", "classe": "class",
+}
+TRUE_VALUES = {"oui", "o", "x", "1", "true", "vrai", "yes"}
+
+def index_rows(rows: list, *keys) -> dict:
+    """Rows by each of their `keys` (id, code, name), case-insensitive"""
+    found = {}
+    for row in rows:
+        for key in keys:
+            if row.get(key):
+                found[str(row[key]).strip().lower()] = row
+    return found
+
+class ImportLookup:
+    """Reference data of an import, read once instead of six lookups per row"""
+    def __init__(self):
+        years = supabase.table('academic_years').select('*').execute().data
+        self.campuses = index_rows(supabase.table('campuses').select('*').execute().data, 'id', 'name')
+        self.years = index_rows(years, 'id', 'name')
+        self.active_year = next((y for y in years if y.get("is_active")), None)
+        self.formations = index_rows(supabase.table('formations').select('*').execute().data, 'id', 'code', 'name')
+        self.filieres = index_rows(supabase.table('filieres').select('*').execute().data, 'id', 'code', 'name')
+        self.levels = index_rows(supabase.table('levels').select('*').execute().data, 'id', 'name')
+        self.classes = {}
+
+    def classes_of(self, campus_id: str, academic_year_id: str) -> dict:
+        key = (campus_id, academic_year_id)
+        if key not in self.classes:
+            rows = supabase.table('classes').select('*').eq('campus_id', campus_id).eq('academic_year_id', academic_year_id).execute().data
+            self.classes[key] = index_rows(rows, 'id', 'code', 'name')
+        return self.classes[key]
+
+def parse_birth_date(text: str) -> Optional[str]:
+    for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y"):
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            pass
+    return None
+
+def resolve_import_row(values: dict, lookup: ImportLookup, current_user: dict, campus: Optional[dict], year: Optional[dict]):
+    """StudentCreate document of a spreadsheet row, or the list of what is wrong with it"""
+    errors = []
+
+    def reference(index: dict, column: str, label: str):
+        text = values.pop(column, "")
+        if not text:
+            return None
+        row = index.get(text.lower())
+        if row is None:
+            errors.append(f"{label} inconnu(e) : {text}")
+        return row
+
+    row_campus = reference(lookup.campuses, "campus", "Campus")
+    if current_user["role"] != UserRole.FOUNDER:
+        if row_campus and row_campus["id"] != current_user["campus_id"]:
+            errors.append(f"Campus hors de votre périmètre : {row_campus['name']}")
+        row_campus = lookup.campuses.get((current_user.get("campus_id") or "").lower())
+    campus = row_campus or campus
+    year = reference(lookup.years, "academic_year", "Année académique") or year
+    formation = reference(lookup.formations, "formation", "Formation")
+    filiere = reference(lookup.filieres, "filiere", "Filière")
+    level = reference(lookup.levels, "level", "Niveau")
+    class_code = values.pop("class", "")
+    if campus is None or year is None:
+        errors.append("Campus ou année académique manquant(e)")
+        return None, errors
+    cls = lookup.classes_of(campus["id"], year["id"]).get(class_code.lower()) if class_code else None
+    if not class_code:
+        errors.append("Classe manquante")
+    elif cls is None:
+        errors.append(f"Classe inconnue pour {campus['name']} {year['name']} : {class_code}")
+    else:
+        # The class alone gives formation, filière and level; explicit ones must agree
+        for given, key, label in ((formation, "formation_id", "formation"), (filiere, "filiere_id", "filière"), (level, "level_id", "niveau")):
+            if given and given["id"] != cls[key]:
+                errors.append(f"La classe {class_code} n'est pas de ce(tte) {label} : {given['name']}")
+
+    if values.get("birth_date"):
+        birth_date = parse_birth_date(values["birth_date"])
+        if birth_date is None:
+            errors.append(f"Date de naissance invalide : {values['birth_date']}")
+        values["birth_date"] = birth_date
+    if values.get("gender"):
+        gender = values["gender"][0].upper()
+        values["gender"] = {"H": "M"}.get(gender, gender)
+        if values["gender"] not in ("M", "F"):
+            errors.append(f"Sexe invalide : {values['gender']}")
+    if values.get("tuition_amount"):
+        try:
+            values["tuition_amount"] = float(values["tuition_amount"].replace(" ", "").replace("\u00a0", "").replace(",", "."))
+        except ValueError:
+            errors.append(f"Montant de scolarité invalide : {values['tuition_amount']}")
+    values["is_exonerated"] = values.get("is_exonerated", "").lower() in TRUE_VALUES
+    if not values.get("status"):
+        values["status"] = StudentStatus.AFFECTE if cls else StudentStatus.NON_AFFECTE
+    data = {key: value for key, value in values.items() if value not in ("", None)}
+    if cls:
+        data.update(campus_id=campus["id"], academic_year_id=year["id"], class_id=cls["id"],
+                    formation_id=cls["formation_id"], filiere_id=cls["filiere_id"], level_id=cls["level_id"])
+    if errors:
+        return None, errors
+    try:
+        return StudentCreate(**data).model_dump(), []
+    except ValidationError as e:
+        return None, [f"{'.'.join(str(p) for p in err['loc'])} : {'obligatoire' if err['type'] == 'missing' else 'invalide'}"
+                      for err in e.errors()]
+
+def insert_import_batch(docs: list, prefix: str) -> list:
+    """Insert documents with a block of consecutive matricules; per document (id, matricule) or error"""
+    number = next_matricule_number(prefix)
+    for i, doc in enumerate(docs):
+        doc.update(id=str(uuid.uuid4()), matricule=format_matricule(prefix, number + i), tuition_paid=0, photo=None)
+    try:
+        supabase.table('students').insert(docs).execute()
+        return [(doc["id"], doc["matricule"]) for doc in docs]
+    except Exception:
+        pass
+    # A matricule taken meanwhile, or one bad row: retry one by one to isolate it
+    results = []
+    for doc in docs:
+        try:
+            insert_student(doc, prefix)
+            results.append((doc["id"], doc["matricule"]))
+        except HTTPException as e:
+            results.append(e.detail)
+        except Exception as e:
+            results.append(f"Insertion refusée : {str(e)[-200:]}")
+    return results
+
+@router.post("/students/import", response_model=StudentImportReport)
+async def import_students(
+    request: Request,
+    dry_run: bool = False,
+    campus_id: Optional[str] = None,
+    academic_year_id: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Enrol the students of a CSV or XLSX file (request body), validated and inserted in batches"""
+    # Lookups and inserts run in the threadpool, off the event loop (and within the bulk upstream cap)
+    lookup = await run_in_threadpool(ImportLookup)
+    campus = lookup.campuses.get((campus_id or "").lower())
+    year = lookup.years.get(academic_year_id.lower()) if academic_year_id else lookup.active_year
+    if academic_year_id and year is None:
+        raise HTTPException(status_code=404, detail="Année académique non trouvée")
+    prefix = matricule_prefix()
+    rows, batch = [], []
+
+    def flush():
+        valid = []
+        for line, values in batch:
+            doc, errors = resolve_import_row(values, lookup, current_user, campus, year)
+            if errors:
+                rows.append(StudentImportRow(line=line, status="error", errors=errors))
+            else:
+                valid.append((line, doc))
+        if dry_run:
+            rows.extend(StudentImportRow(line=line, status="valid") for line, _ in valid)
+        elif valid:
+            for (line, _), result in zip(valid, insert_import_batch([doc for _, doc in valid], prefix)):
+                rows.append(StudentImportRow(line=line, status="created", id=result[0], matricule=result[1])
+                            if isinstance(result, tuple) else StudentImportRow(line=line, status="error", errors=[result]))
+        batch.clear()
+
+    total = 0
+    async for line, values in read_records(request, IMPORT_COLUMNS):
+        if total >= IMPORT_MAX_ROWS:
+            rows.append(StudentImportRow(line=line, status="error", errors=[f"Limite de {IMPORT_MAX_ROWS} lignes atteinte : lignes suivantes ignorées"]))
+            break
+        total += 1
+        batch.append((line, values))
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            await run_in_threadpool(flush)
+    await run_in_threadpool(flush)
+    created = sum(1 for r in rows if r.status == "created")
+    return StudentImportReport(total=total, created=created, failed=sum(1 for r in rows if r.status == "error"),
+                               dry_run=dry_run, rows=rows)
+
+# ===================== GRADE ROUTES =====================
+@router.post("/grades", response_model=GradeResponse)
+async def create_grade(grade_data: GradeCreate, current_user: dict = Depends(get_current_user)):
+    grade_id = str(uuid.uuid4())
+    grade_doc = {
+        "id": grade_id,
+        **grade_data.model_dump()
+    }
+    response = supabase.table('grades').insert(grade_doc).execute()
+    if not response.data:
+        raise HTTPException(status_code=400, detail="Erreur lors de la création")
+    
+    subject_response = supabase.table('subjects').select('*').eq('id', grade_data.subject_id).execute()
+    subject = subject_response.data[0] if subject_response.data else None
+    return GradeResponse(**grade_doc, subject_name=subject.get("name") if subject else None)
+
+@router.get("/grades", response_model=Union[List[GradeResponse], DeltaResponse[GradeResponse]])
+async def get_grades(
+    response: Response,
+    student_id: Optional[str] = None,
+    academic_year_id: Optional[str] = None,
+    semester: Optional[int] = None,
+    updated_since: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    query = changed_since(supabase.table('grades').select('*'), updated_since)
+    if student_id:
+        query = query.eq('student_id', student_id)
+    if academic_year_id:
+        query = query.eq('academic_year_id', academic_year_id)
+    if semester:
+        query = query.eq('semester', semester)
+    
+    grades = query.execute().data
+    result = []
+    for g in grades:
+        subject_response = supabase.table('subjects').select('*').eq('id', g.get("subject_id")).execute()
+        subject = subject_response.data[0] if subject_response.data else None
+        result.append(GradeResponse(**g, subject_name=subject.get("name") if subject else None))
+    return delta_result('grades', grades, result, updated_since, response, academic_year_id=academic_year_id)
+
+@router.put("/grades/{grade_id}", response_model=GradeResponse)
+async def update_grade(grade_id: str, grade_data: GradeCreate, current_user: dict = Depends(get_current_user)):
+    response = supabase.table('grades').update(grade_data.model_dump()).eq('id', grade_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Note non trouvée")
+    subject_response = supabase.table('subjects').select('*').eq('id', grade_data.subject_id).execute()
+    subject = subject_response.data[0] if subject_response.data else None
+    return GradeResponse(id=grade_id, **grade_data.model_dump(), subject_name=subject.get("name") if subject else None)
+
+@router.delete("/grades/{grade_id}")
+async def delete_grade(grade_id: str, current_user: dict = Depends(get_current_user)):
+    response = supabase.table('grades').delete().eq('id', grade_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Note non trouvée")
+    return {"message": "Note supprimée"}
+
+# ===================== STUDENT ABSENCE ROUTES =====================
+@router.post("/student-absences", response_model=StudentAbsenceResponse)
+async def create_student_absence(absence_data: StudentAbsenceCreate, current_user: dict = Depends(get_current_user)):
+    absence_id = str(uuid.uuid4())
+    absence_doc = {
+        "id": absence_id,
+        **absence_data.model_dump()
+    }
+    response = supabase.table('student_absences').insert(absence_doc).execute()
+    if not response.data:
+        raise HTTPException(status_code=400, detail="Erreur lors de la création")
+    
+    student_response = supabase.table('students').select('*').eq('id', absence_data.student_id).execute()
+    student = student_response.data[0] if student_response.data else None
+    student_name = f"{student.get('first_name', '')} {student.get('last_name', '')}" if student else None
+    
+    return StudentAbsenceResponse(**absence_doc, student_name=student_name)
+
+@router.get("/student-absences", response_model=Union[List[StudentAbsenceResponse], DeltaResponse[StudentAbsenceResponse]])
+async def get_student_absences(
+    response: Response,
+    student_id: Optional[str] = None,
+    academic_year_id: Optional[str] = None,
+    updated_since: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    query = changed_since(supabase.table('student_absences').select('*'), updated_since)
+    if student_id:
+        query = query.eq('student_id', student_id)
+    if academic_year_id:
+        query = query.eq('academic_year_id', academic_year_id)
+    
+    absences = query.execute().data
+    result = []
+    for a in absences:
+        student_response = supabase.table('students').select('*').eq('id', a.get("student_id")).execute()
+        student = student_response.data[0] if student_response.data else None
+        student_name = f"{student.get('first_name', '')} {student.get('last_name', '')}" if student else None
+        
+        # Calculate total hours for this student
+        total_absences_response = supabase.table('student_absences').select('hours').eq('student_id', a.get("student_id")).eq('academic_year_id', a.get("academic_year_id")).execute()
+        total_hours = sum([abs_item.get('hours', 0) for abs_item in total_absences_response.data]) if total_absences_response.data else 0
+        
+        result.append(StudentAbsenceResponse(**a, student_name=student_name, total_hours=total_hours))
+    return delta_result('student_absences', absences, result, updated_since, response, academic_year_id=academic_year_id)
+
+@router.delete("/student-absences/{absence_id}")
+async def delete_student_absence(absence_id: str, current_user: dict = Depends(get_current_user)):
+    response = supabase.table('student_absences').delete().eq('id', absence_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Absence non trouvée")
+    return {"message": "Absence supprimée"}
@@ -0,0 +1,128 @@
+"""
+System routes, mounted on every deployment: health and readiness probes,
+cache / upstream statistics, metrics, profiles and background job progress
+"""
+
+import asyncio
+import os
+from datetime import datetime, timezone
+from typing import List
+
+from fastapi import APIRouter, HTTPException, Depends, Response, Request
+from fastapi.responses import FileResponse
+
+from metrics import render as render_metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from request_timing import TimedRoute
+from upstream_trace import route_stats
+from supinter import db
+from supinter.auth import password_hasher, get_current_user
+from supinter.db import read_cache, cache_store, upstream_monitor, SHARED_CACHE_ENABLED, SUPABASE_POOL_SIZE
+from supinter.jobs import jobs, ACTIVE, DONE
+from supinter.models import UserRole, JobResponse
+from supinter.observability import metrics, publish_metrics, METRICS_TOKEN, PROFILING_ROLES
+
+router = APIRouter(prefix="/api", route_class=TimedRoute)
+
+# Scraped at the root, outside the API prefix
+metrics_router = APIRouter()
+
+# ===================== HEALTH CHECK =====================
+@router.get("/")
+async def root():
+    return {"message": "SUP'INTER University Management System API"}
+
+@router.get("/health")
+async def health_check():
+    return {"status": "healthy", "timestamp": datetime.now(timezone.utc).isoformat()}
+
+@router.get("/ready")
+async def readiness_check(response: Response):
+    """Deep check for the load balancer: 503 when unhealthy, 200 (healthy/degraded) otherwise"""
+    probe = await asyncio.get_running_loop().run_in_executor(
+        None, upstream_monitor.fresh_probe, float(os.environ.get('READY_PROBE_MAX_AGE', '1'))
+    )
+    pools = {
+        "upstream": {"in_use": db.upstream_in_flight, "size": SUPABASE_POOL_SIZE},
+        "bcrypt": {"in_use": password_hasher.pending, "size": password_hasher.workers},
+    }
+    status, reasons = upstream_monitor.assess(pools)
+    if status == "unhealthy":
+        response.status_code = 503
+    return {
+        "status": status,
+        "reasons": reasons,
+        "upstream": {
+            "probe_ok": probe["ok"],
+            "probe_latency_ms": probe["latency_ms"],
+            **upstream_monitor.latency(),
+        },
+        "pools": pools,
+        "event_loop_lag_ms": round(upstream_monitor.loop_lag_ms, 1),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+@router.get("/cache/stats")
+async def cache_stats(current_user: dict = Depends(get_current_user)):
+    return read_cache.snapshot()
+
+@router.get("/upstream/stats")
+async def upstream_stats(current_user: dict = Depends(get_current_user)):
+    return route_stats.snapshot()
+
+# ===================== METRICS =====================
+@metrics_router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics(request: Request):
+    if METRICS_TOKEN and request.headers.get("Authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Non authentifié")
+    if not SHARED_CACHE_ENABLED:
+        return Response(render_metrics([({}, metrics.snapshot())]), media_type=METRICS_CONTENT_TYPE)
+    # Every worker's last published snapshot, this one's being current
+    publish_metrics(metrics.snapshot())
+    snapshots = [({"worker": key.split(":", 1)[1]}, snapshot) for key, snapshot in cache_store.items("metrics:")]
+    return Response(render_metrics(snapshots), media_type=METRICS_CONTENT_TYPE)
+
+# ===================== PROFILING =====================
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, current_user: dict = Depends(get_current_user)):
+    """Folded stacks of a profiled request (flame graph input)"""
+    if current_user["role"] not in PROFILING_ROLES:
+        raise HTTPException(status_code=403, detail="Accès refusé")
+    profile = cache_store.get(f"profile:{profile_id}")
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profil non trouvé")
+    return Response(profile["folded"], media_type="text/plain", headers={"X-Profiled-Path": profile["path"]})
+
+# ===================== BACKGROUND JOBS =====================
+def visible_job(job_id: str, current_user: dict) -> dict:
+    state = jobs.state(job_id)
+    if state is None or (state["user_id"] != current_user["id"] and current_user["role"] != UserRole.FOUNDER):
+        raise HTTPException(status_code=404, detail="Tâche non trouvée")
+    return state
+
+@router.get("/jobs", response_model=List[JobResponse])
+async def get_jobs(current_user: dict = Depends(get_current_user)):
+    """The user's jobs, most recent first"""
+    states = [s for s in jobs.states() if s["user_id"] == current_user["id"]]
+    return sorted(states, key=lambda s: s["created_at"], reverse=True)
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    return visible_job(job_id, current_user)
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str, current_user: dict = Depends(get_current_user)):
+    state = visible_job(job_id, current_user)
+    if state["status"] != DONE:
+        raise HTTPException(status_code=409, detail="Tâche non terminée")
+    path = jobs.store.path(job_id, "result")
+    if not state.get("filename") or not path.exists():
+        raise HTTPException(status_code=404, detail="Aucun fichier pour cette tâche")
+    return FileResponse(path, media_type=state["media_type"], filename=state["filename"])
+
+@router.delete("/jobs/{job_id}", response_model=JobResponse)
+async def cancel_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    state = visible_job(job_id, current_user)
+    if state["status"] not in ACTIVE:
+        raise HTTPException(status_code=409, detail="Tâche déjà terminée")
+    jobs.cancel(job_id)
+    return jobs.state(job_id)
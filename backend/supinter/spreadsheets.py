@@ -0,0 +1,225 @@
+"""
+Spreadsheet rows in and out of the API (CSV and XLSX)
+
+Uploads are read from the request body as it arrives: CSV records are parsed
+chunk by chunk, XLSX (a zip, which needs random access) is spooled to a
+temporary file and read row by row in openpyxl's read-only mode. Headers are
+matched loosely (case, accents, spaces) so files exported from Excel in
+French work as they are.
+
+Exports are written page by page: CSV for Excel in French (BOM, ';'), and
+XLSX as a zip streamed without seeking (inline strings, no shared strings
+table), so memory does not grow with the number of rows.
+"""
+
+import codecs
+import csv
+import io
+import re
+import tempfile
+import unicodedata
+import zipfile
+from datetime import date, datetime
+from xml.sax.saxutils import escape
+
+from fastapi import HTTPException, Request
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# Bodies above this size are spooled to disk while an XLSX upload arrives
+XLSX_SPOOL_SIZE = 8 * 1024 * 1024
+
+
+def normalize_header(value) -> str:
+    """'Date de naissance ' -> 'date_de_naissance', 'Prénoms' -> 'prenoms'"""
+    text = unicodedata.normalize("NFKD", str(value or "")).encode("ascii", "ignore").decode()
+    return "_".join(text.lower().replace("'", " ").replace("-", " ").split())
+
+
+def cell_text(value) -> str:
+    """Cell value as the text a user typed (dates as ISO, 12.0 as 12)"""
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def split_records(text: str) -> tuple:
+    """Whole CSV records at the start of `text`, and the unfinished rest"""
+    in_quotes, cut = False, 0
+    for i, char in enumerate(text):
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == "\n" and not in_quotes:
+            cut = i + 1
+    return text[:cut], text[cut:]
+
+
+async def csv_rows(request: Request):
+    """Lists of cells, header first, parsed as the body arrives"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending, delimiter = "", None
+    async for chunk in request.stream():
+        complete, pending = split_records(pending + decoder.decode(chunk))
+        if not complete:
+            continue
+        if delimiter is None:
+            # Excel in French writes ';'
+            header = complete.split("\n", 1)[0]
+            delimiter = ";" if header.count(";") > header.count(",") else ","
+        for row in csv.reader(io.StringIO(complete), delimiter=delimiter):
+            yield row
+    pending += decoder.decode(b"", final=True)
+    if pending.strip():
+        if delimiter is None:
+            delimiter = ";" if pending.count(";") > pending.count(",") else ","
+        for row in csv.reader(io.StringIO(pending), delimiter=delimiter):
+            yield row
+
+
+async def xlsx_rows(request: Request):
+    """Lists of cells of the first sheet, header first"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise HTTPException(status_code=415, detail="Import XLSX indisponible (openpyxl non installé) : utiliser un fichier CSV")
+    with tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_SIZE) as body:
+        async for chunk in request.stream():
+            body.write(chunk)
+        body.seek(0)
+        try:
+            workbook = load_workbook(body, read_only=True, data_only=True)
+        except Exception:
+            raise HTTPException(status_code=400, detail="Fichier XLSX illisible")
+        try:
+            for row in workbook.worksheets[0].iter_rows(values_only=True):
+                yield [cell_text(value) for value in row]
+        finally:
+            workbook.close()
+
+
+async def read_records(request: Request, aliases: dict):
+    """(line number, {field: text}) for each non-empty line of an uploaded CSV or XLSX
+
+    `aliases` maps normalized headers to field names; unknown columns are ignored.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    filename = request.query_params.get("filename", "").lower()
+    rows = xlsx_rows(request) if content_type == XLSX_CONTENT_TYPE or filename.endswith(".xlsx") else csv_rows(request)
+    fields = None
+    line = 0
+    async for row in rows:
+        line += 1
+        if fields is None:
+            fields = [aliases.get(normalize_header(cell)) for cell in row]
+            if not any(fields):
+                raise HTTPException(status_code=400, detail="En-têtes de colonnes non reconnus")
+            continue
+        values = {field: cell_text(cell) for field, cell in zip(fields, row) if field}
+        if any(values.values()):
+            yield line, values
+    if fields is None:
+        raise HTTPException(status_code=400, detail="Fichier vide")
+
+
+# ------------------------------------------------------------------ exports
+def csv_chunks(header: list, pages):
+    """CSV bytes, one chunk per page of rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=";")
+    writer.writerow(header)
+    yield ("\ufeff" + buffer.getvalue()).encode()
+    for rows in pages:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(["" if v is None else v for v in row] for row in rows)
+        yield buffer.getvalue().encode()
+
+
+class _Sink:
+    """Write-only target for zipfile: what is written is taken out after each page"""
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'),
+    "_rels/.rels": (
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'),
+    "xl/_rels/workbook.xml.rels": (
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'),
+}
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+# Characters XML 1.0 does not allow
+INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def column_letter(index: int) -> str:
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def xlsx_row(number: int, values: list) -> str:
+    cells = []
+    for i, value in enumerate(values):
+        ref = f"{column_letter(i)}{number}"
+        if value is None or value == "":
+            continue
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+        else:
+            text = escape(INVALID_XML_CHARS.sub("", str(value)))
+            cells.append(f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return f'<row r="{number}">{"".join(cells)}</row>'
+
+
+def xlsx_chunks(header: list, pages, sheet: str = "Export"):
+    """XLSX bytes of a one-sheet workbook, one chunk per page of rows"""
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as workbook:
+        for name, xml in XLSX_PARTS.items():
+            workbook.writestr(name, XML_DECLARATION + xml)
+        workbook.writestr("xl/workbook.xml", XML_DECLARATION + (
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets><sheet name="{escape(sheet[:31])}" sheetId="1" r:id="rId1"/></sheets></workbook>'))
+        with workbook.open("xl/worksheets/sheet1.xml", "w") as worksheet:
+            worksheet.write((XML_DECLARATION + '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+                             + xlsx_row(1, header)).encode())
+            number = 1
+            for rows in pages:
+                worksheet.write("".join(xlsx_row(number + i + 1, row) for i, row in enumerate(rows)).encode())
+                number += len(rows)
+                yield sink.take()
+            worksheet.write(b"</sheetData></worksheet>")
+    yield sink.take()
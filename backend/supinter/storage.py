@@ -0,0 +1,296 @@
+"""
+Storage backends behind the Supabase wrapper
+
+The wrapper builds PostgREST requests (method, table, query parameters,
+payload, Prefer header) and hands them to a backend:
+
+- HTTPBackend sends them to Supabase
+- SQLiteBackend answers them in-process from SQLite, with the tables,
+  indexes and views of supabase_schema.sql. It implements the part of PostgREST the
+  code uses (select with count, eq/neq/gt/gte/lt/lte, like/ilike, in, is,
+  order, limit/offset, insert/update/delete with return=representation)
+  and emulates the schema's triggers (updated_at, tombstones), so the whole
+  API runs with no network for tests, CI and benchmarks.
+
+Set SUPABASE_URL=sqlite:// (in memory, one process) or sqlite:///path/to.db
+to use the SQLite backend. STORAGE_LATENCY_MS adds a fixed delay to every
+SQLite call, standing in for the round trip to a remote project (benchmarks,
+load tests).
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import orjson
+
+SCHEMA_PATH = Path(__file__).parent.parent / "supabase_schema.sql"
+
+FILTER_OPERATORS = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+# Postgres types and defaults of supabase_schema.sql, in SQLite terms
+PG_TO_SQLITE = [
+    (r"BIGSERIAL PRIMARY KEY", "INTEGER PRIMARY KEY AUTOINCREMENT"),
+    (r"\bUUID\b", "TEXT"),
+    (r"DEFAULT gen_random_uuid\(\)", "DEFAULT (gen_random_uuid())"),
+    (r"DEFAULT CURRENT_TIMESTAMP", "DEFAULT (now_iso())"),
+    (r"CREATE OR REPLACE VIEW", "CREATE VIEW IF NOT EXISTS"),
+]
+
+
+def now_iso() -> str:
+    """Current time as PostgREST renders a TIMESTAMP column"""
+    return datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def translate_schema(sql: str) -> list:
+    """SQLite statements for the tables, indexes and views of a Postgres schema file"""
+    sql = re.sub(r"--[^\n]*", "", sql)
+    # PL/pgSQL functions and DO blocks: their triggers are emulated by SQLiteBackend
+    sql = re.sub(r"CREATE OR REPLACE FUNCTION.*?\$\$ LANGUAGE plpgsql;", "", sql, flags=re.S)
+    sql = re.sub(r"DO \$\$.*?\$\$;", "", sql, flags=re.S)
+    for pattern, replacement in PG_TO_SQLITE:
+        sql = re.sub(pattern, replacement, sql)
+    return [statement.strip() for statement in sql.split(";") if statement.strip()]
+
+
+class StorageResponse:
+    """The parts of requests.Response the wrapper reads"""
+    def __init__(self, status_code: int, body=None, headers: Optional[dict] = None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = orjson.dumps(body) if body is not None else b""
+
+    @property
+    def text(self) -> str:
+        return self.content.decode()
+
+    def json(self):
+        return orjson.loads(self.content)
+
+
+class StorageError(Exception):
+    """A request PostgREST would refuse (answered with its status and error body)"""
+    def __init__(self, status_code: int, code: str, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.code = code
+
+
+class HTTPBackend:
+    """PostgREST over HTTP (Supabase)"""
+    def __init__(self, session, timeout: float):
+        self.session = session
+        self.timeout = timeout
+
+    def request(self, method: str, url: str, table: str, params: list, payload, headers: dict):
+        return self.session.request(method, url, params=params, json=payload, headers=headers, timeout=self.timeout)
+
+
+class LatencyBackend:
+    """Another backend, with a fixed delay added to every call"""
+    def __init__(self, backend, latency: float):
+        self.backend = backend
+        self.latency = latency
+
+    def request(self, method: str, url: str, table: str, params: list, payload, headers: dict):
+        time.sleep(self.latency)
+        return self.backend.request(method, url, table, params, payload, headers)
+
+
+class SQLiteBackend:
+    """In-process PostgREST over SQLite, created from supabase_schema.sql"""
+    def __init__(self, path: str = ":memory:", schema_path: Path = SCHEMA_PATH):
+        self.path = path
+        self.schema_path = schema_path
+        self.lock = threading.Lock()
+        self.conn = None
+        self.pid = None
+        # table -> {column: declared type}
+        self.columns = {}
+
+    def _connect(self):
+        # One connection per process: never shared across a fork
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.create_function("gen_random_uuid", 0, lambda: str(uuid.uuid4()))
+        conn.create_function("now_iso", 0, now_iso)
+        conn.execute("PRAGMA foreign_keys = ON")
+        if self.path != ":memory:":
+            # A file database may be shared by several workers: readers must
+            # not block the writer
+            conn.execute("PRAGMA journal_mode = WAL")
+        for statement in translate_schema(self.schema_path.read_text(encoding="utf-8")):
+            conn.execute(statement)
+        tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite_%'")]
+        # table_xinfo also lists generated columns
+        self.columns = {t: {row["name"]: row["type"].upper() for row in conn.execute(f'PRAGMA table_xinfo("{t}")')} for t in tables}
+        # The schema's triggers apply to every table with an updated_at column;
+        # row-level SQLite triggers also fire on ON DELETE CASCADE, like Postgres
+        for table, columns in self.columns.items():
+            if "updated_at" in columns and table != "tombstones":
+                scope = [f"OLD.{c}" if c in columns else "NULL" for c in ("campus_id", "academic_year_id")]
+                conn.execute(
+                    f'CREATE TRIGGER IF NOT EXISTS "trg_{table}_tombstone" AFTER DELETE ON "{table}" FOR EACH ROW '
+                    f"BEGIN INSERT INTO tombstones (table_name, row_id, campus_id, academic_year_id) "
+                    f"VALUES ('{table}', OLD.id, {', '.join(scope)}); END"
+                )
+        self.conn = conn
+        self.pid = os.getpid()
+
+    def connection(self) -> sqlite3.Connection:
+        if self.conn is None or self.pid != os.getpid():
+            self._connect()
+        return self.conn
+
+    def reset(self):
+        """Delete every row (tests and benchmarks)"""
+        with self.lock:
+            conn = self.connection()
+            conn.execute("PRAGMA foreign_keys = OFF")
+            for table in self.columns:
+                conn.execute(f'DELETE FROM "{table}"')
+            conn.execute("PRAGMA foreign_keys = ON")
+
+    # --------------------------------------------------------------- requests
+    def request(self, method: str, url: str, table: str, params: list, payload, headers: dict) -> StorageResponse:
+        prefer = headers.get("Prefer", "")
+        with self.lock:
+            conn = self.connection()
+            try:
+                if table not in self.columns:
+                    raise StorageError(404, "42P01", f'relation "public.{table}" does not exist')
+                if method == "GET":
+                    return self._select(conn, table, params, "count=exact" in prefer)
+                if method == "POST":
+                    rows = self._insert(conn, table, payload)
+                    return StorageResponse(201, rows if "return=representation" in prefer else None)
+                if method == "PATCH":
+                    rows = self._update(conn, table, params, payload)
+                elif method == "DELETE":
+                    rows = self._delete(conn, table, params)
+                else:
+                    raise StorageError(405, "PGRST117", f"Unsupported HTTP method: {method}")
+                if "return=representation" in prefer:
+                    return StorageResponse(200, rows)
+                return StorageResponse(204)
+            except StorageError as e:
+                return StorageResponse(e.status_code, {"code": e.code, "details": None, "hint": None, "message": str(e)})
+            except sqlite3.IntegrityError as e:
+                code = "23505" if "UNIQUE" in str(e) else "23503" if "FOREIGN KEY" in str(e) else "23502"
+                return StorageResponse(409, {"code": code, "details": None, "hint": None, "message": str(e)})
+
+    def _column(self, table: str, column: str) -> str:
+        if column not in self.columns[table]:
+            raise StorageError(400, "42703", f"column {table}.{column} does not exist")
+        return f'"{column}"'
+
+    def _value(self, table: str, column: str, value):
+        """A filter or payload value as stored in the column"""
+        if self.columns[table][column] == "BOOLEAN" and isinstance(value, str):
+            return {"true": 1, "false": 0}.get(value.lower(), value)
+        if isinstance(value, (dict, list)):
+            return orjson.dumps(value).decode()
+        return value
+
+    def _row(self, table: str, row: sqlite3.Row) -> dict:
+        types = self.columns[table]
+        return {key: bool(row[key]) if types.get(key) == "BOOLEAN" and row[key] is not None else row[key] for key in row.keys()}
+
+    def _where(self, table: str, params: list) -> tuple:
+        """WHERE clause, bindings and the select / order / limit / offset parameters"""
+        clauses, bindings, options = [], [], {}
+        for key, value in params:
+            if key in ("select", "order", "limit", "offset"):
+                options[key] = str(value)
+                continue
+            column = self._column(table, key)
+            operator, _, operand = str(value).partition(".")
+            if operator in FILTER_OPERATORS:
+                clauses.append(f"{column} {FILTER_OPERATORS[operator]} ?")
+                bindings.append(self._value(table, key, operand))
+            elif operator == "like":
+                # PostgREST accepts * for %; GLOB is case sensitive like Postgres LIKE
+                clauses.append(f"{column} GLOB ?")
+                bindings.append(operand.replace("*", "%").replace("%", "*").replace("_", "?"))
+            elif operator == "ilike":
+                clauses.append(f"LOWER({column}) LIKE LOWER(?)")
+                bindings.append(operand.replace("*", "%"))
+            elif operator == "in":
+                values = [v.strip().strip('"') for v in operand.strip("()").split(",") if v.strip()]
+                clauses.append(f"{column} IN ({', '.join('?' * len(values))})" if values else "0")
+                bindings.extend(self._value(table, key, v) for v in values)
+            elif operator == "is":
+                literal = {"null": "NULL", "true": "1", "false": "0"}.get(operand.lower())
+                if literal is None:
+                    raise StorageError(400, "PGRST100", f"failed to parse filter ({value})")
+                clauses.append(f"{column} IS {literal}")
+            else:
+                raise StorageError(400, "PGRST100", f"unsupported operator ({value})")
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), bindings, options
+
+    def _select(self, conn, table: str, params: list, count: bool) -> StorageResponse:
+        where, bindings, options = self._where(table, params)
+        fields = options.get("select", "*")
+        columns = "*" if fields == "*" else ", ".join(self._column(table, f.strip()) for f in fields.split(","))
+        sql = f'SELECT {columns} FROM "{table}"{where}'
+        if "order" in options:
+            terms = []
+            for term in options["order"].split(","):
+                column, _, direction = term.partition(".")
+                terms.append(f"{self._column(table, column)} {'DESC' if direction.startswith('desc') else 'ASC'}")
+            sql += " ORDER BY " + ", ".join(terms)
+        offset = int(options.get("offset", 0))
+        if "limit" in options or offset:
+            sql += " LIMIT ? OFFSET ?"
+        rows = [self._row(table, r) for r in conn.execute(sql, bindings + ([int(options.get("limit", -1)), offset] if "limit" in options or offset else []))]
+        total = conn.execute(f'SELECT COUNT(*) FROM "{table}"{where}', bindings).fetchone()[0] if count else None
+        content_range = f"{offset}-{offset + len(rows) - 1}" if rows else "*"
+        return StorageResponse(200, rows, {"Content-Range": f"{content_range}/{'*' if total is None else total}"})
+
+    def _insert(self, conn, table: str, payload) -> list:
+        rows = payload if isinstance(payload, list) else [payload]
+        inserted = []
+        # All rows or none, like a PostgREST bulk insert
+        conn.execute("SAVEPOINT insert_rows")
+        try:
+            for row in rows:
+                columns = [self._column(table, key) for key in row]
+                values = [self._value(table, key, value) for key, value in row.items()]
+                sql = (f'INSERT INTO "{table}" ({", ".join(columns)}) VALUES ({", ".join("?" * len(values))}) RETURNING *'
+                       if columns else f'INSERT INTO "{table}" DEFAULT VALUES RETURNING *')
+                inserted.append(self._row(table, conn.execute(sql, values).fetchone()))
+        except Exception:
+            conn.execute("ROLLBACK TO insert_rows")
+            raise
+        finally:
+            conn.execute("RELEASE insert_rows")
+        return inserted
+
+    def _update(self, conn, table: str, params: list, payload: dict) -> list:
+        where, bindings, _ = self._where(table, params)
+        changes = dict(payload)
+        if "updated_at" in self.columns[table]:
+            # set_updated_at() trigger
+            changes["updated_at"] = now_iso()
+        assignments = ", ".join(f"{self._column(table, key)} = ?" for key in changes)
+        values = [self._value(table, key, value) for key, value in changes.items()]
+        return [self._row(table, r) for r in conn.execute(f'UPDATE "{table}" SET {assignments}{where} RETURNING *', values + bindings).fetchall()]
+
+    def _delete(self, conn, table: str, params: list) -> list:
+        where, bindings, _ = self._where(table, params)
+        return [self._row(table, r) for r in conn.execute(f'DELETE FROM "{table}"{where} RETURNING *', bindings).fetchall()]
+
+
+def backend_for(url: str, session, timeout: float, latency: float = 0):
+    """SQLiteBackend for sqlite:// URLs (slowed down by `latency` seconds per call), HTTPBackend (Supabase) otherwise"""
+    if url.startswith("sqlite:"):
+        backend = SQLiteBackend(url[len("sqlite://"):] or ":memory:")
+        return LatencyBackend(backend, latency) if latency else backend
+    return HTTPBackend(session, timeout)
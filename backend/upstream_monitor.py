@@ -0,0 +1,129 @@
+"""
+Upstream (Supabase) health monitor
+
+Keeps a rolling window of upstream call latencies (p50/p99, error rate), runs
+a cheap probe query in a background thread so the picture stays current when
+traffic is low, and measures event-loop lag. `assess()` turns this, plus the
+pool usage figures given by the caller, into healthy / degraded / unhealthy
+for the readiness probe; `upstream_down()` lets the read cache serve stale
+data without waiting on an upstream known to be failing.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from upstream_trace import UpstreamCall
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(sorted_values: list, fraction: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    return round(sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)], 1)
+
+
+class UpstreamMonitor:
+    def __init__(self, probe: Callable[[], None], window: float = 60.0, max_samples: int = 4096,
+                 probe_interval: float = 15.0, slow_probe_ms: float = 500.0, p99_degraded_ms: float = 2000.0,
+                 loop_lag_degraded_ms: float = 100.0, pool_degraded_usage: float = 0.9):
+        self.probe = probe
+        self.window = window
+        self.probe_interval = probe_interval
+        self.slow_probe_ms = slow_probe_ms
+        self.p99_degraded_ms = p99_degraded_ms
+        self.loop_lag_degraded_ms = loop_lag_degraded_ms
+        self.pool_degraded_usage = pool_degraded_usage
+        self.lock = threading.Lock()
+        # (monotonic time, latency in ms, succeeded)
+        self.samples = deque(maxlen=max_samples)
+        self.last_probe = None
+        self.probe_lock = threading.Lock()
+        self.loop_lags = deque(maxlen=20)
+
+    def observe(self, call: UpstreamCall):
+        """Listener for upstream_trace, fed with every upstream call"""
+        with self.lock:
+            self.samples.append((time.monotonic(), call.duration_ms, 0 < call.status < 500))
+
+    def latency(self) -> dict:
+        """Rolling p50 / p99 and error rate over the window"""
+        cutoff = time.monotonic() - self.window
+        with self.lock:
+            recent = [(ms, ok) for at, ms, ok in self.samples if at >= cutoff]
+        latencies = sorted(ms for ms, _ in recent)
+        return {
+            "calls": len(recent),
+            "p50_ms": percentile(latencies, 0.50),
+            "p99_ms": percentile(latencies, 0.99),
+            "error_rate": round(sum(1 for _, ok in recent if not ok) / len(recent), 4) if recent else None,
+        }
+
+    def run_probe(self) -> dict:
+        started = time.perf_counter()
+        try:
+            self.probe()
+            result = {"ok": True, "error": None}
+        except Exception as e:
+            result = {"ok": False, "error": str(e)[:200]}
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        result["at"] = time.monotonic()
+        self.last_probe = result
+        return result
+
+    def fresh_probe(self, max_age: float) -> dict:
+        """Last probe result if younger than `max_age` seconds, a new probe otherwise"""
+        with self.probe_lock:
+            probe = self.last_probe
+            if probe is None or time.monotonic() - probe["at"] > max_age:
+                probe = self.run_probe()
+        return probe
+
+    def upstream_down(self) -> bool:
+        """True while the latest probe (no older than two intervals) failed"""
+        probe = self.last_probe
+        return probe is not None and not probe["ok"] and time.monotonic() - probe["at"] < 2 * self.probe_interval
+
+    @property
+    def loop_lag_ms(self) -> float:
+        return max(self.loop_lags, default=0.0)
+
+    def assess(self, pools: dict) -> tuple:
+        """(status, reasons) from the last probe, rolling latency, loop lag and pool usage"""
+        probe = self.last_probe
+        if probe is not None and not probe["ok"]:
+            return "unhealthy", [f"upstream probe failed: {probe['error']}"]
+        reasons = []
+        if probe is not None and probe["latency_ms"] > self.slow_probe_ms:
+            reasons.append(f"upstream probe slow ({probe['latency_ms']} ms)")
+        p99 = self.latency()["p99_ms"]
+        if p99 is not None and p99 > self.p99_degraded_ms:
+            reasons.append(f"upstream p99 {p99:.0f} ms")
+        if self.loop_lag_ms > self.loop_lag_degraded_ms:
+            reasons.append(f"event loop lag {self.loop_lag_ms:.0f} ms")
+        for name, pool in pools.items():
+            if pool["size"] and pool["in_use"] / pool["size"] >= self.pool_degraded_usage:
+                reasons.append(f"{name} pool saturated ({pool['in_use']}/{pool['size']})")
+        return ("degraded" if reasons else "healthy"), reasons
+
+    def _probe_forever(self):
+        while True:
+            probe = self.run_probe()
+            if not probe["ok"]:
+                logger.warning(f"Upstream probe failed: {probe['error']}")
+            time.sleep(self.probe_interval)
+
+    def start(self):
+        """Start the background probe thread"""
+        threading.Thread(target=self._probe_forever, name="upstream-probe", daemon=True).start()
+
+    async def watch_event_loop(self, interval: float = 0.5):
+        """Measure how late the loop wakes a sleeping task (run as a background task)"""
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            self.loop_lags.append(max((time.perf_counter() - started - interval) * 1000, 0.0))
@@ -0,0 +1,195 @@
+"""
+Per-request instrumentation of upstream (PostgREST) calls
+
+Every call made through the Supabase wrapper is recorded against the request
+being served: table, query shape (filters without their values), latency,
+status and response size. Each request gets one summary log line, and routes
+keep running counts so tests can assert upstream call budgets.
+
+In development (UPSTREAM_DEBUG=true), a route issuing more than
+N_PLUS_ONE_THRESHOLD queries of the same shape is flagged as a probable N+1.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+logger = logging.getLogger("upstream")
+
+# Parameters kept verbatim in a shape; for the others only the operator is kept
+SHAPE_VERBATIM_PARAMS = {"select", "order"}
+SHAPE_PAGING_PARAMS = {"limit", "offset"}
+
+
+def query_shape(method: str, table: str, params) -> str:
+    """Identify a query independently of its filter values"""
+    parts = []
+    for key, value in params:
+        if key in SHAPE_VERBATIM_PARAMS:
+            parts.append(f"{key}={value}")
+        elif key in SHAPE_PAGING_PARAMS:
+            parts.append(key)
+        else:
+            parts.append(f"{key}={str(value).split('.', 1)[0]}")
+    return f"{method} {table}?{'&'.join(parts)}"
+
+
+@dataclass
+class UpstreamCall:
+    table: str
+    method: str
+    shape: str
+    duration_ms: float
+    status: int
+    bytes: int
+
+
+class RequestTrace:
+    """Upstream calls made while serving one request"""
+    def __init__(self):
+        self.calls = []
+
+    @property
+    def total_ms(self) -> float:
+        return sum(c.duration_ms for c in self.calls)
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(c.bytes for c in self.calls)
+
+    def by_table(self) -> Counter:
+        return Counter(c.table for c in self.calls)
+
+    def repeated_shapes(self, threshold: int) -> dict:
+        """Shapes issued more than `threshold` times"""
+        counts = Counter(c.shape for c in self.calls)
+        return {shape: n for shape, n in counts.items() if n > threshold}
+
+
+current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("current_trace", default=None)
+
+# Called with every UpstreamCall, inside a request or not (e.g. metrics)
+listeners = []
+
+
+def record_call(table: str, method: str, params, started: float, status: int, size: int):
+    """Attach an upstream call to the current request, if any (status 0 = no response)"""
+    trace = current_trace.get()
+    if trace is None and not listeners:
+        return
+    call = UpstreamCall(
+        table, method, query_shape(method, table, params),
+        (time.perf_counter() - started) * 1000, status, size,
+    )
+    if trace is not None:
+        trace.calls.append(call)
+    for listener in listeners:
+        listener(call)
+
+
+@contextmanager
+def capture_upstream():
+    """Collect the upstream calls made inside the block (tests, benchmarks, scripts)"""
+    trace = RequestTrace()
+    token = current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        current_trace.reset(token)
+
+
+class RouteStats:
+    """Upstream call counts per route template"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = {}
+
+    def add(self, route: str, trace: RequestTrace, n_plus_one: bool):
+        with self.lock:
+            stats = self.routes.setdefault(route, {
+                "requests": 0, "upstream_calls": 0, "max_upstream_calls": 0,
+                "upstream_ms": 0.0, "upstream_bytes": 0, "n_plus_one": 0,
+            })
+            stats["requests"] += 1
+            stats["upstream_calls"] += len(trace.calls)
+            stats["max_upstream_calls"] = max(stats["max_upstream_calls"], len(trace.calls))
+            stats["upstream_ms"] += trace.total_ms
+            stats["upstream_bytes"] += trace.total_bytes
+            stats["n_plus_one"] += int(n_plus_one)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {route: dict(stats) for route, stats in sorted(self.routes.items())}
+
+    def reset(self):
+        with self.lock:
+            self.routes.clear()
+
+
+route_stats = RouteStats()
+
+
+def route_template(scope) -> str:
+    """Route path with its parameters left as placeholders (e.g. /api/students/{student_id})"""
+    route = getattr(scope.get("route"), "path", None)
+    if route:
+        return route
+    if "endpoint" not in scope:
+        # Unmatched paths (404s) would otherwise each get their own entry
+        return "<unmatched>"
+    placeholders = {str(v): f"{{{k}}}" for k, v in scope.get("path_params", {}).items()}
+    return "/".join(placeholders.get(segment, segment) for segment in scope["path"].split("/"))
+
+
+class UpstreamTraceMiddleware:
+    """Trace upstream calls per request, log a summary and flag N+1 patterns.
+
+    Responses carry X-Upstream-Calls (calls made before the response
+    started), and X-N-Plus-One when the detector fired.
+    """
+    def __init__(self, app, n_plus_one_threshold: int = 0, stats: RouteStats = route_stats):
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.stats = stats
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trace = RequestTrace()
+        token = current_trace.set(trace)
+        started = time.perf_counter()
+        status = 500
+        repeated = {}
+
+        async def send_with_trace(message):
+            nonlocal status, repeated
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", [])) + [(b"x-upstream-calls", str(len(trace.calls)).encode())]
+                if self.n_plus_one_threshold:
+                    repeated = trace.repeated_shapes(self.n_plus_one_threshold)
+                    if repeated:
+                        shape, count = max(repeated.items(), key=lambda item: item[1])
+                        headers.append((b"x-n-plus-one", f"{count}x {shape}".encode()))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_trace)
+        finally:
+            current_trace.reset(token)
+            label = f"{scope['method']} {route_template(scope)}"
+            tables = ", ".join(f"{t}:{n}" for t, n in trace.by_table().most_common())
+            logger.info(
+                f"{label} {status} {(time.perf_counter() - started) * 1000:.1f}ms "
+                f"upstream={len(trace.calls)} ({tables}) {trace.total_ms:.1f}ms {trace.total_bytes / 1024:.1f}kB"
+            )
+            for shape, count in repeated.items():
+                logger.warning(f"N+1 suspected on {label}: {count} x {shape}")
+            self.stats.add(label, trace, bool(repeated))
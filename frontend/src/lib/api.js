@@ -130,6 +130,12 @@ export const getStudentAbsences = (params) => api.get('/student-absences', { par
 export const createStudentAbsence = (data) => api.post('/student-absences', data);
 export const deleteStudentAbsence = (id) => api.delete(`/student-absences/${id}`);
 
+// Photos (rows hold a content hash; legacy data URLs and external URLs pass through)
+export const photoUrl = (photo, variant) => {
+  if (!photo || !/^[0-9a-f]{64}$/.test(photo)) return photo;
+  return `${API_URL}/api/photos/${photo}${variant ? `?variant=${variant}` : ''}`;
+};
+
 // Dashboard
 export const getDashboardStats = (params) => api.get('/dashboard/stats', { params });
 
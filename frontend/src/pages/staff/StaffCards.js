@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import { 
   getStaff,
+  photoUrl,
   getAcademicYears,
   getCampuses,
   createArchive
@@ -165,7 +166,7 @@ export default function StaffCards() {
                     <div className="flex gap-3">
                       <div className="w-16 h-20 bg-blue-600 rounded flex items-center justify-center">
                         {member.photo ? (
-                          <img src={member.photo} alt="" className="w-full h-full object-cover rounded" />
+                          <img src={photoUrl(member.photo, 'card')} alt="" className="w-full h-full object-cover rounded" />
                         ) : (
                           <span className="text-2xl">{member.first_name?.charAt(0)}</span>
                         )}
@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import { 
   getStudents, 
+  photoUrl,
   reenrollStudent,
   getAcademicYears,
   getFormations,
@@ -218,7 +219,7 @@ export default function StudentReinscription() {
                 >
                   <div className="flex items-center gap-4">
                     {student.photo ? (
-                      <img src={student.photo} alt="" className="w-12 h-12 rounded-full object-cover" />
+                      <img src={photoUrl(student.photo, 'thumb')} alt="" className="w-12 h-12 rounded-full object-cover" />
                     ) : (
                       <div className="w-12 h-12 rounded-full bg-slate-200 flex items-center justify-center text-slate-500">
                         {student.first_name?.charAt(0)}{student.last_name?.charAt(0)}
@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import { 
   getStudents,
+  photoUrl,
   getAcademicYears,
   getClasses,
   createArchive
@@ -172,7 +173,7 @@ export default function StudentCards() {
                     <div className="flex gap-3">
                       <div className="w-16 h-20 bg-slate-600 rounded flex items-center justify-center">
                         {student.photo ? (
-                          <img src={student.photo} alt="" className="w-full h-full object-cover rounded" />
+                          <img src={photoUrl(student.photo, 'card')} alt="" className="w-full h-full object-cover rounded" />
                         ) : (
                           <span className="text-2xl">{student.first_name?.charAt(0)}</span>
                         )}
@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import { 
   getStudents, 
+  photoUrl,
   deleteStudent,
   getAcademicYears,
   getFormations,
@@ -304,7 +305,7 @@ export default function StudentList() {
                       <TableCell>
                         <div className="flex items-center gap-3">
                           {student.photo ? (
-                            <img src={student.photo} alt="" className="w-8 h-8 rounded-full object-cover" />
+                            <img src={photoUrl(student.photo, 'thumb')} alt="" className="w-8 h-8 rounded-full object-cover" />
                           ) : (
                             <div className="w-8 h-8 rounded-full bg-slate-200 flex items-center justify-center text-slate-500 text-xs">
                               {student.first_name?.charAt(0)}{student.last_name?.charAt(0)}
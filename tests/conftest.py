@@ -0,0 +1,58 @@
+"""
+Shared pytest configuration: make the backend modules importable, run the
+API in-process on the SQLite storage backend unless told otherwise, and keep
+job state and photos in a scratch directory instead of the source tree
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+os.environ.setdefault("SUPABASE_URL", "sqlite://")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test")
+# Read when supinter.jobs and photo_store are imported, so set before any import
+SCRATCH = Path(tempfile.mkdtemp(prefix="supinter-tests-"))
+os.environ["JOB_DIR"] = str(SCRATCH / "jobs")
+os.environ["PHOTO_STORE_DIR"] = str(SCRATCH / "photos")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from benchmarks.dataset import PRESETS, generate  # noqa: E402
+from supinter import db  # noqa: E402
+from supinter.app import create_app  # noqa: E402
+from supinter.storage import SQLiteBackend  # noqa: E402
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(SCRATCH, ignore_errors=True)
+
+
+def login(api: TestClient, email: str, password: str) -> dict:
+    token = api.post("/api/auth/login", json={"email": email, "password": password}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture(scope="module")
+def school():
+    """A generated tiny school on a database of its own: (client, founder's headers, dataset)"""
+    shared, db.supabase.backend = db.supabase.backend, SQLiteBackend()
+    dataset = generate(db.supabase, PRESETS["tiny"], photos="none", log=lambda _: None)
+    api = TestClient(create_app())
+    yield api, login(api, "fondateur@supinter.ci", dataset.password), dataset
+    db.supabase.backend = shared
+
+
+def wait_for(api: TestClient, headers: dict, job_id: str) -> dict:
+    """State of a job once it has finished, polled through GET /api/jobs/{id}"""
+    for _ in range(200):
+        job = api.get(f"/api/jobs/{job_id}", headers=headers).json()
+        if job["status"] not in ("queued", "running"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError("job still running")
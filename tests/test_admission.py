@@ -0,0 +1,89 @@
+"""
+Bulkhead and admission control tests
+"""
+import asyncio
+import time
+
+import pytest
+
+from admission import Bulkhead, Overloaded, current_bulkhead, current_deadline, upstream_slot
+
+
+def bulkhead(**overrides):
+    settings = dict(limit=1, max_queue=1, queue_timeout=1.0, deadline=1.0, upstream_limit=1)
+    settings.update(overrides)
+    return Bulkhead("bulk", **settings)
+
+
+async def hold(b, seconds):
+    await b.acquire()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        b.release()
+
+
+class TestBulkhead:
+    """Queueing, shedding and upstream slots"""
+
+    def test_sheds_when_queue_is_full(self):
+        """Test a request beyond limit + max_queue is refused at once"""
+        b = bulkhead()
+
+        async def scenario():
+            holders = [asyncio.create_task(hold(b, 0.1)) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            with pytest.raises(Overloaded):
+                await b.acquire()
+            await asyncio.gather(*holders)
+
+        asyncio.run(scenario())
+        assert b.shed == 1 and b.active == 0
+
+    def test_sheds_after_queue_timeout(self):
+        """Test a queued request gives up after queue_timeout"""
+        b = bulkhead(queue_timeout=0.05)
+
+        async def scenario():
+            holder = asyncio.create_task(hold(b, 0.2))
+            await asyncio.sleep(0.01)
+            with pytest.raises(Overloaded):
+                await b.acquire()
+            await holder
+
+        asyncio.run(scenario())
+        assert b.waiting == 0
+
+    def test_upstream_slot_respects_deadline(self):
+        """Test an upstream call waits for a slot only until the request deadline"""
+        b = bulkhead()
+        tokens = current_bulkhead.set(b), current_deadline.set(time.monotonic() + 0.05)
+        try:
+            with upstream_slot():
+                with pytest.raises(Overloaded):
+                    with upstream_slot():
+                        pass
+            with upstream_slot():
+                pass
+        finally:
+            current_bulkhead.reset(tokens[0])
+            current_deadline.reset(tokens[1])
+
+    def test_upstream_slot_never_waits_on_the_event_loop(self):
+        """Test a call made on the event loop thread is shed at once instead of blocking the loop"""
+        b = bulkhead(deadline=5.0)
+
+        async def scenario():
+            tokens = current_bulkhead.set(b), current_deadline.set(time.monotonic() + 5.0)
+            try:
+                with upstream_slot():
+                    started = time.monotonic()
+                    with pytest.raises(Overloaded):
+                        with upstream_slot():
+                            pass
+                    return time.monotonic() - started
+            finally:
+                current_bulkhead.reset(tokens[0])
+                current_deadline.reset(tokens[1])
+
+        assert asyncio.run(scenario()) < 0.5
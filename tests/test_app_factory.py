@@ -0,0 +1,60 @@
+"""
+App factory: mounting a subset of domains per deployment
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+
+# Builds the app the way a worker does (SUPINTER_DOMAINS), in a fresh
+# interpreter, and reports its API paths and the route modules imported
+PROBE = """
+import json, sys
+import server
+print(json.dumps({
+    "domains": server.app.state.domains,
+    "paths": sorted({r.path for r in server.app.routes if r.path.startswith("/api/")}),
+    "modules": sorted(m for m in sys.modules if m.startswith("supinter.routes.")),
+}))
+"""
+
+
+def run_probe(domains: str) -> subprocess.CompletedProcess:
+    env = {**os.environ, "SUPINTER_DOMAINS": domains,
+           "SUPABASE_URL": os.environ.get("SUPABASE_URL", "http://localhost:54321"),
+           "SUPABASE_ANON_KEY": os.environ.get("SUPABASE_ANON_KEY", "factory-test")}
+    return subprocess.run([sys.executable, "-c", PROBE], cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+
+
+def probe(domains: str) -> dict:
+    result = run_probe(domains)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestCreateApp:
+    """Per-domain routers"""
+
+    def test_all_domains_by_default(self):
+        """Test every domain is mounted when SUPINTER_DOMAINS is empty"""
+        result = probe("")
+        assert result["domains"] == ["auth", "academic", "students", "finance", "documents", "dashboard", "exports"]
+        assert {"/api/auth/login", "/api/students", "/api/transactions", "/api/dashboard/stats"} <= set(result["paths"])
+
+    def test_finance_only_worker(self):
+        """Test a finance-only worker mounts and imports nothing else but the system routes"""
+        result = probe("finance")
+        assert result["modules"] == ["supinter.routes.finance", "supinter.routes.system"]
+        assert "/api/transactions" in result["paths"]
+        assert "/api/students" not in result["paths"]
+        assert "/api/auth/login" not in result["paths"]
+        assert {"/api/health", "/api/ready"} <= set(result["paths"])
+
+    def test_unknown_domain_is_refused(self):
+        """Test a typo in SUPINTER_DOMAINS stops the worker instead of serving nothing"""
+        result = run_probe("finance,finances")
+        assert result.returncode != 0
+        assert "Unknown domains: finances" in result.stderr
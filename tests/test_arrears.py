@@ -0,0 +1,46 @@
+"""
+Tuition arrears report
+"""
+import pytest
+
+from supinter import db
+
+
+class TestArrears:
+    """GET /api/finance/arrears"""
+
+    def test_debtors_and_totals(self, school):
+        """Test debtors come most owed first, page by page, with totals matching the students table"""
+        api, headers, dataset = school
+        students = db.supabase.table('students').select('*').eq('academic_year_id', dataset.active_year_id).no_cache().execute().data
+        owing = sorted((s for s in students if not s["is_exonerated"] and s["tuition_amount"] > s["tuition_paid"]),
+                       key=lambda s: (-(s["tuition_amount"] - s["tuition_paid"]), s["id"]))
+        report = api.get("/api/finance/arrears", params={"page_size": 5}, headers=headers).json()
+        assert report["debtors"] == len(owing)
+        assert report["outstanding"] == pytest.approx(sum(s["tuition_amount"] - s["tuition_paid"] for s in owing))
+        assert [s["id"] for s in report["items"]] == [s["id"] for s in owing[:5]]
+        second = api.get("/api/finance/arrears", params={"page_size": 5, "page": 2}, headers=headers).json()
+        assert [s["id"] for s in second["items"]] == [s["id"] for s in owing[5:10]]
+        assert sum(c["debtors"] for c in report["by_class"]) == sum(c["debtors"] for c in report["by_campus"]) == len(owing)
+        assert all(c["name"] for c in report["by_class"] + report["by_campus"])
+
+    def test_balance_follows_payments(self, school):
+        """Test a student who pays the rest leaves the report"""
+        api, headers, _ = school
+        debtor = api.get("/api/finance/arrears", params={"page_size": 1}, headers=headers).json()["items"][0]
+        db.supabase.table('students').update({"tuition_paid": debtor["tuition_amount"]}).eq('id', debtor["id"]).execute()
+        report = api.get("/api/finance/arrears", params={"class_id": debtor["class_id"]}, headers=headers).json()
+        assert debtor["id"] not in [s["id"] for s in report["items"]]
+
+    def test_one_total_per_class(self, school):
+        """Test a class whose students differ in level still gets a single by_class total"""
+        api, headers, dataset = school
+        students = db.supabase.table('students').select('*').eq('academic_year_id', dataset.active_year_id).gt('balance', 0).no_cache().execute().data
+        class_id = next(c for c in {s["class_id"] for s in students} if sum(s["class_id"] == c for s in students) > 1)
+        in_class = [s for s in students if s["class_id"] == class_id]
+        other_level = next(l["id"] for l in db.supabase.table('levels').select('id').execute().data if l["id"] != in_class[0]["level_id"])
+        db.supabase.table('students').update({"level_id": other_level}).eq('id', in_class[0]["id"]).execute()
+        totals = [c for c in api.get("/api/finance/arrears", headers=headers).json()["by_class"] if c["id"] == class_id]
+        assert len(totals) == 1
+        assert totals[0]["debtors"] == len(in_class)
+        assert totals[0]["outstanding"] == pytest.approx(sum(s["balance"] for s in in_class))
@@ -0,0 +1,104 @@
+"""
+Authentication, password hashing and the cached current user
+"""
+import asyncio
+import threading
+import time
+import uuid
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from admission import Bulkhead, current_bulkhead, current_deadline
+from supinter import db
+from supinter.auth import BCRYPT_ROUNDS, PasswordHasher, get_current_user, get_pwd_context, user_from_token
+
+
+class TestCurrentUser:
+    """supinter.auth.user_from_token"""
+
+    def test_cached_user_has_no_password_hash(self, school):
+        """Test the user kept in the (possibly shared) cache never carries the password hash"""
+        api, headers, _ = school
+        user = user_from_token(headers["Authorization"].split(" ", 1)[1])
+        assert user["email"] == "fondateur@supinter.ci" and "password" not in user
+        cached = db.cache_store.get(f"user:{user['id']}:{db.table_versions['users']}")
+        assert cached is not None and "password" not in cached
+        assert api.get("/api/auth/me", headers=headers).json()["email"] == user["email"]
+
+    def test_lookup_waits_for_an_upstream_slot(self, school):
+        """Test a cache miss waits for a busy bulkhead's upstream slot instead of being shed on the event loop"""
+        _, headers, _ = school
+        db.table_versions.bump('users')
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=headers["Authorization"].split(" ", 1)[1])
+        bulk = Bulkhead("bulk", limit=1, max_queue=1, queue_timeout=1.0, deadline=2.0, upstream_limit=1)
+        bulk.upstream.acquire()
+        threading.Timer(0.1, bulk.upstream.release).start()
+
+        async def scenario():
+            tokens = current_bulkhead.set(bulk), current_deadline.set(time.monotonic() + bulk.deadline)
+            try:
+                return await get_current_user(credentials)
+            finally:
+                current_bulkhead.reset(tokens[0])
+                current_deadline.reset(tokens[1])
+
+        assert asyncio.run(scenario())["email"] == "fondateur@supinter.ci"
+        assert bulk.shed == 0
+
+
+class TestPasswordHasher:
+    """supinter.auth.PasswordHasher"""
+
+    def test_runs_on_its_pool(self):
+        """Test hashing runs on the bcrypt threads, at most `workers` at a time, while the loop keeps running"""
+        hasher = PasswordHasher(workers=2)
+        running, peak, lock = [0], [0], threading.Lock()
+
+        def work():
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+            return threading.current_thread().name
+
+        async def scenario():
+            ticks = 0
+            tasks = asyncio.gather(*[hasher.run(work) for _ in range(4)])
+            while not tasks.done():
+                ticks += 1
+                await asyncio.sleep(0.005)
+            return await tasks, ticks
+
+        names, ticks = asyncio.run(scenario())
+        assert all(name.startswith("bcrypt") for name in names)
+        assert peak[0] == 2 and hasher.pending == 0 and ticks > 5
+
+    def test_unknown_user_pays_a_dummy_check(self, monkeypatch):
+        """Test a login with no stored hash still runs a bcrypt check and fails"""
+        calls = []
+        context = get_pwd_context()
+        monkeypatch.setattr(context, "dummy_verify", lambda: calls.append(threading.current_thread().name))
+        assert asyncio.run(PasswordHasher(workers=1).verify_and_update("secret", None)) == (False, None)
+        assert len(calls) == 1 and calls[0].startswith("bcrypt")
+
+    def test_login_upgrades_a_weak_hash(self, school):
+        """Test a hash made with fewer rounds than BCRYPT_ROUNDS is replaced on the next good login, once"""
+        api, _, dataset = school
+        weak = get_pwd_context().hash("secret", rounds=4)
+        email = f"{uuid.uuid4().hex}@supinter.ci"
+        user = db.supabase.table('users').insert({"id": str(uuid.uuid4()), "email": email, "password": weak, "name": "Caissier",
+                                                  "role": "accountant", "campus_id": dataset.campus_ids[0]}).execute().data[0]
+
+        def stored():
+            return db.supabase.table('users').select('password').eq('id', user["id"]).no_cache().execute().data[0]["password"]
+
+        assert api.post("/api/auth/login", json={"email": email, "password": "wrong"}).status_code == 401
+        assert stored() == weak
+        assert api.post("/api/auth/login", json={"email": email, "password": "secret"}).status_code == 200
+        upgraded = stored()
+        assert upgraded.startswith(f"$2b${BCRYPT_ROUNDS:02d}$") and get_pwd_context().verify("secret", upgraded)
+        assert api.post("/api/auth/login", json={"email": email, "password": "secret"}).status_code == 200
+        assert stored() == upgraded
+        assert api.post("/api/auth/login", json={"email": f"x{email}", "password": "secret"}).status_code == 401
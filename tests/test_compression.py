@@ -0,0 +1,119 @@
+"""
+Negotiated compression and the fast list encoding
+"""
+import gzip
+import zlib
+
+import brotli
+import orjson
+import pytest
+from fastapi import Response
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from compression import CompressionMiddleware, accepted_encodings, negotiate
+from supinter import db
+from supinter.models import DeltaResponse, StudentResponse, TransactionResponse
+from supinter.responses import fast_response
+
+BIG = "supinter " * 500
+
+
+def chunks():
+    for i in range(5):
+        yield f"ligne {i} {BIG}\n".encode()
+
+
+async def big(request):
+    return PlainTextResponse(BIG)
+
+
+async def small(request):
+    return PlainTextResponse("ok")
+
+
+async def stream(request):
+    return StreamingResponse(chunks(), media_type="text/csv")
+
+
+async def encoded(request):
+    return Response(gzip.compress(BIG.encode()), headers={"Content-Encoding": "gzip"})
+
+
+@pytest.fixture(scope="module")
+def client():
+    app = Starlette(routes=[Route(path, endpoint) for path, endpoint in
+                            [("/big", big), ("/small", small), ("/stream", stream), ("/encoded", encoded)]])
+    return TestClient(CompressionMiddleware(app, minimum_size=500))
+
+
+def raw(client, path: str, accept_encoding: str):
+    """(headers, body as sent on the wire)"""
+    with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+        return response.headers, b"".join(response.iter_raw())
+
+
+class TestNegotiation:
+    """Accept-Encoding parsing"""
+
+    def test_q_values(self):
+        """Test q-values pick the encoding and q=0 refuses one"""
+        assert accepted_encodings("gzip, br;q=0.5, *;q=0") == {"gzip": 1.0, "br": 0.5, "*": 0.0}
+        assert negotiate("gzip, deflate, br") == "br"
+        assert negotiate("br;q=0, gzip") == "gzip"
+        assert negotiate("br;q=0.2, gzip;q=0.8") == "gzip"
+        assert negotiate("*") == "br"
+        assert negotiate("identity") is None
+        assert negotiate("gzip;q=0, br;q=0") is None
+        assert negotiate("") is None
+
+
+class TestCompressionMiddleware:
+    """CompressionMiddleware on a small app"""
+
+    def test_brotli_and_gzip(self, client):
+        """Test a large body comes back in the negotiated encoding, with its length and Vary"""
+        headers, body = raw(client, "/big", "gzip, br")
+        assert headers["content-encoding"] == "br" and headers["vary"] == "Accept-Encoding"
+        assert brotli.decompress(body) == BIG.encode() and int(headers["content-length"]) == len(body)
+        headers, body = raw(client, "/big", "br;q=0, gzip")
+        assert headers["content-encoding"] == "gzip" and gzip.decompress(body) == BIG.encode()
+        headers, body = raw(client, "/big", "identity")
+        assert "content-encoding" not in headers and body == BIG.encode()
+
+    def test_minimum_size_and_encoded_bodies(self, client):
+        """Test small bodies and bodies the app already encoded are left alone"""
+        headers, body = raw(client, "/small", "br, gzip")
+        assert "content-encoding" not in headers and body == b"ok"
+        headers, body = raw(client, "/encoded", "br")
+        assert headers["content-encoding"] == "gzip" and gzip.decompress(body) == BIG.encode()
+
+    def test_streaming_bodies(self, client):
+        """Test a streamed body is compressed chunk by chunk, each chunk decodable as it arrives"""
+        expected = b"".join(chunks())
+        with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+            assert response.headers["content-encoding"] == "gzip" and "content-length" not in response.headers
+            decoder, received = zlib.decompressobj(16 + zlib.MAX_WBITS), b""
+            for chunk in response.iter_raw():
+                received += decoder.decompress(chunk)
+        assert received == expected
+        headers, body = raw(client, "/stream", "br")
+        assert headers["content-encoding"] == "br" and brotli.decompress(body) == expected
+
+
+class TestFastResponses:
+    """fast_response against the validated response models"""
+
+    def test_same_output_as_pydantic(self, school):
+        """Test the orjson fast path encodes rows as the response model would"""
+        students = db.supabase.table('students').select('*').limit(20).no_cache().execute().data
+        rows = [{**s, "class_name": "Classe"} for s in students]
+        fast = orjson.loads(fast_response(StudentResponse, rows, Response()).body)
+        assert fast == [StudentResponse(**r).model_dump(mode="json") for r in rows]
+        transactions = db.supabase.table('transactions').select('*').limit(20).no_cache().execute().data
+        delta = DeltaResponse.model_construct(items=transactions, deleted=["x"], watermark="2026-01-01T00:00:00")
+        fast = orjson.loads(fast_response(TransactionResponse, delta, Response()).body)
+        assert fast == {"items": [TransactionResponse(**t).model_dump(mode="json") for t in transactions],
+                        "deleted": ["x"], "watermark": "2026-01-01T00:00:00"}
@@ -0,0 +1,46 @@
+"""
+Synthetic dataset generator: consistency and reproducibility
+"""
+from benchmarks.dataset import DATASET_YEAR, PRESETS, generate
+from supinter.db import SupabaseClient
+from supinter.storage import SQLiteBackend
+
+
+def build(seed: int, **options):
+    client = SupabaseClient("sqlite://", "test", SQLiteBackend())
+    return client, generate(client, PRESETS["tiny"], seed=seed, photos="inline", batch_size=7, log=lambda _: None, **options)
+
+
+class TestGenerate:
+    """Referential consistency on the SQLite backend"""
+
+    def test_tuition_paid_matches_payments(self):
+        """Test every student's tuition_paid is the sum of their tuition payments"""
+        client, dataset = build(1)
+        students = client.table('students').select('id, tuition_paid, photo').no_cache().execute().data
+        payments = client.table('transactions').select('student_id, amount').eq('category', 'Scolarité').no_cache().execute().data
+        paid = {}
+        for p in payments:
+            paid[p["student_id"]] = paid.get(p["student_id"], 0) + p["amount"]
+        assert len(students) == dataset.counts["students"] == PRESETS["tiny"].students
+        assert all(s["tuition_paid"] == paid.get(s["id"], 0) for s in students)
+        assert any(s["photo"] and s["photo"].startswith("data:image/jpeg;base64,") for s in students)
+
+    def test_same_seed_same_data(self):
+        """Test a seed reproduces ids and values, another seed does not"""
+        _, first = build(7)
+        client, second = build(7)
+        assert first.student_ids == second.student_ids and first.counts == second.counts
+        assert build(8)[1].student_ids != first.student_ids
+        grades = client.table('grades').select('value').no_cache().execute().data
+        assert all(0 <= g["value"] <= 20 for g in grades)
+
+    def test_year_is_fixed_unless_asked(self):
+        """Test the school's year does not follow today's date, and year= moves it"""
+        client, dataset = build(7)
+        year = client.table('academic_years').select('name').eq('id', dataset.active_year_id).no_cache().execute().data[0]
+        assert year["name"] == f"{DATASET_YEAR - 1}-{DATASET_YEAR}"
+        client, dataset = build(7, year=2031)
+        year = client.table('academic_years').select('name').eq('id', dataset.active_year_id).no_cache().execute().data[0]
+        matricules = client.table('students').select('matricule').no_cache().execute().data
+        assert year["name"] == "2030-2031" and all(m["matricule"].startswith("ESI2031") for m in matricules)
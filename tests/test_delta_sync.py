@@ -0,0 +1,49 @@
+"""
+Delta sync of the list routes (?updated_since=)
+"""
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+from supinter import db
+from tests.conftest import login
+
+
+def payment(campus_id: str, academic_year_id: str) -> dict:
+    return db.supabase.table('transactions').insert({
+        "id": str(uuid.uuid4()), "date": date.today().isoformat(), "type": "INCOME", "category": "Scolarité",
+        "amount": 1000, "campus_id": campus_id, "academic_year_id": academic_year_id,
+    }).execute().data[0]
+
+
+class TestDeltaSync:
+    """updated_since watermarks and tombstones"""
+
+    def test_deletions_stay_within_the_campus(self, school):
+        """Test a director's delta lists the deletions of their campus only, the founder's both"""
+        api, headers, dataset = school
+        first = dataset.campus_ids[0]
+        second = db.supabase.table('campuses').insert({"id": str(uuid.uuid4()), "name": "Campus Nord"}).execute().data[0]["id"]
+        mine, other = payment(first, dataset.active_year_id), payment(second, dataset.active_year_id)
+        director = next(u for u in dataset.users if u["role"] == "director" and u["campus_id"] == first)
+        director_headers = login(api, director["email"], dataset.password)
+        watermark = api.get("/api/transactions", headers=director_headers).headers["X-Sync-Watermark"]
+        for transaction in (mine, other):
+            db.supabase.table('transactions').delete().eq('id', transaction["id"]).execute()
+        delta = api.get("/api/transactions", params={"updated_since": watermark}, headers=director_headers).json()
+        assert delta["deleted"] == [mine["id"]]
+        everything = api.get("/api/transactions", params={"updated_since": watermark}, headers=headers).json()
+        assert set(everything["deleted"]) == {mine["id"], other["id"]}
+        tombstone = db.supabase.table('tombstones').select('*').eq('row_id', mine["id"]).no_cache().execute().data[0]
+        assert (tombstone["campus_id"], tombstone["academic_year_id"]) == (first, dataset.active_year_id)
+
+    def test_watermark_past_the_retention_window(self, school):
+        """Test a watermark older than the tombstones' retention gets a 410, and a fresh one never ages out"""
+        api, headers, _ = school
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        expired = (now - timedelta(days=91)).isoformat()
+        response = api.get("/api/campuses", params={"updated_since": expired}, headers=headers)
+        assert response.status_code == 410
+        watermark = api.get("/api/campuses", headers=headers).headers["X-Sync-Watermark"]
+        assert datetime.fromisoformat(watermark) >= now - timedelta(days=2)
+        assert api.get("/api/campuses", params={"updated_since": watermark}, headers=headers).status_code == 200
+        assert api.get("/api/campuses", params={"updated_since": "hier"}, headers=headers).status_code == 400
@@ -0,0 +1,59 @@
+"""
+Batch diplomas and certificates
+"""
+import io
+import zipfile
+
+from supinter import db
+from tests.conftest import wait_for
+
+
+def archived(document_type: str) -> int:
+    return len(db.supabase.table('archives').select('id').eq('document_type', document_type).no_cache().execute().data)
+
+
+def class_with_students() -> tuple:
+    students = db.supabase.table('students').select('id, class_id').no_cache().execute().data
+    class_id = next(s["class_id"] for s in students if s["class_id"])
+    return class_id, [s["id"] for s in students if s["class_id"] == class_id]
+
+
+class TestDocuments:
+    """POST /api/documents/{document_type}"""
+
+    def test_class_diplomas_in_one_pdf(self, school):
+        """Test a class gives one merged PDF, one page and one archive row per student"""
+        api, headers, _ = school
+        class_id, students = class_with_students()
+        before = archived("diploma")
+        response = api.post("/api/documents/diploma", json={"class_id": class_id}, headers=headers)
+        assert response.status_code == 202
+        job = wait_for(api, headers, response.json()["id"])
+        assert job["status"] == "done", job["error"]
+        assert job["result"] == {"documents": len(students), "archived": len(students)}
+        pdf = api.get(f"/api/jobs/{job['id']}/result", headers=headers)
+        assert pdf.headers["content-type"] == "application/pdf"
+        assert pdf.content.count(b"/Type /Page\n") == len(students)
+        assert pdf.content.count(b"/Subtype /Form") == 1
+        assert archived("diploma") == before + len(students)
+
+    def test_selected_students_in_a_zip(self, school):
+        """Test a list of students gives a ZIP of one PDF each"""
+        api, headers, _ = school
+        _, students = class_with_students()
+        chosen = students[:3]
+        response = api.post("/api/documents/certificate_scolarite", json={"student_ids": chosen, "output": "zip"}, headers=headers)
+        job = wait_for(api, headers, response.json()["id"])
+        assert job["status"] == "done", job["error"]
+        with zipfile.ZipFile(io.BytesIO(api.get(f"/api/jobs/{job['id']}/result", headers=headers).content)) as archive:
+            names = archive.namelist()
+            assert len(names) == len(chosen)
+            assert all(archive.read(name).startswith(b"%PDF") for name in names)
+
+    def test_bad_requests(self, school):
+        """Test an unknown type, an empty selection or an unknown format is refused before any job"""
+        api, headers, _ = school
+        class_id, _ = class_with_students()
+        assert api.post("/api/documents/passport", json={"class_id": class_id}, headers=headers).status_code == 404
+        assert api.post("/api/documents/diploma", json={}, headers=headers).status_code == 400
+        assert api.post("/api/documents/diploma", json={"class_id": class_id, "output": "docx"}, headers=headers).status_code == 400
@@ -0,0 +1,42 @@
+"""
+Endpoint benchmark: baseline comparison and a tiny end-to-end run
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.endpoints import compare
+
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+
+
+def result(calls: int, p95: float = 10.0, peak: int = 300) -> dict:
+    return {"p50_ms": p95 / 2, "p95_ms": p95, "p99_ms": p95, "rps": 1.0, "upstream_calls": calls, "peak_kb": peak}
+
+
+class TestBaseline:
+    """Regression rules"""
+
+    def test_any_extra_upstream_call_fails(self):
+        """Test one more upstream call is a regression, a slower p95 within tolerance is not"""
+        baseline = {"GET /grades": result(22)}
+        assert compare({"GET /grades": result(22, p95=14.0)}, baseline, 0.5) == []
+        failures = compare({"GET /grades": result(23)}, baseline, 0.5)
+        assert len(failures) == 1 and "23 appels upstream" in failures[0]
+        assert compare({"GET /grades": result(22, p95=40.0, peak=2000)}, baseline, 0.5)[0].startswith("GET /grades: p95_ms")
+
+    def test_run_against_stored_baseline(self, tmp_path):
+        """Test a run records a baseline, then fails once a budget is lowered under the real count"""
+        baseline = tmp_path / "baseline.json"
+        command = [sys.executable, "-m", "benchmarks.endpoints", "--preset", "tiny", "--latency-ms", "0",
+                   "--requests", "2", "--routes", "GET /grades", "--baseline", str(baseline)]
+        run = lambda *extra: subprocess.run(command + list(extra), cwd=BACKEND_DIR, capture_output=True, text=True)
+        assert run("--update-baseline").returncode == 0
+        assert run().returncode == 0
+        stored = json.loads(baseline.read_text())
+        stored["routes"]["GET /grades"]["upstream_calls"] -= 1
+        baseline.write_text(json.dumps(stored))
+        failed = run()
+        assert failed.returncode == 1, failed.stdout + failed.stderr
+        assert "régression" in failed.stdout
@@ -0,0 +1,47 @@
+"""
+Streaming CSV / XLSX exports
+"""
+import csv
+import io
+import zipfile
+from xml.etree import ElementTree
+
+from supinter import db
+from supinter.routes import exports
+
+
+class TestExports:
+    """GET /api/exports/{dataset}.{csv,xlsx}"""
+
+    def test_csv_pages_through_every_row(self, school, monkeypatch):
+        """Test all rows come out, across pages, with names instead of ids"""
+        api, headers, dataset = school
+        monkeypatch.setattr(exports, "EXPORT_PAGE_SIZE", 7)
+        response = api.get("/api/exports/transactions.csv", headers=headers)
+        assert response.status_code == 200
+        assert response.headers["content-disposition"] == 'attachment; filename="transactions.csv"'
+        rows = list(csv.reader(io.StringIO(response.content.decode("utf-8-sig")), delimiter=";"))
+        assert rows[0] == exports.TRANSACTION_COLUMNS
+        assert len(rows) - 1 == dataset.counts["transactions"]
+        assert len({tuple(r) for r in rows[1:]}) == len(rows) - 1
+        campuses = {c["name"] for c in db.supabase.table('campuses').select('name').no_cache().execute().data}
+        assert {r[7] for r in rows[1:]} <= campuses
+        assert [r[0] for r in rows[1:]] == sorted(r[0] for r in rows[1:])
+
+    def test_xlsx_is_a_readable_workbook(self, school):
+        """Test the streamed zip holds a worksheet with one row per student plus the header"""
+        api, headers, dataset = school
+        response = api.get("/api/exports/students.xlsx", params={"academic_year_id": dataset.active_year_id}, headers=headers)
+        assert response.status_code == 200
+        with zipfile.ZipFile(io.BytesIO(response.content)) as workbook:
+            assert workbook.testzip() is None
+            sheet = workbook.read("xl/worksheets/sheet1.xml").decode()
+        ElementTree.fromstring(sheet)
+        assert sheet.count("<row ") == 1 + len(db.supabase.table('students').select('id').eq('academic_year_id', dataset.active_year_id).no_cache().execute().data)
+        assert "Date de naissance" in sheet
+
+    def test_unknown_export(self, school):
+        """Test an unknown dataset or format is a 404"""
+        api, headers, _ = school
+        assert api.get("/api/exports/users.csv", headers=headers).status_code == 404
+        assert api.get("/api/exports/students.pdf", headers=headers).status_code == 404
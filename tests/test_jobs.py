@@ -0,0 +1,113 @@
+"""
+Background job runner
+"""
+import os
+import threading
+import time
+
+import pytest
+
+from admission import Bulkhead, current_bulkhead
+from supinter import jobs as job_module
+from supinter.jobs import JobRejected, JobRunner, JobStore
+from tests.conftest import wait_for
+
+USER = {"id": "u1"}
+
+
+def wait(runner: JobRunner, job_id: str) -> dict:
+    for _ in range(200):
+        state = runner.state(job_id)
+        if state["status"] not in ("queued", "running"):
+            return state
+        time.sleep(0.01)
+    raise AssertionError("job still running")
+
+
+def blocked(job, gate: threading.Event):
+    while not gate.is_set():
+        job.advance(0)
+        time.sleep(0.01)
+    return {"ok": True}
+
+
+@pytest.fixture
+def runner(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_module, "JOB_SAVE_INTERVAL", 0)
+    return JobRunner(tmp_path, workers=1, queue_size=4, user_limit=2)
+
+
+class TestJobRunner:
+    """supinter.jobs"""
+
+    def test_result_and_artifact(self, runner):
+        """Test a job's result and file are kept, and its state readable from the files alone"""
+        def run(job):
+            with job.artifact("x.csv", "text/csv") as out:
+                out.write(b"a;b\n")
+            job.advance(3, total=3)
+            return {"rows": 3}
+        state = wait(runner, runner.submit("export", USER, run).id)
+        assert (state["status"], state["result"], state["done"], state["filename"]) == ("done", {"rows": 3}, 3, "x.csv")
+        assert runner.store.path(state["id"], "result").read_bytes() == b"a;b\n"
+        assert JobStore(runner.store.root).load(state["id"])["status"] == "done"
+
+    def test_jobs_run_under_the_runner_bulkhead(self, tmp_path):
+        """Test a job's upstream calls are capped by the runner's bulkhead, not left unlimited"""
+        bulk = Bulkhead("bulk", limit=1, max_queue=1, queue_timeout=1.0, deadline=1.0, upstream_limit=1)
+        runner = JobRunner(tmp_path, workers=1, bulkhead=bulk)
+        state = wait(runner, runner.submit("x", USER, lambda job: {"bulkhead": current_bulkhead.get().name}).id)
+        assert state["result"] == {"bulkhead": "bulk"}
+        assert current_bulkhead.get() is None
+
+    def test_cancel_and_user_limit(self, runner):
+        """Test a running job stops at its next advance, a queued one never starts, and a third is refused"""
+        gate = threading.Event()
+        running = runner.submit("a", USER, lambda job: blocked(job, gate))
+        queued = runner.submit("b", USER, lambda job: blocked(job, gate))
+        with pytest.raises(JobRejected) as rejected:
+            runner.submit("c", USER, lambda job: None)
+        assert rejected.value.status_code == 429
+        runner.cancel(queued.id)
+        runner.cancel(running.id)
+        assert wait(runner, running.id)["status"] == "cancelled"
+        assert wait(runner, queued.id)["status"] == "cancelled"
+        gate.set()
+
+    def test_drain_waits_for_running_jobs(self, runner):
+        """Test a stopping worker refuses new jobs and returns once its jobs are done"""
+        gate = threading.Event()
+        job = runner.submit("a", USER, lambda job: blocked(job, gate))
+        assert runner.drain(timeout=0.05) == 1
+        with pytest.raises(JobRejected) as rejected:
+            runner.submit("b", USER, lambda job: None)
+        assert rejected.value.status_code == 503
+        gate.set()
+        assert runner.drain(timeout=2) == 0
+        assert runner.state(job.id)["status"] == "done"
+
+    def test_dead_worker_jobs_are_failed(self, runner):
+        """Test a job left running by a previous process is reported as interrupted"""
+        job = runner.submit("a", USER, lambda job: None)
+        wait(runner, job.id)
+        runner.store.save({**runner.store.load(job.id), "status": "running", "finished_at": None, "pid": os.getpid()})
+        state = runner.state(job.id)
+        assert state["status"] == "failed" and "interrompue" in state["error"]
+
+
+class TestExportJob:
+    """POST /api/exports/... and GET /api/jobs/{id}/result"""
+
+    def test_export_as_job(self, school, tmp_path, monkeypatch):
+        """Test an export job's file is the same as the streamed export"""
+        api, headers, dataset = school
+        monkeypatch.setattr(job_module.jobs, "store", JobStore(tmp_path))
+        response = api.post("/api/exports/grades.csv", headers=headers)
+        assert response.status_code == 202
+        job = wait_for(api, headers, response.json()["id"])
+        assert job["done"] == dataset.counts["grades"]
+        result = api.get(f"/api/jobs/{job['id']}/result", headers=headers)
+        assert result.headers["content-disposition"] == 'attachment; filename="grades.csv"'
+        assert result.content == api.get("/api/exports/grades.csv", headers=headers).content
+        assert job["id"] in [j["id"] for j in api.get("/api/jobs", headers=headers).json()]
+        assert api.delete(f"/api/jobs/{job['id']}", headers=headers).status_code == 409
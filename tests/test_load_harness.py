@@ -0,0 +1,23 @@
+"""
+Load test harness: the data checks run after a load
+"""
+from benchmarks.dataset import PRESETS, generate
+from benchmarks.load import check_consistency
+from supinter.db import SupabaseClient
+from supinter.storage import SQLiteBackend
+
+
+class TestConsistencyChecks:
+    """Invariants checked once the virtual users are done"""
+
+    def test_lost_tuition_update_is_reported(self):
+        """Test a generated dataset passes, and a payment missing from tuition_paid is caught"""
+        client = SupabaseClient("sqlite://", "test", SQLiteBackend())
+        generate(client, PRESETS["tiny"], photos="none", log=lambda _: None)
+        assert check_consistency(client) == []
+        payment = client.table('transactions').select('student_id, amount').eq('category', 'Scolarité').limit(1).no_cache().execute().data[0]
+        student = client.table('students').select('tuition_paid').eq('id', payment["student_id"]).no_cache().execute().data[0]
+        # What a concurrent read-modify-write leaves behind
+        client.table('students').update({"tuition_paid": student["tuition_paid"] - payment["amount"]}).eq('id', payment["student_id"]).execute()
+        problems = check_consistency(client)
+        assert len(problems) == 1 and problems[0].startswith("tuition_paid faux pour 1 étudiant(s)")
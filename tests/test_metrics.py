@@ -0,0 +1,27 @@
+"""
+Prometheus-format metrics tests
+"""
+from metrics import Metrics, render
+from upstream_trace import UpstreamCall
+
+
+class TestMetrics:
+    """Histogram bookkeeping and text exposition"""
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test an observation counts in its bucket and every larger one"""
+        metrics = Metrics(buckets=(0.1, 1.0))
+        metrics.observe_request("GET", "/api/students", 200, 0.5)
+        metrics.observe_request("GET", "/api/students", 200, 0.05)
+        text = render([({}, metrics.snapshot())])
+        assert 'supinter_http_request_duration_seconds_bucket{method="GET",route="/api/students",status="200",le="0.1"} 1' in text
+        assert 'supinter_http_request_duration_seconds_bucket{method="GET",route="/api/students",status="200",le="1.0"} 2' in text
+        assert 'supinter_http_request_duration_seconds_count{method="GET",route="/api/students",status="200"} 2' in text
+
+    def test_workers_are_labelled_and_families_declared_once(self):
+        """Test snapshots from several workers render as one family per metric"""
+        metrics = Metrics()
+        metrics.observe_upstream(UpstreamCall("students", "GET", "GET students?", 12.0, 503, 0))
+        text = render([({"worker": "1"}, metrics.snapshot()), ({"worker": "2"}, metrics.snapshot())])
+        assert text.count("# TYPE supinter_upstream_errors_total counter") == 1
+        assert 'supinter_upstream_errors_total{worker="2",table="students"} 1' in text
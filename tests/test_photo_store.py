@@ -0,0 +1,56 @@
+"""
+Content-addressed photo store tests (offline, filesystem backend)
+"""
+import base64
+import hashlib
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from photo_store import FilesystemBlobBackend, PhotoStore, PHOTO_VARIANTS
+
+
+def make_data_url(color="red", size=(800, 600)):
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PhotoStore(FilesystemBlobBackend(tmp_path), workers=1)
+
+
+class TestPhotoStore:
+    """Photo store ingestion and variants"""
+
+    def test_ingest_returns_content_hash(self, store):
+        """Test a data URL is replaced by the SHA-256 of its bytes"""
+        data_url = make_data_url()
+        raw = base64.b64decode(data_url.split(",", 1)[1])
+        photo_hash = store.ingest(data_url, wait=True)
+        assert photo_hash == hashlib.sha256(raw).hexdigest()
+        assert store.get(photo_hash) == raw
+
+    def test_ingest_deduplicates(self, store, tmp_path):
+        """Test the same photo uploaded twice is stored once"""
+        data_url = make_data_url("blue")
+        assert store.ingest(data_url, wait=True) == store.ingest(data_url, wait=True)
+        originals = [p for p in tmp_path.rglob("*") if p.is_file() and "." not in p.name]
+        assert len(originals) == 1
+
+    def test_variants_are_generated(self, store):
+        """Test thumbnail and card variants fit their bounding box"""
+        photo_hash = store.ingest(make_data_url(), wait=True)
+        for variant, (width, height) in PHOTO_VARIANTS.items():
+            assert store.has(photo_hash, variant)
+            image = Image.open(BytesIO(store.get(photo_hash, variant)))
+            assert image.width <= width and image.height <= height
+
+    def test_non_data_urls_pass_through(self, store):
+        """Test hashes, external URLs and empty values are left untouched"""
+        assert store.ingest(None) is None
+        assert store.ingest("") == ""
+        assert store.ingest("https://example.com/photo.jpg") == "https://example.com/photo.jpg"
+        assert store.ingest("a" * 64) == "a" * 64
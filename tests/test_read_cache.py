@@ -0,0 +1,73 @@
+"""
+Stale-while-revalidate read cache tests
+"""
+import time
+
+import pytest
+
+from read_cache import ReadCache, UpstreamError, request_staleness
+
+
+class Upstream:
+    def __init__(self):
+        self.calls = 0
+        self.down = False
+
+    def fetch(self):
+        self.calls += 1
+        if self.down:
+            raise UpstreamError("down")
+        return f"v{self.calls}"
+
+
+@pytest.fixture
+def cache():
+    return ReadCache(soft_ttl=0.05, hard_ttl=0.2, max_stale=5, max_entries=10, refresh_workers=1)
+
+
+class TestReadCache:
+    """Soft/hard TTL behaviour and degradation mode"""
+
+    def test_fresh_entry_is_served_from_cache(self, cache):
+        """Test a second read within the soft TTL does not hit upstream"""
+        upstream = Upstream()
+        assert cache.get("k", 0, upstream.fetch) == "v1"
+        assert cache.get("k", 0, upstream.fetch) == "v1"
+        assert upstream.calls == 1
+
+    def test_write_version_invalidates_entry(self, cache):
+        """Test an entry fetched before a write is not served after it"""
+        upstream = Upstream()
+        cache.get("k", 0, upstream.fetch)
+        assert cache.get("k", 1, upstream.fetch) == "v2"
+
+    def test_stale_entry_is_served_while_refreshing(self, cache):
+        """Test soft-expired entries are served and refreshed in the background"""
+        upstream = Upstream()
+        cache.get("k", 0, upstream.fetch)
+        time.sleep(0.08)
+        assert cache.get("k", 0, upstream.fetch) == "v1"
+        cache.executor.shutdown(wait=True)
+        assert cache.get("k", 0, upstream.fetch) == "v2"
+
+    def test_last_known_good_is_served_when_upstream_fails(self, cache):
+        """Test hard-expired entries stand in for a failed upstream and flag the request"""
+        upstream = Upstream()
+        cache.get("k", 0, upstream.fetch)
+        time.sleep(0.25)
+        upstream.down = True
+        staleness = {}
+        token = request_staleness.set(staleness)
+        try:
+            assert cache.get("k", 0, upstream.fetch) == "v1"
+        finally:
+            request_staleness.reset(token)
+        assert staleness["revalidation_failed"] is True
+        assert cache.snapshot()["served_on_error"] == 1
+
+    def test_error_without_cached_value_raises(self, cache):
+        """Test an upstream failure with nothing cached is not turned into an empty result"""
+        upstream = Upstream()
+        upstream.down = True
+        with pytest.raises(UpstreamError):
+            cache.get("k", 0, upstream.fetch)
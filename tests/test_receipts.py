@@ -0,0 +1,37 @@
+"""
+Payment receipts (PDF)
+"""
+from supinter import db, printing
+from supinter.observability import route_class
+
+
+class TestReceipts:
+    """GET /api/transactions/{id}/receipt.pdf and /api/transactions/receipts.pdf"""
+
+    def test_receipt_of_a_payment(self, school):
+        """Test a payment gets a one-page PDF and an expense gets none"""
+        api, headers, _ = school
+        payment = db.supabase.table('transactions').select('*').eq('type', 'INCOME').limit(1).no_cache().execute().data[0]
+        response = api.get(f"/api/transactions/{payment['id']}/receipt.pdf", headers=headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/pdf"
+        assert response.content.startswith(b"%PDF") and response.content.count(b"/Type /Page\n") == 1
+        expense = db.supabase.table('transactions').select('id').eq('type', 'EXPENSE').limit(1).no_cache().execute().data
+        if expense:
+            assert api.get(f"/api/transactions/{expense[0]['id']}/receipt.pdf", headers=headers).status_code == 400
+
+    def test_day_batch_shares_the_letterhead(self, school):
+        """Test a day's payments come out as one page each, with one letterhead form per campus"""
+        api, headers, _ = school
+        payment = db.supabase.table('transactions').select('*').eq('type', 'INCOME').limit(1).no_cache().execute().data[0]
+        day = db.supabase.table('transactions').select('campus_id').eq('type', 'INCOME').eq('date', payment["date"]).no_cache().execute().data
+        printing.receipt_letterhead.cache_clear()
+        response = api.get("/api/transactions/receipts.pdf", params={"date": payment["date"]}, headers=headers)
+        assert response.status_code == 200
+        assert response.content.count(b"/Type /Page\n") == len(day)
+        campuses = len({t["campus_id"] for t in day})
+        assert response.content.count(b"/Subtype /Form") == campuses
+        assert printing.receipt_letterhead.cache_info().currsize == campuses
+        assert api.get("/api/transactions/receipts.pdf", params={"date": "1990-01-01"}, headers=headers).status_code == 404
+        assert route_class("GET", "/api/transactions/receipts.pdf") == "bulk"
+        assert route_class("GET", f"/api/transactions/{day[0]['campus_id']}/receipt.pdf") == "interactive"
@@ -0,0 +1,55 @@
+"""
+Server-Timing and per-request profiling tests
+"""
+import time
+
+from fastapi import FastAPI, APIRouter
+from fastapi.testclient import TestClient
+
+from request_timing import ServerTimingMiddleware, TimedRoute, phase
+
+
+def timed_client(authorize=lambda headers: True):
+    profiles = {}
+    router = APIRouter(route_class=TimedRoute)
+
+    @router.get("/slow")
+    async def slow():
+        with phase("auth"):
+            time.sleep(0.02)
+        time.sleep(0.03)
+        return {}
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(ServerTimingMiddleware, authorize_profiling=authorize,
+                       store_profile=lambda profile_id, folded, path: profiles.update({profile_id: folded}))
+    return TestClient(app), profiles
+
+
+def durations(header):
+    return {entry.split(";")[0]: float(entry.split("dur=")[1].split(";")[0]) for entry in header.split(", ")}
+
+
+class TestRequestTiming:
+    """Phase breakdown and on-demand profiling"""
+
+    def test_phases_are_exclusive(self):
+        """Test time spent in a nested phase is not counted twice"""
+        client, _ = timed_client()
+        timing = durations(client.get("/slow").headers["server-timing"])
+        assert 20 <= timing["auth"] < 30
+        assert 30 <= timing["compute"] < 45
+        assert timing["total"] >= timing["auth"] + timing["compute"]
+
+    def test_profile_is_stored_for_authorised_requests(self):
+        """Test X-Profile stores folded stacks under the returned id"""
+        client, profiles = timed_client()
+        response = client.get("/slow", headers={"X-Profile": "1"})
+        assert "slow (" in profiles[response.headers["x-profile-id"]]
+
+    def test_profile_refused(self):
+        """Test X-Profile is ignored when the caller may not profile"""
+        client, profiles = timed_client(authorize=lambda headers: False)
+        assert "x-profile-id" not in client.get("/slow", headers={"X-Profile": "1"}).headers
+        assert not profiles
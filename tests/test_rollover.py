@@ -0,0 +1,48 @@
+"""
+Whole-class promotion and year rollover
+"""
+from supinter import db
+from supinter.rollover import clone_classes, student_averages
+from tests.conftest import wait_for
+
+
+class TestRollover:
+    """POST /api/classes/{id}/promote and the class copy of a new year"""
+
+    def test_clone_classes_once(self, school):
+        """Test a year's classes are copied into a new year, and not twice"""
+        _, _, dataset = school
+        year = db.supabase.table('academic_years').insert({"name": "2099-2100", "is_active": False}).execute().data[0]
+        first = clone_classes(dataset.active_year_id, year["id"])
+        assert first["created"] == first["classes"] > 0
+        assert clone_classes(dataset.active_year_id, year["id"])["created"] == 0
+        copies = db.supabase.table('classes').select('id').eq('academic_year_id', year["id"]).no_cache().execute().data
+        assert len(copies) == first["classes"]
+
+    def test_promote_moves_passing_students(self, school):
+        """Test only students at or above the average move, with the target's year, level and class"""
+        api, headers, dataset = school
+        source = db.supabase.table('classes').select('*').eq('academic_year_id', dataset.active_year_id).limit(1).no_cache().execute().data[0]
+        year = db.supabase.table('academic_years').insert({"name": "2100-2101", "is_active": False}).execute().data[0]
+        clone_classes(dataset.active_year_id, year["id"], source["campus_id"])
+        target = db.supabase.table('classes').select('*').eq('academic_year_id', year["id"]).limit(1).no_cache().execute().data[0]
+        students = db.supabase.table('students').select('id').eq('class_id', source["id"]).no_cache().execute().data
+        averages = student_averages([s["id"] for s in students], dataset.active_year_id)
+        threshold = sorted(averages.values())[len(averages) // 2]
+
+        response = api.post(f"/api/classes/{source['id']}/promote", json={"target_class_id": target["id"], "min_average": threshold}, headers=headers)
+        assert response.status_code == 202
+        job = wait_for(api, headers, response.json()["id"])
+        assert job["status"] == "done", job["error"]
+        passing = {i for i, average in averages.items() if average >= threshold}
+        assert job["result"]["promoted"] == len(passing) == job["done"]
+        moved = db.supabase.table('students').select('*').eq('class_id', target["id"]).no_cache().execute().data
+        assert passing <= {s["id"] for s in moved}
+        assert all(s["academic_year_id"] == target["academic_year_id"] and s["level_id"] == target["level_id"] for s in moved)
+
+    def test_promote_within_the_same_year(self, school):
+        """Test a target class of the same year is refused before any job starts"""
+        api, headers, dataset = school
+        a, b = db.supabase.table('classes').select('id').eq('academic_year_id', dataset.active_year_id).limit(2).no_cache().execute().data
+        response = api.post(f"/api/classes/{a['id']}/promote", json={"target_class_id": b["id"]}, headers=headers)
+        assert response.status_code == 400
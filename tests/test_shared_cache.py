@@ -0,0 +1,41 @@
+"""
+Cross-process cache tier tests
+"""
+import multiprocessing
+
+import pytest
+
+from shared_cache import SharedStore, SharedVersions
+
+
+def bump_in_child(path, table):
+    SharedStore(path).bump(table)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SharedStore(tmp_path / "cache.sqlite")
+
+
+class TestSharedCache:
+    """Values and table versions shared between worker processes"""
+
+    def test_value_round_trip_and_expiry(self, store):
+        """Test stored values are returned until their TTL expires"""
+        store.set("k", {"a": [1, 2]}, ttl=60)
+        store.set("gone", 1, ttl=-1)
+        assert store.get("k") == {"a": [1, 2]}
+        assert store.get("gone") is None
+
+    def test_bump_in_another_process_is_seen(self, store):
+        """Test a write in one worker invalidates the versions seen by another"""
+        versions = SharedVersions(store, poll_interval=0)
+        assert versions["students"] == 0
+        child = multiprocessing.get_context("spawn").Process(target=bump_in_child, args=(store.path, "students"))
+        child.start()
+        child.join()
+        assert versions["students"] == 1
+
+    def test_generation_is_stable_across_workers(self, store):
+        """Test every worker on the same file builds ETags with the same generation"""
+        assert SharedVersions(store).generation == SharedVersions(SharedStore(store.path)).generation
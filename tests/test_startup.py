@@ -0,0 +1,78 @@
+"""
+Startup budget: time to first request and memory of a fresh worker
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+
+# Modules that must only be loaded by the routes that need them
+LAZY_MODULES = ["reportlab", "jose", "passlib", "PIL"]
+
+STARTUP_BUDGET_SECONDS = float(os.environ.get("STARTUP_BUDGET_SECONDS", "1.5"))
+STARTUP_RSS_BUDGET_MB = float(os.environ.get("STARTUP_RSS_BUDGET_MB", "100"))
+
+# Imports the app and serves one request through the raw ASGI interface, in a
+# fresh interpreter, then reports timings, peak RSS and the lazy modules loaded
+PROBE = """
+import asyncio, json, resource, sys, time
+started = time.perf_counter()
+import server
+imported = time.perf_counter()
+
+async def first_request():
+    messages = []
+    scope = {"type": "http", "method": "GET", "path": "/api/health", "raw_path": b"/api/health",
+             "query_string": b"", "headers": [], "http_version": "1.1", "scheme": "http",
+             "server": ("test", 80), "client": ("test", 1), "root_path": ""}
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    async def send(message):
+        messages.append(message)
+    await server.app(scope, receive, send)
+    return messages[0]["status"]
+
+def peak_rss_mb():
+    # ru_maxrss also counts the parent's peak when the interpreter was
+    # started with vfork (it is the parent's memory until exec)
+    try:
+        with open("/proc/self/status") as status:
+            return next(int(line.split()[1]) for line in status if line.startswith("VmHWM")) / 1024
+    except (OSError, StopIteration):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+status = asyncio.run(first_request())
+print(json.dumps({
+    "status": status,
+    "import_seconds": imported - started,
+    "first_request_seconds": time.perf_counter() - started,
+    "rss_mb": peak_rss_mb(),
+    "lazy_loaded": [m for m in %r if m in sys.modules],
+}))
+""" % (LAZY_MODULES,)
+
+
+def run_probe() -> dict:
+    env = {**os.environ, "SUPABASE_URL": os.environ.get("SUPABASE_URL", "http://localhost:54321"),
+           "SUPABASE_ANON_KEY": os.environ.get("SUPABASE_ANON_KEY", "startup-test")}
+    output = subprocess.run([sys.executable, "-c", PROBE], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+class TestStartup:
+    """Cold start of a worker"""
+
+    def test_startup_budget(self):
+        """Test a fresh worker serves its first request within the time and memory budget"""
+        result = run_probe()
+        assert result["status"] == 200
+        assert result["first_request_seconds"] < STARTUP_BUDGET_SECONDS, result
+        assert result["rss_mb"] < STARTUP_RSS_BUDGET_MB, result
+
+    def test_heavy_modules_are_lazy(self):
+        """Test document and crypto libraries are not imported at startup"""
+        assert run_probe()["lazy_loaded"] == []
@@ -0,0 +1,98 @@
+"""
+SQLite storage backend tests: PostgREST operators and the API running offline
+"""
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from supinter.db import SupabaseClient
+from supinter.storage import SQLiteBackend, translate_schema, SCHEMA_PATH
+
+
+@pytest.fixture
+def client():
+    return SupabaseClient("sqlite://", "test", SQLiteBackend())
+
+
+def campus(client, name: str) -> dict:
+    return client.table('campuses').insert({"id": str(uuid.uuid4()), "name": name}).execute().data[0]
+
+
+class TestSQLiteBackend:
+    """Operators used by the routes, on the tables of supabase_schema.sql"""
+
+    def test_schema_loads(self):
+        """Test every table of the schema is created"""
+        backend = SQLiteBackend()
+        backend.connection()
+        assert {"students", "transactions", "filiere_formations", "tombstones"} <= set(backend.columns)
+        assert not any("plpgsql" in s for s in translate_schema(SCHEMA_PATH.read_text(encoding="utf-8")))
+
+    def test_filters_order_and_count(self, client):
+        """Test eq, in, ilike, like, order, range and exact count"""
+        a, b, _ = campus(client, "Abidjan"), campus(client, "Bouaké"), campus(client, "abengourou")
+        query = lambda: client.table('campuses').select('*', count='exact').no_cache()
+        assert query().eq('id', a["id"]).execute().data[0]["name"] == "Abidjan"
+        assert {c["name"] for c in query().in_('id', [a["id"], b["id"]]).execute().data} == {"Abidjan", "Bouaké"}
+        assert query().ilike('name', 'ab%').execute().count == 2
+        assert query().like('name', 'Ab*').execute().count == 1
+        page = query().order('name', desc=True).range(0, 1).execute()
+        assert [c["name"] for c in page.data] == ["abengourou", "Bouaké"]
+        assert page.count == 3
+
+    def test_update_delete_and_triggers(self, client):
+        """Test updates bump updated_at, deletes cascade and leave tombstones"""
+        a = campus(client, "Abidjan")
+        year = client.table('academic_years').insert({"id": str(uuid.uuid4()), "name": "2025-2026"}).execute().data[0]
+        assert year["is_active"] is False
+        updated = client.table('campuses').update({"phone": "0102"}).eq('id', a["id"]).execute().data[0]
+        assert updated["phone"] == "0102" and updated["updated_at"] > a["updated_at"]
+        client.table('users').insert({"id": str(uuid.uuid4()), "email": "u@supinter.ci", "password": "x",
+                                      "name": "U", "campus_id": a["id"]}).execute()
+        assert client.table('campuses').delete().eq('id', a["id"]).execute().data[0]["id"] == a["id"]
+        tombstones = client.table('tombstones').select('table_name').no_cache().execute().data
+        assert sorted(t["table_name"] for t in tombstones) == ["campuses", "users"]
+
+    def test_constraint_violations_are_refused(self, client):
+        """Test unique keys, foreign keys and unknown columns fail like PostgREST"""
+        client.table('formations').insert({"id": str(uuid.uuid4()), "name": "BTS", "code": "BTS"}).execute()
+        with pytest.raises(Exception, match="23505"):
+            client.table('formations').insert({"id": str(uuid.uuid4()), "name": "BTS bis", "code": "BTS"}).execute()
+        with pytest.raises(Exception, match="23503"):
+            client.table('users').insert({"email": "x@supinter.ci", "password": "x", "name": "X",
+                                          "campus_id": str(uuid.uuid4())}).execute()
+        with pytest.raises(Exception, match="42703"):
+            client.table('campuses').insert({"nom": "Abidjan"}).execute()
+
+
+class TestOfflineAPI:
+    """The whole API in-process on the SQLite backend"""
+
+    def test_enrol_and_pay(self):
+        """Test creating a campus, a user, a student and a payment through the routes"""
+        from supinter.app import create_app
+
+        api = TestClient(create_app())
+        campus_id = api.post("/api/campuses", json={"name": "Campus Test"}).json()["id"]
+        token = api.post("/api/auth/register", json={
+            "email": f"{uuid.uuid4().hex}@supinter.ci", "password": "secret", "name": "Fondateur",
+            "role": "founder", "campus_id": campus_id,
+        }).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        ids = {"campus_id": campus_id, "academic_year_id": api.post("/api/academic-years", json={"name": "2025-2026"}).json()["id"]}
+        ids["formation_id"] = api.post("/api/formations", json={"name": "BTS", "code": uuid.uuid4().hex[:8]}).json()["id"]
+        ids["filiere_id"] = api.post("/api/filieres", json={"name": "Informatique", "code": uuid.uuid4().hex[:8],
+                                                             "formation_ids": [ids["formation_id"]]}).json()["id"]
+        ids["level_id"] = api.post("/api/levels", json={"name": "1ère Année"}).json()["id"]
+        ids["class_id"] = api.post("/api/classes", headers=headers, json={"name": "BTS 1", "code": "B1", **ids}).json()["id"]
+        student = api.post("/api/students", headers=headers, json={
+            "permanent_id": "P001", "first_name": "Awa", "last_name": "Koné", "birth_date": "2005-03-02",
+            "birth_place": "Abidjan", "gender": "F", "phone": "0700000000", "tuition_amount": 450000, **ids,
+        }).json()
+        payment = api.post("/api/transactions", headers=headers, json={
+            "date": "2025-10-01", "type": "INCOME", "category": "Scolarité", "amount": 150000, "description": "Versement",
+            "student_id": student["id"], "campus_id": campus_id, "academic_year_id": ids["academic_year_id"],
+        })
+        assert payment.status_code == 200
+        assert api.get(f"/api/students/{student['id']}", headers=headers).json()["tuition_paid"] == 150000
@@ -0,0 +1,85 @@
+"""
+Bulk student import from CSV
+"""
+import pytest
+
+from supinter import db
+from supinter.routes.students import next_matricule_number
+from supinter.spreadsheets import split_records
+from tests.conftest import login
+
+
+@pytest.fixture(scope="module")
+def importer(school):
+    """(client, a director's headers for CSV bodies, a class of the active year)"""
+    api, _, dataset = school
+    director = next(u for u in dataset.users if u["role"] == "director")
+    cls = db.supabase.table('classes').select('*').eq('academic_year_id', dataset.active_year_id).limit(1).no_cache().execute().data[0]
+    return api, {**login(api, director["email"], dataset.password), "Content-Type": "text/csv"}, cls
+
+
+def spreadsheet(cls: dict, rows: int) -> bytes:
+    lines = ["Nom;Prénoms;Date de naissance;Lieu de naissance;Sexe;Téléphone;Identifiant permanent;Classe;Scolarité"]
+    lines += [f'Koné{i};"Awa\nMarie";02/03/2005;Abidjan;Féminin;0700000000;P{i};{cls["code"]};450 000' for i in range(rows)]
+    lines.append("Traoré;Ali;31/02/2005;Bouaké;M;0700000000;P9;INCONNUE;")
+    return "\n".join(lines).encode()
+
+
+class TestStudentImport:
+    """POST /api/students/import"""
+
+    def test_import_allocates_a_matricule_block(self, importer):
+        """Test rows are resolved from class codes, numbered consecutively, and bad rows reported"""
+        api, headers, cls = importer
+        dry = api.post("/api/students/import?dry_run=true", content=spreadsheet(cls, 3), headers=headers).json()
+        assert (dry["total"], dry["created"], dry["failed"]) == (4, 0, 1)
+        report = api.post("/api/students/import", content=spreadsheet(cls, 3), headers=headers).json()
+        created = [r for r in report["rows"] if r["status"] == "created"]
+        numbers = [int(r["matricule"][-4:]) for r in created]
+        assert numbers == list(range(numbers[0], numbers[0] + 3))
+        error = next(r for r in report["rows"] if r["status"] == "error")
+        assert error["line"] == 5
+        assert any("INCONNUE" in e for e in error["errors"]) and any("Date de naissance" in e for e in error["errors"])
+        student = db.supabase.table('students').select('*').eq('id', created[0]["id"]).no_cache().execute().data[0]
+        assert (student["first_name"], student["level_id"], student["tuition_amount"]) == ("Awa\nMarie", cls["level_id"], 450000)
+
+    def test_enrolment_after_a_deletion_takes_a_free_matricule(self, importer):
+        """Test POST /students numbers after the highest matricule, not after the count, once one is deleted"""
+        api, headers, cls = importer
+        report = api.post("/api/students/import", content=spreadsheet(cls, 2), headers=headers).json()
+        first, last = [r for r in report["rows"] if r["status"] == "created"]
+        api.delete(f"/api/students/{first['id']}", headers=headers)
+        student = {
+            "permanent_id": "P-NEW", "campus_id": cls["campus_id"], "academic_year_id": cls["academic_year_id"],
+            "formation_id": cls["formation_id"], "filiere_id": cls["filiere_id"], "level_id": cls["level_id"],
+            "class_id": cls["id"], "first_name": "Ali", "last_name": "Traoré", "birth_date": "2005-01-01",
+            "birth_place": "Bouaké", "gender": "M", "phone": "0700000000",
+        }
+        response = api.post("/api/students", json=student, headers={"Authorization": headers["Authorization"]})
+        assert response.status_code == 200
+        assert int(response.json()["matricule"][-4:]) == int(last["matricule"][-4:]) + 1
+
+    def test_next_number_reads_only_the_highest(self, importer, monkeypatch):
+        """Test the next matricule number comes from one row per width, past 9999 too"""
+        students = db.supabase.table('students').select('id').limit(3).no_cache().execute().data
+        for student, matricule in zip(students, ["TST20990012", "TST20990007", "TST209910000"]):
+            db.supabase.table('students').update({"matricule": matricule}).eq('id', student["id"]).execute()
+        rows_read, request = [], db.supabase.backend.request
+
+        def counting(*args, **kwargs):
+            response = request(*args, **kwargs)
+            rows_read.append(len(response.json()))
+            return response
+
+        monkeypatch.setattr(db.supabase.backend, "request", counting)
+        assert next_matricule_number("TST2099") == 10001
+        assert rows_read == [1, 1, 0]
+        monkeypatch.undo()
+        db.supabase.table('students').update({"matricule": "TST2099X"}).eq('id', students[2]["id"]).execute()
+        assert next_matricule_number("TST2099") == 13
+        assert next_matricule_number("TST2100") == 1
+
+    def test_records_are_not_split_inside_quotes(self):
+        """Test a chunk boundary inside a quoted cell keeps the record for the next chunk"""
+        complete, rest = split_records('a;b\n1;"deux\nlignes')
+        assert (complete, rest) == ("a;b\n", '1;"deux\nlignes')
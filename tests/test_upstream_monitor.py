@@ -0,0 +1,43 @@
+"""
+Upstream health monitor tests
+"""
+from read_cache import ReadCache
+from upstream_monitor import UpstreamMonitor
+from upstream_trace import UpstreamCall
+
+
+def failing_probe():
+    raise ConnectionError("refused")
+
+
+class TestUpstreamMonitor:
+    """Rolling latency, readiness assessment and degradation hook"""
+
+    def test_rolling_percentiles(self):
+        """Test p50 / p99 and error rate over the recorded calls"""
+        monitor = UpstreamMonitor(probe=lambda: None)
+        for ms in range(1, 101):
+            monitor.observe(UpstreamCall("students", "GET", "", float(ms), 200 if ms > 10 else 0, 0))
+        latency = monitor.latency()
+        assert (latency["p50_ms"], latency["p99_ms"], latency["error_rate"]) == (51.0, 100.0, 0.1)
+
+    def test_assessment(self):
+        """Test a failed probe is unhealthy and a saturated pool degraded"""
+        monitor = UpstreamMonitor(probe=lambda: None)
+        monitor.run_probe()
+        assert monitor.assess({"upstream": {"in_use": 2, "size": 20}}) == ("healthy", [])
+        status, reasons = monitor.assess({"upstream": {"in_use": 20, "size": 20}})
+        assert status == "degraded" and "upstream pool saturated" in reasons[0]
+        monitor.probe = failing_probe
+        monitor.run_probe()
+        assert monitor.assess({})[0] == "unhealthy"
+
+    def test_cache_skips_upstream_while_down(self):
+        """Test expired entries are served without a fetch while the probe fails"""
+        monitor = UpstreamMonitor(probe=failing_probe)
+        cache = ReadCache(soft_ttl=0, hard_ttl=0, max_stale=60, max_entries=10)
+        cache.upstream_down = monitor.upstream_down
+        cache.get("k", 0, lambda: "v1")
+        monitor.run_probe()
+        assert cache.get("k", 0, failing_probe) == "v1"
+        assert cache.stats["served_on_error"] == 1
@@ -0,0 +1,60 @@
+"""
+Upstream call instrumentation tests
+"""
+import time
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from upstream_trace import RouteStats, UpstreamTraceMiddleware, capture_upstream, query_shape, record_call
+
+
+def fake_query(table, student_id):
+    record_call(table, "GET", [("select", "*"), ("id", f"eq.{student_id}")], time.perf_counter(), 200, 10)
+
+
+async def student_names(request):
+    for i in range(5):
+        fake_query("students", i)
+    return JSONResponse({})
+
+
+def traced_client(threshold):
+    stats = RouteStats()
+    app = Starlette(routes=[Route("/students/{campus}", student_names)])
+    app.add_middleware(UpstreamTraceMiddleware, n_plus_one_threshold=threshold, stats=stats)
+    return TestClient(app), stats
+
+
+class TestUpstreamTrace:
+    """Per-request call records, route counts and N+1 detection"""
+
+    def test_shape_ignores_filter_values(self):
+        """Test queries differing only by their values share a shape"""
+        assert query_shape("GET", "students", [("id", "eq.1"), ("limit", 5)]) == \
+            query_shape("GET", "students", [("id", "eq.2"), ("limit", 9)])
+
+    def test_capture_records_calls(self):
+        """Test calls made inside capture_upstream are collected"""
+        with capture_upstream() as trace:
+            fake_query("students", 1)
+            fake_query("classes", 1)
+        fake_query("students", 2)
+        assert trace.by_table() == {"students": 1, "classes": 1}
+        assert trace.total_bytes == 20
+
+    def test_route_counts_and_n_plus_one(self):
+        """Test counts are kept per route template and repeated shapes are flagged"""
+        client, stats = traced_client(threshold=3)
+        client.get("/students/a")
+        response = client.get("/students/b")
+        assert response.headers["x-upstream-calls"] == "5"
+        assert response.headers["x-n-plus-one"].startswith("5x GET students")
+        assert stats.snapshot()["GET /students/{campus}"]["upstream_calls"] == 10
+
+    def test_detector_disabled_by_default(self):
+        """Test no N+1 header is added outside development mode"""
+        client, _ = traced_client(threshold=0)
+        assert "x-n-plus-one" not in client.get("/students/a").headers